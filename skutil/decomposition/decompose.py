@@ -4,14 +4,18 @@ from __future__ import print_function, division, absolute_import
 from abc import ABCMeta, abstractmethod
 import numpy as np
 import pandas as pd
+from scipy import linalg, sparse
 from sklearn.base import BaseEstimator, TransformerMixin
-from sklearn.decomposition import PCA, TruncatedSVD
+from sklearn.decomposition import PCA, IncrementalPCA, TruncatedSVD
+from sklearn.utils import check_random_state
+from sklearn.utils.extmath import fast_logdet, svd_flip
 from sklearn.utils.validation import check_is_fitted
 from sklearn.externals import six
 from skutil.base import *
 from skutil.base import overrides
 from ..utils import *
-from ..utils.fixes import _cols_if_none, _as_numpy
+from ..utils.fixes import _cols_if_none, _as_numpy, _make_pca
+from ..preprocessing.transform import _hstack_csr
 
 __all__ = [
     'SelectivePCA',
@@ -19,6 +23,196 @@ __all__ = [
 ]
 
 
+def _row_blocks(n_samples, batch_size):
+    """Generate row slices of (at most) ``2 * batch_size - 1`` rows
+    over ``n_samples`` rows. A short trailing block is folded into the
+    block before it so that no incremental update is ever computed on
+    fewer than ``batch_size`` rows (unless there are fewer rows than that
+    in total). If ``batch_size`` is None, a single slice is generated.
+
+    Parameters
+    ----------
+
+    n_samples : int
+        The number of rows to cover.
+
+    batch_size : int or None
+        The number of rows per block.
+    """
+    if batch_size is None or batch_size >= n_samples:
+        yield slice(0, n_samples)
+        return
+
+    n_blocks = max(1, n_samples // batch_size)
+    for i in range(n_blocks):
+        stop = n_samples if i == n_blocks - 1 else (i + 1) * batch_size
+        yield slice(i * batch_size, stop)
+
+
+def _column_positions(X, cols):
+    """Resolve ``cols`` to integer positions in ``X`` exactly as ``X[cols]``
+    would (including raising for names that don't exist), but on an empty
+    slice of rows, so no data is copied.
+    """
+    if X.columns.is_unique:
+        positions = X.columns.get_indexer(cols)
+        if (positions >= 0).all():
+            return positions
+    return X.columns.get_indexer(X.iloc[:0][cols].columns)
+
+
+def _float_dtype(dtypes):
+    """The dtype a decomposition of columns of ``dtypes`` is carried
+    out in: float32 if every one of them is float32 (so single
+    precision inputs are never upcast), and float64 otherwise.
+    """
+    return np.float32 if len(dtypes) and all(d == np.float32 for d in dtypes) else np.float64
+
+
+def _cast_fitted(decomposition, dtype, attrs=('mean_', 'components_', 'explained_variance_',
+                                              'explained_variance_ratio_')):
+    """Cast the learned arrays of a fit sklearn decomposition to ``dtype``,
+    so its ``transform`` is computed in (and returns) that precision.
+    """
+    for attr in attrs:
+        value = getattr(decomposition, attr, None)
+        if isinstance(value, np.ndarray):
+            setattr(decomposition, attr, value.astype(dtype, copy=False))
+    return decomposition
+
+
+def _sparse_positions(X, cols):
+    """Resolve ``cols`` to the column indices of a ``scipy.sparse`` matrix,
+    which has no column names, and return them along with the indices of
+    the remaining columns (in order).
+    """
+    n_features = X.shape[1]
+    if cols is None:
+        positions = np.arange(n_features)
+    else:
+        positions = np.asarray(cols)
+        if positions.dtype.kind not in 'iu':
+            raise ValueError('cols must be integer column indices for scipy.sparse input, '
+                             'but got %r' % (cols,))
+        if positions.size and not (0 <= positions.min() and positions.max() < n_features):
+            raise ValueError('cols must be between 0 and %i' % (n_features - 1))
+
+    others = np.setdiff1d(np.arange(n_features), positions)
+    return positions, others
+
+
+def _sparse_selection(X, positions):
+    """If any of ``X``'s columns at ``positions`` is a pandas sparse column,
+    gather all of them into a CSR matrix (without densifying the sparse ones).
+    Otherwise, return None. A sparse column must have a ``fill_value`` of 0,
+    since the implicit entries are taken to be zeros.
+    """
+    values = [X.iloc[:, i].values for i in positions]
+    if not any(hasattr(v, 'sp_values') for v in values):
+        return None
+
+    data, indices, indptr = [], [], [0]
+    for v in values:
+        if hasattr(v, 'sp_values'):
+            if v.fill_value != 0:
+                raise ValueError('sparse columns must have a fill_value of 0, '
+                                 'but got %r' % v.fill_value)
+            rows, vals = v.sp_index.to_int_index().indices, v.sp_values
+        else:
+            v = np.asarray(v)
+            rows = np.flatnonzero(v)
+            vals = v[rows]
+        data.append(vals)
+        indices.append(rows)
+        indptr.append(indptr[-1] + len(rows))
+
+    data = np.concatenate(data) if data else np.empty(0)
+    indices = np.concatenate(indices).astype(np.int32) if indices else np.empty(0, dtype=np.int32)
+    return sparse.csc_matrix((data, indices, indptr), shape=(X.shape[0], len(values))).tocsr()
+
+
+def _randomized_pca(X, n_components, n_oversamples, n_iter, random_state):
+    """Compute the leading ``n_components`` principal axes of ``X`` with
+    the randomized range finder of Halko et al. (2009). Unlike
+    ``sklearn.utils.extmath.randomized_svd``, the random test matrix is
+    drawn in ``X.dtype``, so float32 data is never upcast to float64.
+
+    Parameters
+    ----------
+
+    X : np.ndarray, shape=(n_samples, n_features)
+        The data. It is centered in place.
+
+    n_components : int
+        The number of components to keep.
+
+    n_oversamples : int
+        The number of extra random vectors used to sample the range of ``X``.
+
+    n_iter : int
+        The number of power iterations.
+
+    random_state : int, RandomState or None
+        Seeds the random test matrix.
+
+    Returns
+    -------
+
+    mean : np.ndarray, shape=(n_features,)
+        The column means of ``X``.
+
+    S : np.ndarray, shape=(n_components,)
+        The leading singular values of the centered data.
+
+    V : np.ndarray, shape=(n_components, n_features)
+        The principal axes, with the same sign convention as ``PCA``.
+
+    total_var : np.ndarray, shape=(n_features,)
+        The variance of each column of ``X``.
+    """
+    random_state = check_random_state(random_state)
+    n_samples, n_features = X.shape
+    n_random = min(n_components + n_oversamples, n_samples, n_features)
+
+    mean = X.mean(axis=0)
+    X -= mean
+
+    # sample the range of X, with LU-normalized power iterations
+    Q = np.dot(X, random_state.normal(size=(n_features, n_random)).astype(X.dtype))
+    for _ in range(n_iter):
+        Q = linalg.lu(Q, permute_l=True)[0]
+        Q = linalg.lu(np.dot(X.T, Q), permute_l=True)[0]
+        Q = np.dot(X, Q)
+    Q = linalg.qr(Q, mode='economic')[0]
+
+    # the SVD of the small projected matrix
+    U, S, V = linalg.svd(np.dot(Q.T, X), full_matrices=False)
+    U, V = svd_flip(np.dot(Q, U[:, :n_components]), V[:n_components])
+    return mean, S[:n_components], V, np.einsum('ij,ij->j', X, X) / n_samples
+
+
+def _pca_log_likelihood(pca, X):
+    """Compute the per-sample log-likelihood of ``X`` under a fit
+    probabilistic PCA model. This mirrors ``PCA.score_samples``, but
+    only relies on attributes shared by ``PCA`` and ``IncrementalPCA``
+    (the latter of which does not implement ``score``).
+
+    Parameters
+    ----------
+
+    pca : ``PCA`` or ``IncrementalPCA``
+        The fit decomposition.
+
+    X : np.ndarray, shape=(n_samples, n_features)
+        The data to score.
+    """
+    Xr = X - pca.mean_
+    precision = pca.get_precision()
+    log_like = -.5 * (Xr * np.dot(Xr, precision)).sum(axis=1)
+    log_like -= .5 * (X.shape[1] * np.log(2. * np.pi) - fast_logdet(precision))
+    return log_like
+
+
 class _BaseSelectiveDecomposer(six.with_metaclass(ABCMeta, BaseSkutil, TransformerMixin)):
     """Base class for selective decompositional transformers.
     Each of these transformers should adhere to the :class:`skutil.base.SelectiveMixin`
@@ -61,6 +255,92 @@ class _BaseSelectiveDecomposer(six.with_metaclass(ABCMeta, BaseSkutil, Transform
         """
         raise NotImplementedError('this should be implemented by a subclass')
 
+    def _transform_into(self, X, project, prefix, batch_size=None, out=None, accept_sparse=False):
+        """Project the ``cols`` of a validated frame and assemble the result.
+        The components and the untouched columns are written into a single
+        preallocated block, which is returned as is (if ``out`` is provided or
+        ``as_df`` is False) or wrapped, without a copy, in a ``DataFrame``
+        that keeps the index of ``X``. A frame only shares the block when every
+        untouched column already has the dtype of the components; otherwise
+        (e.g., int64 IDs, which a float block would round) the untouched
+        columns keep their own dtypes, and the frame is concatenated. So is
+        the ndarray, if the untouched columns are not all numeric.
+
+        Parameters
+        ----------
+
+        X : Pandas ``DataFrame``, shape=(n_samples, n_features)
+            The validated frame to transform.
+
+        project : callable
+            Maps a dense block of rows of ``cols`` to its components.
+
+        prefix : str
+            The prefix of the component column names.
+
+        batch_size : int or None, optional (default=None)
+            The number of rows projected at a time (see ``_row_blocks``).
+
+        out : np.ndarray or None, optional (default=None)
+            The buffer into which the result is written.
+
+        accept_sparse : bool, optional (default=False)
+            Whether ``project`` accepts a CSR block. If True and any of the
+            ``cols`` is a pandas sparse column, the rows are projected from a
+            CSR matrix of the ``cols`` rather than a dense copy of them.
+        """
+        cols = _cols_if_none(X, self.cols)
+        positions = _column_positions(X, cols)
+        other_positions = np.array([i for i, nm in enumerate(X.columns) if nm not in cols], dtype=int)
+
+        n_samples = X.shape[0]
+        n_components = self.get_decomposition().components_.shape[0]
+        names = [('%s%i' % (prefix, i + 1)) for i in range(n_components)] + \
+            [X.columns[i] for i in other_positions]
+        shape = (n_samples, len(names))
+
+        dtypes = X.dtypes.values
+        dtype = _float_dtype(dtypes[positions])
+        other_dtypes = dtypes[other_positions]
+        if self.as_df:
+            shared = all(d == dtype for d in other_dtypes)
+        else:
+            # as with as_matrix, the numeric columns are interleaved in their common type
+            shared = all(d.kind in 'biuf' for d in other_dtypes)
+
+        if out is not None:
+            if out.shape != shape:
+                raise ValueError('out should have shape %r, but has shape %r' % (shape, out.shape))
+            block = out
+        elif shared:
+            block = np.empty(shape, dtype=np.result_type(dtype, *other_dtypes))
+        else:
+            block = np.empty((n_samples, n_components), dtype=dtype)
+
+        # project a block of rows at a time, straight into the output
+        selected = _sparse_selection(X, positions) if accept_sparse else None
+        for rows in _row_blocks(n_samples, batch_size):
+            block[rows, :n_components] = project(
+                X.iloc[rows, positions].as_matrix() if selected is None else selected[rows])
+
+        if block.shape != shape:
+            # the untouched columns keep their own dtypes
+            left = pd.DataFrame(block, index=X.index, columns=names[:n_components], copy=False)
+            x = pd.concat([left, X.iloc[:, other_positions]], axis=1) if len(other_positions) else left
+            return x if self.as_df else x.as_matrix()
+
+        # copy the untouched columns over in contiguous runs, whose values
+        # are views on the frame's own blocks whenever they share a dtype
+        j = n_components
+        for run in np.split(other_positions, np.flatnonzero(np.diff(other_positions) != 1) + 1):
+            if len(run):
+                block[:, j:j + len(run)] = X.iloc[:, run[0]:run[-1] + 1].values
+                j += len(run)
+
+        if out is not None or not self.as_df:
+            return block
+        return pd.DataFrame(block, index=X.index, columns=names, copy=False)
+
     def inverse_transform(self, X):
         """Given a transformed dataframe, inverse the transformation.
 
@@ -136,6 +416,42 @@ class SelectivePCA(_BaseSelectiveDecomposer):
         (so as not to down sample or upsample everything), then multiply the weights across the
         transformed features.
 
+    batch_size : int or None, optional (default=None)
+        If set, the decomposition is learned out-of-core with an
+        ``sklearn.decomposition.IncrementalPCA``, which is updated
+        with one incremental SVD per block of ``batch_size`` rows, so
+        only one block of ``cols`` is ever copied into a dense matrix.
+        ``transform`` and ``score`` will likewise process their input
+        in row blocks of this size. Note that the incremental solver
+        requires ``n_components`` to be an int or None, and every
+        block must have at least ``n_components`` rows. The same solver
+        backs ``partial_fit``, which can be used to learn the
+        projection from a stream of frames.
+
+    svd_solver : string, optional (default='auto')
+        The solver used when ``batch_size`` is None. 'auto', 'full'
+        and 'arpack' are passed through to ``sklearn.decomposition.PCA``
+        ('arpack' requires scikit-learn >= 0.18; older versions always
+        compute a full SVD for 'auto').
+        'randomized' computes only the leading ``n_components`` axes with a
+        randomized range finder (Halko et al., 2009), which is much faster
+        than a full SVD when ``n_components`` is small relative to the
+        number of columns; it requires an int ``n_components``. Whatever
+        the solver, float32 columns are decomposed and projected as float32.
+
+    n_oversamples : int, optional (default=10)
+        The number of random vectors, beyond ``n_components``, used to sample
+        the range of the data by the 'randomized' solver. Larger values
+        improve the accuracy of the trailing components.
+
+    n_iter : int or 'auto', optional (default='auto')
+        The number of power iterations of the 'randomized' solver. 'auto'
+        uses 7 if ``n_components`` is under 10% of the smaller dimension of
+        the data, and 4 otherwise (as does sklearn).
+
+    random_state : int, RandomState or None, optional (default=None)
+        Seeds the 'randomized' and 'arpack' solvers.
+
     
     Examples
     --------
@@ -152,12 +468,61 @@ class SelectivePCA(_BaseSelectiveDecomposer):
     ----------
 
     pca_ : the PCA object
+        An ``sklearn.decomposition.PCA`` or, if ``batch_size`` is set or the
+        transformer was fit with ``partial_fit``, an
+        ``sklearn.decomposition.IncrementalPCA``.
     """
 
-    def __init__(self, cols=None, n_components=None, whiten=False, weight=False, as_df=True):
+    def __init__(self, cols=None, n_components=None, whiten=False, weight=False, as_df=True,
+                 batch_size=None, svd_solver='auto', n_oversamples=10, n_iter='auto', random_state=None):
         super(SelectivePCA, self).__init__(cols=cols, n_components=n_components, as_df=as_df)
         self.whiten = whiten
         self.weight = weight
+        self.batch_size = batch_size
+        self.svd_solver = svd_solver
+        self.n_oversamples = n_oversamples
+        self.n_iter = n_iter
+        self.random_state = random_state
+
+    def _fit_randomized(self, X):
+        n_samples, n_features = X.shape
+        n_components = self.n_components
+        if not isinstance(n_components, (int, np.integer)) or not 1 <= n_components <= min(X.shape):
+            raise ValueError('the randomized solver requires an int n_components '
+                             'between 1 and %i, but got %r' % (min(X.shape), n_components))
+
+        n_iter = self.n_iter
+        if n_iter == 'auto':
+            n_iter = 7 if n_components < .1 * min(X.shape) else 4
+
+        mean, S, V, total_var = _randomized_pca(X, n_components, self.n_oversamples,
+                                                n_iter, self.random_state)
+
+        # expose the result as a fit sklearn PCA so that transform,
+        # inverse_transform, score and get_decomposition all keep working
+        pca = _make_pca(n_components=n_components, whiten=self.whiten, svd_solver='randomized',
+                        iterated_power=n_iter, random_state=self.random_state)
+        pca.mean_, pca.components_ = mean, V
+        pca.n_components_, pca.n_samples_, pca.n_features_ = n_components, n_samples, n_features
+        pca.explained_variance_ = (S ** 2) / n_samples
+        pca.explained_variance_ratio_ = pca.explained_variance_ / total_var.sum()
+
+        # the mean of the discarded eigenvalues, as in the full solver
+        n_discarded = min(n_samples, n_features) - n_components
+        pca.noise_variance_ = (total_var.sum() - pca.explained_variance_.sum()) / n_discarded \
+            if n_discarded else 0.
+        return pca
+
+    def _make_incremental(self):
+        n_components = self.n_components
+        if n_components is not None and not isinstance(n_components, (int, np.integer)):
+            raise ValueError('incremental PCA requires an int or None '
+                             'n_components, but got %r' % n_components)
+        if self.batch_size is not None and self.batch_size < 1:
+            raise ValueError('batch_size must be a positive int')
+
+        return IncrementalPCA(n_components=n_components, whiten=self.whiten,
+                              batch_size=self.batch_size)
 
     def fit(self, X, y=None):
         """Fit the transformer.
@@ -180,18 +545,78 @@ class SelectivePCA(_BaseSelectiveDecomposer):
 
         self
         """
-        # check on state of X and cols
-        X, self.cols = validate_is_pd(X, self.cols)
+        # check on state of X and cols (X is only read from, so it need not be copied)
+        X, self.cols = validate_is_pd(X, self.cols, copy=False)
         cols = _cols_if_none(X, self.cols)
 
         # fails thru if names don't exist:
-        self.pca_ = PCA(
-            n_components=self.n_components,
-            whiten=self.whiten).fit(X[cols].as_matrix())
+        positions = _column_positions(X, cols)
+        dtype = _float_dtype(X.dtypes.values[positions])
+
+        if self.batch_size is None:
+            if self.svd_solver == 'randomized':
+                self.pca_ = self._fit_randomized(X.iloc[:, positions].as_matrix().astype(dtype, copy=False))
+            else:
+                self.pca_ = _cast_fitted(_make_pca(
+                    n_components=self.n_components,
+                    whiten=self.whiten,
+                    svd_solver=self.svd_solver,
+                    iterated_power=self.n_iter,
+                    random_state=self.random_state).fit(X.iloc[:, positions].as_matrix()), dtype)
+        else:
+            pca = self._make_incremental()
+            for rows in _row_blocks(X.shape[0], self.batch_size):
+                pca.partial_fit(X.iloc[rows, positions].as_matrix())
+            self.pca_ = pca
 
         return self
 
-    def transform(self, X):
+    def partial_fit(self, X, y=None):
+        """Incrementally fit the transformer on one chunk of rows. The
+        first call starts a new ``sklearn.decomposition.IncrementalPCA``
+        (replacing any ``PCA`` from a ``fit`` without ``batch_size``), and
+        each subsequent call updates it with the new chunk, so the projection
+        can be learned from a stream of frames that never fit in memory at
+        once. Likewise, after a ``fit`` with ``batch_size``, ``partial_fit``
+        continues to update the already-fit model. The whole chunk is
+        processed as a single incremental update.
+
+        Parameters
+        ----------
+
+        X : Pandas ``DataFrame``, shape=(n_samples, n_features)
+            The next chunk of rows. Every chunk must contain the
+            ``cols`` (see ``__init__``) learned on the first call,
+            and at least ``n_components`` rows.
+
+        y : None
+            Passthrough for ``sklearn.pipeline.Pipeline``. Even
+            if explicitly set, will not change behavior of ``partial_fit``.
+
+        Returns
+        -------
+
+        self
+        """
+        pca = getattr(self, 'pca_', None)
+        if not isinstance(pca, IncrementalPCA):
+            pca = self._make_incremental()
+
+        # X is only read from, so it need not be copied
+        X, self.cols = validate_is_pd(X, self.cols, copy=False)
+        cols = _cols_if_none(X, self.cols)
+
+        self.pca_ = pca.partial_fit(X.iloc[:, _column_positions(X, cols)].as_matrix())
+        return self
+
+    def _weights(self):
+        # computed on a copy; weighting must not alter the fit pca_
+        weights = self.pca_.explained_variance_ratio_.copy()
+        weights -= np.median(weights)
+        weights += 1
+        return weights
+
+    def transform(self, X, out=None):
         """Transform a test matrix given the already-fit transformer.
 
         Parameters
@@ -202,6 +627,11 @@ class SelectivePCA(_BaseSelectiveDecomposer):
             be applied to a copy of the input data, and the result
             will be returned.
 
+        out : np.ndarray or None, shape=(n_samples, n_components + n_other), optional (default=None)
+            A buffer into which the components, followed by the columns
+            not in ``cols``, are written. If provided, ``out`` itself is
+            returned (regardless of ``as_df``), so repeated scoring calls
+            can reuse one buffer.
 
         Returns
         -------
@@ -211,39 +641,32 @@ class SelectivePCA(_BaseSelectiveDecomposer):
             and the result set is returned.
         """
         check_is_fitted(self, 'pca_')
-        # check on state of X and cols
-        X, _ = validate_is_pd(X, self.cols)
-        cols = _cols_if_none(X, self.cols)
+        # check on state of X and cols (X is only read from, so it need not be copied)
+        X, _ = validate_is_pd(X, self.cols, copy=False)
 
-        other_nms = [nm for nm in X.columns if nm not in cols]
-        transform = self.pca_.transform(X[cols].as_matrix())
+        pca = self.pca_
+        weights = self._weights() if self.weight else None
 
-        # do weighting if necessary
-        if self.weight:
-            # get the weight vals
-            weights = self.pca_.explained_variance_ratio_
-            weights -= np.median(weights)
-            weights += 1
+        def project(block):
+            transform = pca.transform(block)
 
-            # now add to the transformed features
-            transform *= weights
+            # do weighting if necessary
+            if weights is not None:
+                transform *= weights
+            return transform
 
-        left = pd.DataFrame.from_records(data=transform,
-                                         columns=[('PC%i' % (i + 1)) for i in range(transform.shape[1])])
-
-        # concat if needed
-        x = pd.concat([left, X[other_nms]], axis=1) if other_nms else left
-        return x if self.as_df else x.as_matrix()
+        return self._transform_into(X, project, 'PC', batch_size=self.batch_size, out=out)
 
     @overrides(_BaseSelectiveDecomposer)
     def get_decomposition(self):
         """Overridden from the :class:``skutil.decomposition.decompose._BaseSelectiveDecomposer`` class,
         this method returns the internal decomposition class: 
-        ``sklearn.decomposition.PCA``
+        ``sklearn.decomposition.PCA`` (or ``sklearn.decomposition.IncrementalPCA``
+        if the transformer was fit incrementally)
 
         Returns
         -------
-        self.pca_ : ``sklearn.decomposition.PCA``
+        self.pca_ : ``sklearn.decomposition.PCA`` or ``sklearn.decomposition.IncrementalPCA``
             The fit internal decomposition class
         """
         return self.pca_ if hasattr(self, 'pca_') else None
@@ -281,8 +704,14 @@ class SelectivePCA(_BaseSelectiveDecomposer):
         X, _ = validate_is_pd(X, self.cols)
         cols = X.columns if not self.cols else self.cols
 
-        ll = self.pca_.score(X[cols].as_matrix(), _as_numpy(y))
-        return ll
+        if self.batch_size is None and isinstance(self.pca_, PCA):
+            return self.pca_.score(X[cols].as_matrix(), _as_numpy(y))
+
+        ll = 0.
+        positions = _column_positions(X, cols)
+        for rows in _row_blocks(X.shape[0], self.batch_size):
+            ll += _pca_log_likelihood(self.pca_, X.iloc[rows, positions].as_matrix()).sum()
+        return ll / X.shape[0]
 
 
 class SelectiveTruncatedSVD(_BaseSelectiveDecomposer):
@@ -290,7 +719,15 @@ class SelectiveTruncatedSVD(_BaseSelectiveDecomposer):
     of columns. Useful for data that contains categorical features
     that have not yet been dummied, or for dummied features we don't want
     decomposed. TruncatedSVD is the equivalent of Latent Semantic Analysis,
-    and returns the "concept space" of the decomposed features.
+    and returns the "concept space" of the decomposed features. Float32
+    columns are decomposed and projected as float32.
+
+    Since truncated SVD does not center the data, it can be run directly on
+    sparse data: ``X`` may also be a ``scipy.sparse`` matrix (e.g., the output
+    of :class:`skutil.preprocessing.OneHotCategoricalEncoder` with
+    ``sparse_output=True``), or a frame with pandas sparse columns (whose
+    ``fill_value`` must be 0). Either way, the selected columns are never
+    densified.
 
     Parameters
     ----------
@@ -300,7 +737,8 @@ class SelectiveTruncatedSVD(_BaseSelectiveDecomposer):
         If no column names are provided, the transformer will be ``fit``
         on the entire frame. Note that the transformation will also only
         apply to the specified columns, and any other non-specified
-        columns will still be present after transformation.
+        columns will still be present after transformation. For
+        ``scipy.sparse`` input, ``cols`` must be integer column indices.
 
     n_components : int, (default=2)
         Desired dimensionality of output data.
@@ -354,8 +792,8 @@ class SelectiveTruncatedSVD(_BaseSelectiveDecomposer):
         Parameters
         ----------
 
-        X : Pandas ``DataFrame``, shape=(n_samples, n_features)
-            The Pandas frame to fit. The frame will only
+        X : Pandas ``DataFrame`` or ``scipy.sparse`` matrix, shape=(n_samples, n_features)
+            The Pandas frame (or sparse matrix) to fit. The frame will only
             be fit on the prescribed ``cols`` (see ``__init__``) or
             all of them if ``cols`` is None. Furthermore, ``X`` will
             not be altered in the process of the fit.
@@ -369,54 +807,83 @@ class SelectiveTruncatedSVD(_BaseSelectiveDecomposer):
 
         self
         """
-        # check on state of X and cols
-        X, self.cols = validate_is_pd(X, self.cols)
-        cols = _cols_if_none(X, self.cols)
-
-        # fails thru if names don't exist:
-        self.svd_ = TruncatedSVD(
+        if sparse.issparse(X):
+            X = X.tocsr()
+            selected = X[:, _sparse_positions(X, self.cols)[0]]
+            dtype = _float_dtype([X.dtype])
+        else:
+            # check on state of X and cols
+            X, self.cols = validate_is_pd(X, self.cols)
+            cols = _cols_if_none(X, self.cols)
+
+            # fails thru if names don't exist:
+            positions = _column_positions(X, cols)
+            selected = _sparse_selection(X, positions)
+            if selected is None:
+                selected = X.iloc[:, positions].as_matrix()
+            dtype = _float_dtype(X.dtypes.values[positions])
+
+        self.svd_ = _cast_fitted(TruncatedSVD(
             n_components=self.n_components,
             algorithm=self.algorithm,
-            n_iter=self.n_iter).fit(X[cols].as_matrix())
+            n_iter=self.n_iter).fit(selected), dtype)
 
         return self
 
-    def transform(self, X):
+    def transform(self, X, out=None):
         """Transform a test matrix given the already-fit transformer.
 
         Parameters
         ----------
 
-        X : Pandas ``DataFrame``, shape=(n_samples, n_features)
-            The Pandas frame to transform. The operation will
-            be applied to a copy of the input data, and the result
+        X : Pandas ``DataFrame`` or ``scipy.sparse`` matrix, shape=(n_samples, n_features)
+            The Pandas frame (or sparse matrix) to transform. The operation
+            will be applied to a copy of the input data, and the result
             will be returned.
 
+        out : np.ndarray or None, shape=(n_samples, n_components + n_other), optional (default=None)
+            A buffer into which the components, followed by the columns
+            not in ``cols``, are written. If provided, ``out`` itself is
+            returned (regardless of ``as_df``), so repeated scoring calls
+            can reuse one buffer.
 
         Returns
         -------
 
         X : Pandas ``DataFrame``, shape=(n_samples, n_features)
             The operation is applied to a copy of ``X``,
-            and the result set is returned.
+            and the result set is returned. For ``scipy.sparse`` input
+            (where ``as_df`` is ignored), this is an ``np.ndarray`` of the
+            components if every column was decomposed, and otherwise a CSR
+            matrix of the components followed by the other columns, which
+            are never densified.
         """
         check_is_fitted(self, 'svd_')
-        # check on state of X and cols
-        X, _ = validate_is_pd(X, self.cols)
-        cols = _cols_if_none(X, self.cols)
-
-        other_nms = [nm for nm in X.columns if nm not in cols]
-        transform = self.svd_.transform(X[cols].as_matrix())
-        left = pd.DataFrame.from_records(data=transform,
-                                         columns=[
-                                            ('Concept%i' % (i + 1)) 
-                                            for i in range(transform.shape[1])
-                                         ])
-
-        # concat if needed
-        x = pd.concat([left, X[other_nms]], axis=1) if other_nms else left
-
-        return x if self.as_df else x.as_matrix()
+        if sparse.issparse(X):
+            return self._transform_sparse(X, out)
+
+        # check on state of X and cols (X is only read from, so it need not be copied)
+        X, _ = validate_is_pd(X, self.cols, copy=False)
+
+        return self._transform_into(X, self.svd_.transform, 'Concept', out=out, accept_sparse=True)
+
+    def _transform_sparse(self, X, out):
+        X = X.tocsr()
+        positions, others = _sparse_positions(X, self.cols)
+
+        # always project the selected columns, in the order they were fit on
+        concepts = self.svd_.transform(X[:, positions])
+        if not len(others):
+            if out is None:
+                return concepts
+            if out.shape != concepts.shape:
+                raise ValueError('out should have shape %r, but has shape %r' % (concepts.shape, out.shape))
+            out[...] = concepts
+            return out
+
+        if out is not None:
+            raise ValueError('out cannot be used when the output is sparse')
+        return _hstack_csr(sparse.csr_matrix(concepts), X[:, others])
 
     @overrides(_BaseSelectiveDecomposer)
     def get_decomposition(self):
@@ -1,10 +1,14 @@
 import numpy as np
+import pandas as pd
+from scipy import sparse
 from numpy.testing import (assert_array_equal, assert_array_almost_equal)
-from sklearn.decomposition import PCA, TruncatedSVD
+from sklearn.decomposition import PCA, IncrementalPCA, TruncatedSVD
 from sklearn.datasets import load_iris
 from skutil.decomposition import *
+from skutil.preprocessing import OneHotCategoricalEncoder
 from skutil.testing import assert_fails
 from skutil.utils import load_iris_df
+from skutil.utils import fixes
 from skutil.decomposition.decompose import _BaseSelectiveDecomposer
 
 # Def data for testing
@@ -41,6 +45,147 @@ def test_selective_pca():
     assert_fails(assert_array_equal, AssertionError, pca_df, pca_arr)
 
 
+def test_selective_pca_incremental():
+    original = X
+    full = SelectivePCA(n_components=2, as_df=False).fit(original)
+
+    # the incremental solver, fit over row blocks
+    batched = SelectivePCA(n_components=2, batch_size=40).fit(original)
+    assert isinstance(batched.get_decomposition(), IncrementalPCA)
+    assert batched.pca_.n_samples_seen_ == original.shape[0]
+    transformed = batched.transform(original)
+    assert transformed.columns.tolist() == ['PC1', 'PC2']
+
+    # up to sign, the projection should match the full PCA closely
+    assert_array_almost_equal(np.abs(full.transform(original)),
+                              np.abs(transformed.as_matrix()), decimal=1)
+    assert abs(batched.score(original) - full.score(original)) < 0.1
+
+    # partial_fit over the same chunks is the same model
+    streamed = SelectivePCA(n_components=2, batch_size=40)
+    for start in (0, 40, 80):
+        stop = None if start == 80 else start + 40
+        streamed.partial_fit(original.iloc[start:stop])
+    assert_array_almost_equal(streamed.pca_.components_, batched.pca_.components_)
+    assert_array_almost_equal(streamed.transform(original).as_matrix(), transformed.as_matrix())
+
+    # partial_fit after a batched fit keeps updating the same model
+    batched.partial_fit(original.iloc[:40])
+    assert batched.pca_.n_samples_seen_ == original.shape[0] + 40
+
+    # and the frame is not altered by fitting
+    before = original.copy()
+    SelectivePCA(n_components=2, batch_size=40).fit(original).partial_fit(original)
+    assert_array_equal(before.as_matrix(), original.as_matrix())
+
+    # weighting keeps working, and does not alter the fit model
+    weighted = SelectivePCA(n_components=2, batch_size=40, weight=True).fit(original)
+    ratio = weighted.pca_.explained_variance_ratio_.copy()
+    first = weighted.transform(original)
+    assert_array_equal(first.as_matrix(), weighted.transform(original).as_matrix())
+    assert_array_equal(ratio, weighted.pca_.explained_variance_ratio_)
+
+    # the incremental solver needs an int n_components
+    assert_fails(SelectivePCA(n_components=0.9, batch_size=40).fit, ValueError, original)
+    assert_fails(SelectivePCA(n_components=0.9).partial_fit, ValueError, original)
+
+
+def test_selective_pca_randomized():
+    rs = np.random.RandomState(42)
+    data = pd.DataFrame(np.dot(rs.normal(size=(500, 5)), rs.normal(size=(5, 60))) +
+                        0.01 * rs.normal(size=(500, 60)))
+
+    full = SelectivePCA(n_components=3, svd_solver='full').fit(data)
+    rand = SelectivePCA(n_components=3, svd_solver='randomized', random_state=42).fit(data)
+    assert isinstance(rand.get_decomposition(), PCA)
+
+    # the leading components of a low rank matrix are recovered exactly
+    assert_array_almost_equal(rand.pca_.explained_variance_, full.pca_.explained_variance_, decimal=4)
+    assert_array_almost_equal(rand.transform(data).as_matrix(), full.transform(data).as_matrix(), decimal=4)
+    assert abs(rand.score(data) - full.score(data)) < 1e-4
+    assert_array_almost_equal(rand.inverse_transform(rand.transform(data)),
+                              full.inverse_transform(full.transform(data)), decimal=4)
+
+    # float32 stays float32, with any solver
+    single = data.astype(np.float32)
+    for solver in ('randomized', 'full'):
+        pca = SelectivePCA(n_components=3, svd_solver=solver, random_state=42, as_df=False).fit(single)
+        assert pca.pca_.components_.dtype == np.float32
+        assert pca.transform(single).dtype == np.float32
+    assert SelectivePCA(n_components=3, svd_solver='randomized').fit_transform(data).dtypes.unique().tolist() \
+        == [np.float64]
+
+    svd = SelectiveTruncatedSVD(n_components=3, as_df=False).fit(single)
+    assert svd.svd_.components_.dtype == np.float32
+    assert svd.transform(single).dtype == np.float32
+
+    # prior to sklearn 0.18, PCA takes no solver args: the randomized solver is
+    # computed in-house, and only arpack (which needs sklearn's) is refused
+    sk18 = fixes.SK18
+    fixes.SK18 = False
+    try:
+        assert_array_almost_equal(SelectivePCA(n_components=3, svd_solver='randomized', random_state=42)
+                                  .fit(data).pca_.components_, rand.pca_.components_)
+        assert_array_almost_equal(np.abs(SelectivePCA(n_components=3).fit_transform(data).as_matrix()),
+                                  np.abs(full.transform(data).as_matrix()), decimal=4)
+        assert_fails(SelectivePCA(n_components=3, svd_solver='arpack').fit, ValueError, data)
+    finally:
+        fixes.SK18 = sk18
+
+    # the randomized solver needs an int n_components
+    assert_fails(SelectivePCA(n_components=0.9, svd_solver='randomized').fit, ValueError, data)
+    assert_fails(SelectivePCA(n_components=61, svd_solver='randomized').fit, ValueError, data)
+
+
+def test_decomposer_output():
+    # a non-default index is kept, and the untouched columns stay aligned
+    original = X.copy()
+    original.index = original.index[::-1] + 1000
+    cols = ['sepal length (cm)', 'sepal width (cm)']
+    others = ['petal length (cm)', 'petal width (cm)']
+
+    for est, prefix in ((SelectivePCA(cols=cols, n_components=2, weight=True), 'PC'),
+                        (SelectiveTruncatedSVD(cols=cols, n_components=1), 'Concept')):
+        transformed = est.fit_transform(original)
+        assert transformed.index.equals(original.index)
+        assert transformed.columns.tolist()[-2:] == others
+        assert transformed.columns[0] == prefix + '1'
+        assert_array_equal(transformed[others].as_matrix(), original[others].as_matrix())
+        expected = est.get_decomposition().transform(original[cols].as_matrix())
+        if prefix == 'PC':
+            expected *= est._weights()
+        assert_array_almost_equal(transformed.iloc[:, :-2].as_matrix(), expected)
+
+        # the ndarray and the buffer are the same block
+        est.as_df = False
+        arr = est.transform(original)
+        assert_array_equal(arr, transformed.as_matrix())
+        out = np.empty_like(arr)
+        assert est.transform(original, out=out) is out
+        assert_array_equal(out, arr)
+        assert_fails(est.transform, ValueError, original, np.empty((2, 2)))
+        est.as_df = True
+
+    # non-numeric passthrough columns keep their dtype
+    mixed = original.copy()
+    mixed['species'] = 'setosa'
+    transformed = SelectivePCA(cols=cols, n_components=1).fit_transform(mixed)
+    assert transformed.columns.tolist() == ['PC1'] + others + ['species']
+    assert transformed['species'].dtype == object
+    assert transformed['PC1'].dtype == np.float64
+
+    # so do integer ones, without being rounded through a float block
+    ids = original.copy()
+    ids['id'] = 2 ** 60 + np.arange(ids.shape[0], dtype=np.int64)
+    ids['flag'] = ids['id'] % 2 == 0
+    transformed = SelectivePCA(cols=cols, n_components=1).fit_transform(ids)
+    assert transformed.columns.tolist() == ['PC1'] + others + ['id', 'flag']
+    assert transformed['id'].dtype == np.int64
+    assert transformed['flag'].dtype == bool
+    assert_array_equal(transformed['id'].values, ids['id'].values)
+    assert_array_equal(transformed[others].as_matrix(), original[others].as_matrix())
+
+
 def test_selective_tsvd():
     original = X
     cols = [original.columns[0], original.columns[1]]  # Only perform on first two columns...
@@ -61,6 +206,61 @@ def test_selective_tsvd():
     assert isinstance(transformer.cols, list)
 
 
+def test_selective_tsvd_sparse():
+    rs = np.random.RandomState(42)
+    dense = rs.rand(200, 12)
+    dense[dense < 0.8] = 0.
+    csr = sparse.csr_matrix(dense)
+
+    # all columns: the components of the sparse and dense data match
+    svd = SelectiveTruncatedSVD(n_components=3, as_df=False).fit(csr)
+    expected = svd.transform(dense)
+    assert_array_almost_equal(svd.transform(csr), expected)
+    assert_array_almost_equal(SelectiveTruncatedSVD(n_components=3, as_df=False).fit(dense).transform(dense),
+                              expected, decimal=4)
+
+    # every column, permuted: the projection uses the fit order
+    svd = SelectiveTruncatedSVD(cols=[11 - i for i in range(12)], n_components=3, as_df=False).fit(csr)
+    expected = svd.svd_.transform(dense[:, ::-1])
+    assert_array_almost_equal(svd.transform(csr), expected)
+    assert_array_almost_equal(svd.transform(csr, np.empty((200, 3))), expected)
+    assert_fails(svd.transform, ValueError, csr, np.empty((200, 4)))
+
+    # a subset of columns: the others are passed through, still sparse
+    cols = [0, 3, 4, 7, 8]
+    svd = SelectiveTruncatedSVD(cols=cols, n_components=2).fit(csr)
+    transformed = svd.transform(csr)
+    assert sparse.isspmatrix_csr(transformed)
+    assert transformed.shape == (200, 2 + 7)
+    others = [i for i in range(12) if i not in cols]
+    assert_array_equal(transformed[:, 2:].toarray(), dense[:, others])
+    assert_array_almost_equal(transformed[:, :2].toarray(), svd.svd_.transform(dense[:, cols]))
+    assert_fails(svd.transform, ValueError, csr, np.empty((200, 9)))
+    assert_fails(SelectiveTruncatedSVD(cols=['a']).fit, ValueError, csr)
+    assert_fails(SelectiveTruncatedSVD(cols=[12]).fit, ValueError, csr)
+
+    # straight from the sparse one-hot encoding
+    frame = pd.DataFrame({'x': rs.rand(50), 'c': rs.choice(list('abcdef'), 50)})
+    encoded = OneHotCategoricalEncoder(sparse_output=True).fit_transform(frame)
+    assert SelectiveTruncatedSVD(cols=list(range(1, encoded.shape[1])), n_components=2)\
+        .fit_transform(encoded).shape == (50, 3)
+
+    # pandas sparse columns, mixed with dense ones
+    frame = pd.DataFrame(dense, columns=['f%i' % i for i in range(12)])
+    sdf = frame.to_sparse(fill_value=0)
+    names = ['f%i' % i for i in cols]
+    from_frame = SelectiveTruncatedSVD(cols=names, n_components=2).fit(frame)
+    from_sparse = SelectiveTruncatedSVD(cols=names, n_components=2).fit(sdf)
+    assert_array_almost_equal(from_sparse.svd_.explained_variance_, from_frame.svd_.explained_variance_, decimal=4)
+    transformed = from_sparse.transform(sdf)
+    assert transformed.columns.tolist() == ['Concept1', 'Concept2'] + ['f%i' % i for i in others]
+    assert_array_almost_equal(transformed[['Concept1', 'Concept2']].as_matrix(),
+                              from_sparse.svd_.transform(dense[:, cols]))
+
+    # a sparse column must have an implicit zero
+    assert_fails(SelectiveTruncatedSVD(cols=names).fit, ValueError, frame.to_sparse())
+
+
 def test_not_implemented_failure():
     # define anon decomposer
     class AnonDecomposer(_BaseSelectiveDecomposer):
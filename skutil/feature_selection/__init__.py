@@ -3,10 +3,13 @@ skutil.feature_selection provides a mechanism by which you can provide an
 array of columns and subsequently drop columns that are deemed worthy of dropping
 via the fit method within the _BaseFeatureSelector class.
 The LinearCombinationFilter class is used to remove linear combinations of features.
+The FScoreKBestSelector and FScorePercentileSelector classes select features by
+their cross-validated ANOVA F-score.
 All public classes within select.py extend the _BaseFeatureSelector class.
 """
 
 from .select import *
 from .combos import *
+from .one_way_fs import *
 
 __all__ = [s for s in dir() if not s.startswith('_')]
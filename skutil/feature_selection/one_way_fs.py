@@ -0,0 +1,602 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import print_function, division, absolute_import
+import warnings
+from abc import ABCMeta, abstractmethod
+import numpy as np
+from scipy import special, stats, sparse
+from sklearn.externals import six
+from sklearn.utils import as_float_array
+from .base import _BaseFeatureSelector
+from ..base import overrides
+from ..utils import validate_is_pd, is_entirely_numeric, is_integer
+from ..utils.fixes import _cols_if_none, _set_cv, _cv_split, _as_numpy
+
+__all__ = [
+    'FScoreKBestSelector',
+    'FScorePercentileSelector'
+]
+
+
+# This function is re-written from sklearn.feature_selection
+# and is included for compatability for older versions of
+# sklearn that might raise an ImportError.
+def _clean_nans(scores):
+    scores = as_float_array(scores, copy=True)
+    scores[np.isnan(scores)] = np.finfo(scores.dtype).min
+    return scores
+
+
+def _class_stats(X, codes, n_classes):
+    """Compute the per-class sufficient statistics for
+    the one-way ANOVA in a single pass over ``X``.
+
+    Parameters
+    ----------
+
+    X : np.ndarray, shape=(n_samples, n_features)
+        The (float) feature matrix.
+
+    codes : np.ndarray (int), shape=(n_samples,)
+        The class code of each row in ``X``, in [0, n_classes).
+
+    n_classes : int
+        The total number of classes.
+
+    Returns
+    -------
+
+    counts : np.ndarray, shape=(n_classes,)
+        The number of observations in each class
+
+    sums : np.ndarray, shape=(n_classes, n_features)
+        The column sums within each class
+
+    sq_sums : np.ndarray, shape=(n_classes, n_features)
+        The column sums of squares within each class
+    """
+    n_samples = X.shape[0]
+
+    # a (n_classes x n_samples) indicator lets us aggregate every
+    # class at once with a sparse product rather than boolean masks
+    indicator = sparse.csr_matrix((np.ones(n_samples), (codes, np.arange(n_samples))),
+                                  shape=(n_classes, n_samples))
+
+    counts = np.bincount(codes, minlength=n_classes)
+    return counts, indicator.dot(X), indicator.dot(X * X)
+
+
+def _f_oneway_from_stats(counts, sums, sq_sums):
+    """Performs a 1-way ANOVA from the per-class sufficient statistics
+    computed in ``_class_stats``. The algebra is identical to that of
+    ``sklearn.feature_selection.f_oneway`` (Heiman, pp.394-7), but since
+    the statistics are additive, they can be differenced to derive any
+    subset of the data (i.e., a training fold) without re-reading it.
+
+    Parameters
+    ----------
+
+    counts : np.ndarray, shape=(n_classes,)
+        The number of observations in each class
+
+    sums : np.ndarray, shape=(n_classes, n_features)
+        The column sums within each class
+
+    sq_sums : np.ndarray, shape=(n_classes, n_features)
+        The column sums of squares within each class
+
+    Returns
+    -------
+
+    f : np.ndarray, shape=(n_features,)
+        The computed F-values of the test.
+
+    prob : np.ndarray, shape=(n_features,)
+        The associated p-values from the F-distribution.
+    """
+    # classes that are not represented (i.e., in a fold) are not groups
+    present = counts > 0
+    counts, sums, sq_sums = counts[present], sums[present], sq_sums[present]
+
+    n_classes = counts.shape[0]
+    n_samples = float(counts.sum())
+
+    ss_alldata = sq_sums.sum(axis=0)
+    square_of_sums_alldata = sums.sum(axis=0) ** 2
+    square_of_sums_args = sums ** 2
+
+    sstot = ss_alldata - square_of_sums_alldata / n_samples
+    ssbn = (square_of_sums_args / counts[:, np.newaxis]).sum(axis=0)
+    ssbn -= square_of_sums_alldata / n_samples
+    sswn = sstot - ssbn
+
+    dfbn = n_classes - 1
+    dfwn = n_samples - n_classes
+    msb = ssbn / float(dfbn)
+    msw = sswn / float(dfwn)
+
+    constant_features_idx = np.where(msw == 0.)[0]
+    if np.nonzero(msb)[0].size != msb.size and constant_features_idx.size:
+        warnings.warn("Features %s are constant." % constant_features_idx, UserWarning)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f = msb / msw
+
+    prob = special.fdtrc(dfbn, dfwn, f)
+    return f, prob
+
+
+def _test_and_score(X, y, cv, iid):
+    """Compute the cross-validated F-scores and p-values. Rather than
+    re-scanning each training fold, the per-class sums and sums of squares
+    are computed once for the entire matrix and once for each held-out fold;
+    the training-fold statistics are the difference of the two, so ``k``
+    folds cost roughly one pass over the data.
+
+    Parameters
+    ----------
+
+    X : np.ndarray, shape=(n_samples, n_features)
+        The (float) feature matrix
+
+    y : np.ndarray, shape=(n_samples,)
+        The class labels
+
+    cv : int or cross validation generator
+        The cross validation scheme (see ``_set_cv``)
+
+    iid : bool
+        Whether to consider each fold as IID. The fold scores
+        are normalized at the end by the number of observations
+        in each fold
+
+    Returns
+    -------
+
+    all_scores : np.ndarray
+        The normalized scores
+
+    all_pvalues : np.ndarray
+        The normalized p-values
+    """
+    classes, codes = np.unique(y, return_inverse=True)
+    n_classes = classes.shape[0]
+    if n_classes < 2:
+        raise ValueError('F-score selection requires at least 2 classes')
+
+    n_samples = X.shape[0]
+    counts, sums, sq_sums = _class_stats(X, codes, n_classes)
+
+    cv = _set_cv(cv, X, y, classifier=True)
+    all_scores, all_pvalues, n_folds, total = 0., 0., 0, 0
+
+    for train, test in _cv_split(cv, X, y):
+        train, test = np.asarray(train), np.asarray(test)
+
+        # convert boolean masks to indices (sklearn 0.17 may yield masks)
+        if train.dtype == np.bool:
+            train, test = np.where(train)[0], np.where(test)[0]
+
+        # if the folds partition the data, the train stats are the global
+        # stats less the (smaller) held-out fold. Otherwise (i.e., a shuffle
+        # split), we have to aggregate the training rows themselves.
+        if train.shape[0] + test.shape[0] == n_samples:
+            t_counts, t_sums, t_sq_sums = _class_stats(X[test], codes[test], n_classes)
+            fold_stats = (counts - t_counts, sums - t_sums, sq_sums - t_sq_sums)
+        else:
+            fold_stats = _class_stats(X[train], codes[train], n_classes)
+
+        these_scores, p_vals = _f_oneway_from_stats(*fold_stats)
+
+        fold_size = train.shape[0]
+        if iid:
+            these_scores *= fold_size
+            p_vals *= fold_size
+
+        all_scores += these_scores
+        all_pvalues += p_vals
+        total += fold_size
+        n_folds += 1
+
+    if iid:
+        all_scores /= float(total)
+        all_pvalues /= float(total)
+    else:
+        all_scores /= float(n_folds)
+        all_pvalues /= float(n_folds)
+
+    return all_scores, all_pvalues
+
+
+class _BaseFScoreSelector(six.with_metaclass(ABCMeta, _BaseFeatureSelector)):
+    """Select features based on the cross-validated ANOVA F-score. This is
+    the pandas analogue of ``skutil.h2o.one_way_fs._BaseH2OFScoreSelector``.
+    Sub-classes will define how the number of features to retain is selected.
+
+    Parameters
+    ----------
+
+    cols : array_like, shape=(n_features,), optional (default=None)
+        The names of the columns on which to apply the transformation.
+        If no column names are provided, the transformer will be ``fit``
+        on the entire frame (less the ``target_feature``). Note that since
+        the F-test can only operate on numeric columns, not explicitly
+        setting the ``cols`` parameter may result in errors for categorical data.
+
+    target_feature : str, optional (default=None)
+        The name of the target feature in ``X`` (is excluded from the fit).
+        If None, the ``y`` argument of ``fit`` is used as the target.
+
+    cv : int or cross validation generator, optional (default=3)
+        Univariate feature selection can very easily remove
+        features erroneously or cause overfitting. Using cross
+        validation, we can more confidently select the features
+        to drop.
+
+    iid : bool, optional (default=True)
+        Whether to consider each fold as IID. The fold scores
+        are normalized at the end by the number of observations
+        in each fold
+
+    as_df : bool, optional (default=True)
+        Whether to return a Pandas ``DataFrame`` in the ``transform``
+        method. If False, will return a Numpy ``ndarray`` instead.
+        Since most skutil transformers depend on explicitly-named
+        ``DataFrame`` features, the ``as_df`` parameter is True by default.
+
+
+    Attributes
+    ----------
+
+    scores_ : np.ndarray, float
+        The score array, adjusted for ``n_folds``
+
+    p_values_ : np.ndarray, float
+        The p-value array, adjusted for ``n_folds``
+
+    drop_ : list
+        The features that will be dropped in the ``transform`` method.
+    """
+
+    @abstractmethod
+    def __init__(self, cols=None, target_feature=None, cv=3, iid=True, as_df=True):
+        super(_BaseFScoreSelector, self).__init__(cols=cols, as_df=as_df)
+        self.target_feature = target_feature
+        self.cv = cv
+        self.iid = iid
+
+    @abstractmethod
+    def _select_features(self, all_scores, all_pvalues, feature_names):
+        """This function should be overridden by subclasses, and
+        should handle the selection of features given the scores
+        and pvalues.
+
+        Parameters
+        ----------
+
+        all_scores : np.ndarray (float)
+            The scores
+
+        all_pvalues : np.ndarray (float)
+            The p-values
+
+        feature_names : array_like (str)
+            The list of names that are eligible for drop
+
+        Returns
+        -------
+
+        list : the features to drop
+        """
+        raise NotImplementedError('must be implemented by subclass')
+
+    def _fit(self, X, y):
+        """Fit the F-score feature selector.
+
+        Parameters
+        ----------
+
+        X : Pandas ``DataFrame``, shape=(n_samples, n_features)
+            The training frame on which to fit
+
+        y : array_like or None, shape=(n_samples,)
+            The target, if ``target_feature`` is None.
+
+        Returns
+        -------
+
+        self
+        """
+        X, self.cols = validate_is_pd(X, self.cols)
+        tf = self.target_feature
+
+        # get the target
+        if tf is not None:
+            y = X[tf].values
+        elif y is None:
+            raise ValueError('either target_feature or y must be provided')
+        else:
+            y = np.asarray(_as_numpy(y))
+            if y.shape[0] != X.shape[0]:
+                raise ValueError('dim mismatch between X and y')
+
+        feature_names = [c for c in _cols_if_none(X, self.cols) if c != tf]
+        if not is_entirely_numeric(X[feature_names]):
+            raise ValueError('All features must be entirely numeric for F-test')
+
+        self.scores_, self.p_values_ = _test_and_score(
+            X=as_float_array(X[feature_names].values), y=y,
+            cv=self.cv, iid=self.iid)
+
+        self.drop_ = self._select_features(self.scores_, self.p_values_, feature_names)
+        return self
+
+
+class FScorePercentileSelector(_BaseFScoreSelector):
+    """Select the top percentile of features based on the cross-validated
+    F-score. This is the pandas analogue of
+    ``skutil.h2o.H2OFScorePercentileSelector``.
+
+    Parameters
+    ----------
+
+    cols : array_like, shape=(n_features,), optional (default=None)
+        The names of the columns on which to apply the transformation.
+        If no column names are provided, the transformer will be ``fit``
+        on the entire frame (less the ``target_feature``). Note that since
+        the F-test can only operate on numeric columns, not explicitly
+        setting the ``cols`` parameter may result in errors for categorical data.
+
+    target_feature : str, optional (default=None)
+        The name of the target feature in ``X`` (is excluded from the fit).
+        If None, the ``y`` argument of ``fit`` is used as the target.
+
+    cv : int or cross validation generator, optional (default=3)
+        Univariate feature selection can very easily remove
+        features erroneously or cause overfitting. Using cross
+        validation, we can more confidently select the features
+        to drop.
+
+    percentile : int, optional (default=10)
+        The percent of features to keep.
+
+    iid : bool, optional (default=True)
+        Whether to consider each fold as IID. The fold scores
+        are normalized at the end by the number of observations
+        in each fold
+
+    as_df : bool, optional (default=True)
+        Whether to return a Pandas ``DataFrame`` in the ``transform``
+        method. If False, will return a Numpy ``ndarray`` instead.
+        Since most skutil transformers depend on explicitly-named
+        ``DataFrame`` features, the ``as_df`` parameter is True by default.
+
+
+    Examples
+    --------
+
+        >>> from skutil.feature_selection import FScorePercentileSelector
+        >>> from skutil.utils import load_iris_df
+        >>>
+        >>> X = load_iris_df(include_tgt=True, tgt_name='Species')
+        >>> selector = FScorePercentileSelector(target_feature='Species', percentile=50)
+        >>> selector.fit(X).drop_
+        ['sepal length (cm)', 'sepal width (cm)']
+
+
+    Attributes
+    ----------
+
+    scores_ : np.ndarray, float
+        The score array, adjusted for ``n_folds``
+
+    p_values_ : np.ndarray, float
+        The p-value array, adjusted for ``n_folds``
+
+    drop_ : list
+        The features that will be dropped in the ``transform`` method.
+    """
+
+    def __init__(self, cols=None, target_feature=None, cv=3, percentile=10, iid=True, as_df=True):
+        super(FScorePercentileSelector, self).__init__(
+            cols=cols, target_feature=target_feature,
+            cv=cv, iid=iid, as_df=as_df)
+
+        self.percentile = percentile
+
+    def fit(self, X, y=None):
+        """Fit the F-score feature selector.
+
+        Parameters
+        ----------
+
+        X : Pandas ``DataFrame``, shape=(n_samples, n_features)
+            The training frame on which to fit
+
+        y : array_like, shape=(n_samples,), optional (default=None)
+            The target. Only used if ``target_feature`` is None.
+
+        Returns
+        -------
+
+        self
+        """
+        if not is_integer(self.percentile):
+            raise ValueError('percentile must be an integer')
+        return self._fit(X, y)
+
+    @overrides(_BaseFScoreSelector)
+    def _select_features(self, all_scores, all_pvalues, feature_names):
+        """This function selects the top ``percentile`` of
+        features from the F-scores.
+
+        Parameters
+        ----------
+
+        all_scores : np.ndarray (float)
+            The scores
+
+        all_pvalues : np.ndarray (float)
+            The p-values
+
+        feature_names : array_like (str)
+            The list of names that are eligible for drop
+
+        Returns
+        -------
+
+        list : the features to drop
+        """
+        percentile = self.percentile
+
+        # compute which features to keep or drop
+        if percentile == 100:
+            return []
+        elif percentile == 0:
+            return list(feature_names)
+        else:
+            # adapted from sklearn.feature_selection.SelectPercentile
+            all_scores = _clean_nans(all_scores)
+            thresh = stats.scoreatpercentile(all_scores, 100 - percentile)
+
+            mask = all_scores > thresh
+            ties = np.where(all_scores == thresh)[0]
+            if len(ties):
+                max_feats = int(len(all_scores) * percentile / 100)
+                kept_ties = ties[:max_feats - mask.sum()]
+                mask[kept_ties] = True
+
+            # inverse, since we're recording which features to DROP, not keep
+            mask = np.asarray(~mask)
+            return (np.asarray(feature_names)[mask]).tolist()
+
+
+class FScoreKBestSelector(_BaseFScoreSelector):
+    """Select the top ``k`` features based on the cross-validated
+    F-score. This is the pandas analogue of
+    ``skutil.h2o.H2OFScoreKBestSelector``.
+
+    Parameters
+    ----------
+
+    cols : array_like, shape=(n_features,), optional (default=None)
+        The names of the columns on which to apply the transformation.
+        If no column names are provided, the transformer will be ``fit``
+        on the entire frame (less the ``target_feature``). Note that since
+        the F-test can only operate on numeric columns, not explicitly
+        setting the ``cols`` parameter may result in errors for categorical data.
+
+    target_feature : str, optional (default=None)
+        The name of the target feature in ``X`` (is excluded from the fit).
+        If None, the ``y`` argument of ``fit`` is used as the target.
+
+    cv : int or cross validation generator, optional (default=3)
+        Univariate feature selection can very easily remove
+        features erroneously or cause overfitting. Using cross
+        validation, we can more confidently select the features
+        to drop.
+
+    k : int or 'all', optional (default=10)
+        The number of features to keep.
+
+    iid : bool, optional (default=True)
+        Whether to consider each fold as IID. The fold scores
+        are normalized at the end by the number of observations
+        in each fold
+
+    as_df : bool, optional (default=True)
+        Whether to return a Pandas ``DataFrame`` in the ``transform``
+        method. If False, will return a Numpy ``ndarray`` instead.
+        Since most skutil transformers depend on explicitly-named
+        ``DataFrame`` features, the ``as_df`` parameter is True by default.
+
+
+    Examples
+    --------
+
+        >>> from skutil.feature_selection import FScoreKBestSelector
+        >>> from skutil.utils import load_iris_df
+        >>>
+        >>> X = load_iris_df(include_tgt=True, tgt_name='Species')
+        >>> selector = FScoreKBestSelector(target_feature='Species', k=1)
+        >>> selector.fit_transform(X).columns.tolist()
+        ['petal length (cm)', 'Species']
+
+
+    Attributes
+    ----------
+
+    scores_ : np.ndarray, float
+        The score array, adjusted for ``n_folds``
+
+    p_values_ : np.ndarray, float
+        The p-value array, adjusted for ``n_folds``
+
+    drop_ : list
+        The features that will be dropped in the ``transform`` method.
+    """
+
+    def __init__(self, cols=None, target_feature=None, cv=3, k=10, iid=True, as_df=True):
+        super(FScoreKBestSelector, self).__init__(
+            cols=cols, target_feature=target_feature,
+            cv=cv, iid=iid, as_df=as_df)
+
+        self.k = k
+
+    def fit(self, X, y=None):
+        """Fit the F-score feature selector.
+
+        Parameters
+        ----------
+
+        X : Pandas ``DataFrame``, shape=(n_samples, n_features)
+            The training frame on which to fit
+
+        y : array_like, shape=(n_samples,), optional (default=None)
+            The target. Only used if ``target_feature`` is None.
+
+        Returns
+        -------
+
+        self
+        """
+        if not (self.k == 'all' or (is_integer(self.k) and self.k > 0)):
+            raise ValueError('k must be a non-negative integer or "all"')
+        return self._fit(X, y)
+
+    @overrides(_BaseFScoreSelector)
+    def _select_features(self, all_scores, all_pvalues, feature_names):
+        """This function selects the top ``k`` features
+        from the F-scores.
+
+        Parameters
+        ----------
+
+        all_scores : np.ndarray (float)
+            The scores
+
+        all_pvalues : np.ndarray (float)
+            The p-values
+
+        feature_names : array_like (str)
+            The list of names that are eligible for drop
+
+        Returns
+        -------
+
+        list : the features to drop
+        """
+        k = self.k
+
+        # compute which features to keep or drop
+        if k == 'all':
+            return []
+        else:
+            # adapted from sklearn.feature_selection.SelectKBest
+            all_scores = _clean_nans(all_scores)
+            mask = np.zeros(all_scores.shape, dtype=bool)
+            mask[np.argsort(all_scores, kind="mergesort")[-k:]] = 1  # we know k > 0
+
+            # inverse, since we're recording which features to DROP, not keep
+            mask = np.asarray(~mask)
+            return (np.asarray(feature_names)[mask]).tolist()
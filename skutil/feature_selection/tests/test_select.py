@@ -348,3 +348,59 @@ def test_enum_lc():
     assert not combos._enum_lc(QRDecomposition(iris.data))
 
     assert_array_equal(combos._enum_lc(QRDecomposition(y))[0], np.array([2, 1]))
+
+
+def test_fscore_selectors():
+    from sklearn.feature_selection import f_classif
+    from skutil.utils.fixes import _set_cv, _cv_split
+
+    df = X.copy()
+    df['Species'] = iris.target
+
+    # compare against sklearn's f_classif over the same training folds
+    cv = _set_cv(3, iris.data, iris.target, classifier=True)
+    expected, total = 0., 0
+    for train, _ in _cv_split(cv, iris.data, iris.target):
+        f, _ = f_classif(iris.data[train], iris.target[train])
+        expected += f * len(train)
+        total += len(train)
+    expected /= total
+
+    kbest = FScoreKBestSelector(target_feature='Species', k=2).fit(df)
+    assert_array_almost_equal(kbest.scores_, expected)
+    assert kbest.drop_ == ['sepal length (cm)', 'sepal width (cm)']
+
+    # the target is retained in the transform, the dropped features are not
+    assert kbest.transform(df).columns.tolist() == ['petal length (cm)', 'petal width (cm)', 'Species']
+
+    # y can be passed directly in lieu of target_feature
+    kbest_y = FScoreKBestSelector(k=2).fit(X, iris.target)
+    assert_array_almost_equal(kbest_y.scores_, kbest.scores_)
+    assert kbest_y.drop_ == kbest.drop_
+
+    # non-iid, non-partitioning cv should also work
+    try:
+        from sklearn.model_selection import StratifiedShuffleSplit
+        ss = StratifiedShuffleSplit(n_splits=2, test_size=0.25, random_state=42)
+        splits = ss.split(iris.data, iris.target)
+    except ImportError:
+        from sklearn.cross_validation import StratifiedShuffleSplit
+        ss = StratifiedShuffleSplit(iris.target, n_iter=2, test_size=0.25, random_state=42)
+        splits = ss
+
+    expected = np.mean([f_classif(iris.data[train], iris.target[train])[0]
+                        for train, _ in splits], axis=0)
+    sel = FScoreKBestSelector(k='all', cv=ss, iid=False).fit(X, iris.target)
+    assert_array_almost_equal(sel.scores_, expected)
+    assert not sel.drop_
+
+    # percentile
+    pct = FScorePercentileSelector(target_feature='Species', percentile=50).fit(df)
+    assert pct.drop_ == kbest.drop_
+    assert FScorePercentileSelector(target_feature='Species', percentile=100).fit(df).drop_ == []
+    assert len(FScorePercentileSelector(target_feature='Species', percentile=0).fit(df).drop_) == 4
+
+    # bad args
+    assert_fails(FScoreKBestSelector(target_feature='Species', k=0).fit, ValueError, df)
+    assert_fails(FScorePercentileSelector(target_feature='Species', percentile=0.5).fit, ValueError, df)
+    assert_fails(FScoreKBestSelector().fit, ValueError, X)
@@ -200,7 +200,7 @@ class H2OOversamplingClassBalancer(_BaseH2OBalancer):
         partitioner = _OversamplingBalancePartitioner(
             X=frame, y_name=self.target_feature, 
             ratio=self.ratio, validation_function=_validate_x_y_ratio)
-        sample_idcs = partitioner.get_indices(self.shuffle)
+        sample_idcs = partitioner.get_indices(self.shuffle).tolist()
 
         # since H2O won't allow us to resample (it's considered rearranging)
         # we need to rbind at each point of duplication... this can be pretty
@@ -307,7 +307,7 @@ class H2OUndersamplingClassBalancer(_BaseH2OBalancer):
 
         # since there are no feature_names, we can just slice
         # the h2o frame as is, given the indices:
-        idcs = partitioner.get_indices(self.shuffle)
+        idcs = partitioner.get_indices(self.shuffle).tolist()
         Xb = frame[idcs, :] if not self.shuffle else reorder_h2o_frame(frame,
                                                                        _gen_optimized_chunks(idcs),
                                                                        from_chunks=True)
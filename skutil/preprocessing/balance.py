@@ -7,6 +7,8 @@ from h2o.frame import H2OFrame
 from numpy.random import choice
 from sklearn.externals import six
 from sklearn.neighbors import NearestNeighbors
+from sklearn.utils import check_random_state
+from sklearn.utils.random import sample_without_replacement
 from skutil.base import overrides, BaseSkutil
 from ..utils.fixes import dict_keys
 from ..utils import *
@@ -15,6 +17,7 @@ __all__ = [
     'OversamplingClassBalancer',
     'SamplingWarning',
     'SMOTEClassBalancer',
+    'StreamingUndersamplingClassBalancer',
     'UndersamplingClassBalancer'
 ]
 
@@ -128,7 +131,12 @@ class BalancerMixin:
 
 def _default_indices(length, shuffle):
     x = np.arange(length)
-    return x.tolist() if not shuffle else np.random.permutation(x).tolist()
+    return x if not shuffle else np.random.permutation(x)
+
+
+def _order_indices(idcs, shuffle):
+    # sorted because h2o doesn't play nicely with random indexing
+    return np.sort(idcs) if not shuffle else np.random.permutation(idcs)
 
 
 class _BaseBalancePartitioner(six.with_metaclass(abc.ABCMeta, object)):
@@ -202,7 +210,7 @@ class _OversamplingBalancePartitioner(_BaseBalancePartitioner):
         target_col = self.target_col  # already computed and in a NP array
         all_indices = np.arange(X.shape[0])
 
-        sample_indices = []
+        sample_indices = [all_indices]
         for minority in self.index:
             # since it's sorted, it means we've hit the end
             if minority == majority:
@@ -221,16 +229,9 @@ class _OversamplingBalancePartitioner(_BaseBalancePartitioner):
                 continue  # move onto next class
 
             minority_recs = all_indices[target_col == minority]
-            idcs = choice(minority_recs, n_samples, replace=True)
-            sample_indices.extend(list(idcs))
+            sample_indices.append(choice(minority_recs, n_samples, replace=True))
 
-        # make list
-        all_indices = list(all_indices)
-        all_indices.extend(sample_indices)
-
-        # sorted because h2o doesn't play nicely with random indexing
-        out = sorted(all_indices) if not shuffle else [j for j in np.random.permutation(all_indices)]
-        return out
+        return _order_indices(np.concatenate(sample_indices), shuffle)
 
 
 class _UndersamplingBalancePartitioner(_BaseBalancePartitioner):
@@ -258,20 +259,134 @@ class _UndersamplingBalancePartitioner(_BaseBalancePartitioner):
 
         # check the exit condition (that majority class <= n_required)
         if cts[majority] <= n_required:
-            return sorted(list(all_indices))
+            return all_indices
 
         # if not returned early, drop some indices
         target_col = self.target_col
-        majority_recs = all_indices[target_col == majority]
-        idcs = choice(majority_recs, n_required, replace=False)
+        is_majority = target_col == majority
+        idcs = choice(all_indices[is_majority], n_required, replace=False)
 
         # get all the "minority" observation idcs, append the sampled
         # majority idcs, then sort and return
-        minorities = list(all_indices[target_col != majority])
-        minorities.extend(idcs)
+        return _order_indices(np.concatenate((all_indices[~is_majority], idcs)), shuffle)
+
 
-        out = sorted(minorities) if not shuffle else [j for j in np.random.permutation(minorities)]
-        return out
+def _exclude_self(ind, rows):
+    """Given the ``k + 1`` nearest neighbors ``ind`` of each of ``rows``
+    (queried against the fit points themselves), drop each row from its own
+    neighbors, or its farthest neighbor if it isn't among them (i.e., ties).
+    """
+    is_self = ind == rows[:, np.newaxis]
+    is_self[~is_self.any(axis=1), -1] = True
+    return ind[~is_self].reshape(ind.shape[0], ind.shape[1] - 1)
+
+
+def _exact_kneighbors(pts, k, algorithm, leaf_size, n_jobs, batch_size):
+    """The ``k`` nearest neighbors of each of ``pts`` among the others,
+    queried ``batch_size`` rows at a time."""
+    nn = NearestNeighbors(n_neighbors=k + 1, algorithm=algorithm,
+                          leaf_size=leaf_size, n_jobs=n_jobs).fit(pts)
+
+    n_rows = pts.shape[0]
+    neighbors = np.empty((n_rows, k), dtype=np.intp)
+    for start in range(0, n_rows, batch_size):
+        rows = np.arange(start, min(start + batch_size, n_rows))
+        neighbors[rows] = _exclude_self(nn.kneighbors(pts[rows], return_distance=False), rows)
+    return neighbors
+
+
+def _rp_leaves(pts, leaf_size, random_state):
+    """Partition ``pts`` with a random projection tree: each group is
+    recursively split at the median of its projection onto a random
+    direction until no group holds more than ``leaf_size`` points. The
+    splits of every group at one depth are done at once. Returns the point
+    indices ordered by leaf, and the start offset of each leaf.
+    """
+    n_rows = pts.shape[0]
+    order = np.arange(n_rows)
+    starts = np.array([0])
+    while True:
+        sizes = np.diff(np.append(starts, n_rows))
+        if sizes.max() <= leaf_size:
+            return order, starts
+
+        # project each point onto its group's random direction
+        group = np.empty(n_rows, dtype=np.intp)
+        group[order] = np.repeat(np.arange(starts.shape[0]), sizes)
+        directions = random_state.randn(starts.shape[0], pts.shape[1])
+        proj = np.einsum('ij,ij->i', pts, directions[group])
+
+        # sort within each group -- scaling each group's projections into [0, 1)
+        # lets a single sort on (group + projection) do so for every group at
+        # once -- and split the groups too large at their median
+        lo, hi = np.minimum.reduceat(proj[order], starts), np.maximum.reduceat(proj[order], starts)
+        span = (hi - lo) * (1. + 1e-9) + np.finfo(np.float64).tiny
+        order = np.argsort(group + (proj - lo[group]) / span[group])
+        split = sizes > leaf_size
+        starts = np.sort(np.concatenate((starts, starts[split] + sizes[split] // 2)))
+
+
+def _rp_forest_kneighbors(pts, k, n_trees, leaf_size, batch_size, random_state):
+    """Approximate nearest neighbors from a forest of ``n_trees`` random
+    projection trees. The candidate neighbors of each point are the other
+    members of its leaf in each tree; the ``k`` nearest distinct candidates
+    over all trees are kept (unordered). The within-leaf distances are
+    computed for about ``batch_size`` points at a time.
+    """
+    n_rows = pts.shape[0]
+    leaf_size = max(leaf_size, 2 * (k + 1))  # every leaf holds at least k + 1 points
+    sq_norms = np.einsum('ij,ij->i', pts, pts)
+    slots = np.arange(leaf_size)
+
+    # the running k nearest candidates (and squared distances) of each point
+    neighbors = np.full((n_rows, k), -1, dtype=np.intp)
+    distances = np.full((n_rows, k), np.inf)
+    for _ in range(n_trees):
+        order, starts = _rp_leaves(pts, leaf_size, random_state)
+        sizes = np.diff(np.append(starts, n_rows))
+
+        # the members of each leaf, padded to leaf_size
+        members = order[np.minimum(starts[:, np.newaxis] + slots, n_rows - 1)]
+        padding = slots >= sizes[:, np.newaxis]
+
+        block = max(1, batch_size // leaf_size)
+        for first in range(0, starts.shape[0], block):
+            leaves = slice(first, first + block)
+            mem, pad = members[leaves], padding[leaves]
+
+            # the squared distances between the members of each leaf
+            pts_ = pts[mem]
+            sq_ = sq_norms[mem]
+            dist = sq_[:, :, np.newaxis] + sq_[:, np.newaxis, :] - 2 * np.einsum('lsp,ltp->lst', pts_, pts_)
+            dist[np.broadcast_to(pad[:, np.newaxis, :], dist.shape)] = np.inf
+            dist[:, slots, slots] = np.inf  # a point is not its own neighbor
+
+            # merge each (real) member's leaf-mates into its running candidates
+            leaf_of, slot_of = np.nonzero(~pad)
+            rows = mem[leaf_of, slot_of]
+            cand = np.hstack((neighbors[rows], mem[leaf_of]))
+            cand_dist = np.hstack((distances[rows], dist[leaf_of, slot_of]))
+            seen = (mem[leaf_of][:, :, np.newaxis] == neighbors[rows][:, np.newaxis, :]).any(axis=2)
+            cand_dist[:, k:][seen] = np.inf
+
+            keep = np.argpartition(cand_dist, k - 1, axis=1)[:, :k]
+            rng = np.arange(rows.shape[0])[:, np.newaxis]
+            neighbors[rows] = cand[rng, keep]
+            distances[rows] = cand_dist[rng, keep]
+
+    return neighbors
+
+
+def _neighbor_means(pts, neighbors, out):
+    """Write the mean of each row's neighbors (the rows of ``pts`` indexed
+    by each row of ``neighbors``) into ``out``. The neighbors are accumulated
+    one at a time, so no (n_samples, k, n_features) block is gathered.
+    """
+    np.take(pts, neighbors[:, 0], axis=0, out=out)
+    for j in range(1, neighbors.shape[1]):
+        out += pts[neighbors[:, j]]
+    out /= neighbors.shape[1]
+    return out
 
 
 class _BaseBalancer(six.with_metaclass(abc.ABCMeta, BaseSkutil, BalancerMixin)):
@@ -313,13 +428,9 @@ def _over_under_balance(X, y, ratio, as_df, shuffle, partitioner_class):
     # check on state of X
     X, _ = validate_is_pd(X, None)  # there are no cols, and we don't want warnings
 
-    # since we rely on indexing X, we need to reset indices
-    # in case X is the result of a slice and they're out of order.
-    X.index = np.arange(X.shape[0])
-    partitioner = partitioner_class(X, y, ratio)
-
-    # the balancing is handled in the partitioner
-    balanced = X.iloc[partitioner.get_indices(shuffle)]
+    # the balancing is handled in the partitioner; the indices are
+    # positional, so X's index needn't be reset before slicing
+    balanced = X.iloc[partitioner_class(X, y, ratio).get_indices(shuffle)]
 
     # we need to re-index...
     balanced.index = np.arange(balanced.shape[0])
@@ -328,7 +439,51 @@ def _over_under_balance(X, y, ratio, as_df, shuffle, partitioner_class):
     return balanced if as_df else balanced.as_matrix()
 
 
-class OversamplingClassBalancer(_BaseBalancer):
+def _over_under_indices(X, y, ratio, shuffle, sample_weight, partitioner_class):
+    # the partitioner only reads the target, so X is not copied
+    if not isinstance(X, pd.DataFrame):
+        X, _ = validate_is_pd(X, None)
+
+    idcs = partitioner_class(X, y, ratio).get_indices(shuffle)
+    return np.bincount(idcs, minlength=X.shape[0]) if sample_weight else idcs
+
+
+class _IndexBalancerMixin:
+    """Provides ``balance_indices`` for the balancers that resample
+    the existing rows of a frame. Subclasses define ``_partitioner_class``.
+    """
+
+    def balance_indices(self, X, sample_weight=False):
+        """Compute the balance operation without materializing
+        the balanced frame. The returned array can be used to index
+        ``X`` (e.g., ``X.iloc[idcs]``), or be passed as the ``sample_weight``
+        of a downstream estimator fit on ``X``.
+
+        Parameters
+        ----------
+
+        X : Pandas ``DataFrame``, shape=(n_samples, n_features)
+            The data to balance. It is not copied.
+
+        sample_weight : bool, optional (default=False)
+            If True, return the integer multiplicity of each row of ``X``
+            in the balanced sample (0 for rows not sampled) rather
+            than the row indices.
+
+        Returns
+        -------
+
+        idcs : np.ndarray, shape=(n_balanced,) or (n_samples,)
+            The positional indices of the rows of ``X`` in the balanced
+            sample (shuffled if ``self.shuffle`` is True, otherwise
+            sorted), or the multiplicity of each row if ``sample_weight``.
+        """
+        return _over_under_indices(X=X, y=self.y_, ratio=self.ratio, shuffle=self.shuffle,
+                                   sample_weight=sample_weight,
+                                   partitioner_class=self._partitioner_class)
+
+
+class OversamplingClassBalancer(_BaseBalancer, _IndexBalancerMixin):
     """Oversample all of the minority classes until they are 
     represented at the target proportion to the majority class.
 
@@ -376,6 +531,8 @@ class OversamplingClassBalancer(_BaseBalancer):
         Name: A, dtype: int64
     """
 
+    _partitioner_class = _OversamplingBalancePartitioner
+
     def __init__(self, y, ratio=BalancerMixin._def_ratio, shuffle=True, as_df=True):
         super(OversamplingClassBalancer, self).__init__(ratio=ratio, y=y,
                                                         shuffle=shuffle,
@@ -404,7 +561,7 @@ class OversamplingClassBalancer(_BaseBalancer):
         """
         blnc = _over_under_balance(X=X, y=self.y_, ratio=self.ratio,
                                    shuffle=self.shuffle, as_df=self.as_df,
-                                   partitioner_class=_OversamplingBalancePartitioner)
+                                   partitioner_class=self._partitioner_class)
         return blnc
 
 
@@ -432,6 +589,35 @@ class SMOTEClassBalancer(_BaseBalancer):
     k : int, def 3
         The number of neighbors to use in the nearest neighbors model
 
+    algorithm : str, optional (default='auto')
+        The nearest neighbors search. One of ('auto', 'ball_tree', 'kd_tree',
+        'brute') for an exact search with ``sklearn.neighbors.NearestNeighbors``,
+        or 'rp_forest' for an approximate search with a forest of random
+        projection trees, which scales to many minority records with many
+        features.
+
+    leaf_size : int, optional (default=30)
+        The leaf size of the ball tree, KD tree or random projection trees.
+        For 'rp_forest', the candidate neighbors of each record are the other
+        records sharing a leaf with it, so larger leaves are more accurate.
+
+    n_jobs : int, optional (default=1)
+        The number of jobs to run in parallel for the exact neighbors search.
+        If -1, then the number of jobs is set to the number of cores.
+
+    n_trees : int, optional (default=10)
+        The number of random projection trees used by 'rp_forest'.
+
+    batch_size : int, optional (default=10000)
+        The number of records whose neighbors are queried at once, which
+        caps the memory used by the search. For 'rp_forest', the number of
+        candidate neighbors gathered at once.
+
+    random_state : int, RandomState or None, optional (default=None)
+        Seeds the sampling of the minority records, the random projections
+        of 'rp_forest' and the shuffle, so that the output is reproducible.
+        If None, numpy's global random state is used.
+
     as_df : bool, optional (default=True)
         Whether to return a Pandas ``DataFrame`` in the ``transform``
         method. If False, will return a Numpy ``ndarray`` instead. 
@@ -467,11 +653,31 @@ class SMOTEClassBalancer(_BaseBalancer):
         Name: y, dtype: int64
     """
 
-    def __init__(self, y, ratio=BalancerMixin._def_ratio, shuffle=True, k=3, as_df=True):
+    def __init__(self, y, ratio=BalancerMixin._def_ratio, shuffle=True, k=3, as_df=True,
+                 algorithm='auto', leaf_size=30, n_jobs=1, n_trees=10, batch_size=10000,
+                 random_state=None):
         super(SMOTEClassBalancer, self).__init__(ratio=ratio, y=y,
                                                  shuffle=shuffle,
                                                  as_df=as_df)
         self.k = k
+        self.algorithm = algorithm
+        self.leaf_size = leaf_size
+        self.n_jobs = n_jobs
+        self.n_trees = n_trees
+        self.batch_size = batch_size
+        self.random_state = random_state
+
+    def _kneighbors(self, pts, random_state):
+        """The ``k`` nearest neighbors of each of ``pts`` among the others"""
+        k, batch_size = self.k, max(1, self.batch_size)
+        if pts.shape[0] <= k:
+            raise ValueError('Expected n_neighbors <= n_samples, but n_samples = %i, '
+                             'n_neighbors = %i' % (pts.shape[0], k + 1))
+
+        if self.algorithm == 'rp_forest':
+            return _rp_forest_kneighbors(pts, k, self.n_trees, self.leaf_size, batch_size,
+                                         random_state)
+        return _exact_kneighbors(pts, k, self.algorithm, self.leaf_size, self.n_jobs, batch_size)
 
     @overrides(BalancerMixin)
     def balance(self, X):
@@ -503,14 +709,22 @@ class SMOTEClassBalancer(_BaseBalancer):
         X.index = np.arange(0, X.shape[0])
         ratio = self.ratio
         cts, index, target_col, n_classes, needs_balancing = _validate_x_y_ratio(X, self.y_, ratio)
+        random_state = check_random_state(self.random_state)
 
         # if we don't need balancing, then just return the indices as is
         if not needs_balancing:
-            return X if not self.shuffle else shuffle_dataframe(X)
+            return X if not self.shuffle else shuffle_dataframe(X, random_state)
+
+        if self.algorithm not in ('auto', 'ball_tree', 'kd_tree', 'brute', 'rp_forest'):
+            raise ValueError('algorithm should be one of (\'auto\', \'ball_tree\', \'kd_tree\', '
+                             '\'brute\', \'rp_forest\'), but got %r' % self.algorithm)
 
         # get the maj class
         majority = index[-1]
         n_required = np.maximum(1, int(ratio * cts[majority]))
+
+        # determine how many synthetic records each minority class needs
+        plan = []
         for minority in index:
             if minority == majority:
                 break
@@ -528,45 +742,50 @@ class SMOTEClassBalancer(_BaseBalancer):
             if n_samples <= 0:
                 continue  # move onto next class
 
+            plan.append((minority, n_samples))
+
+        # the truncation of n_required can leave nothing to synthesize, in
+        # which case the records (and their dtypes) are returned as they are
+        if not plan:
+            X = X if not self.shuffle else shuffle_dataframe(X, random_state)
+            return X if self.as_df else X.as_matrix()
+
+        # preallocate the output: the original records, then each class's synthetic block
+        y_loc = X.columns.get_loc(self.y_)
+        feature_names = X.columns.drop(self.y_)
+        features = np.asarray(X[feature_names].values, dtype=np.float64)
+        n_rows = X.shape[0]
+        balanced = np.empty((n_rows + sum(n for _, n in plan), features.shape[1]), dtype=np.float64)
+        balanced[:n_rows] = features
+
+        all_indices = np.arange(n_rows)
+        start = n_rows
+        for minority, n_samples in plan:
             # don't need to validate K, neighbors will
             # randomly select n_samples points from the minority records
-            minority_recs = X[X[self.y_] == minority]
+            minority_recs = all_indices[target_col == minority]
             replace = n_samples > minority_recs.shape[0]  # may have to replace if required num > num available
-            idcs = choice(minority_recs.index, n_samples, replace=replace)
-            pts = X.iloc[idcs].drop([self.y_], axis=1)
-
-            # Fit the neighbors model on the random points
-            nn = NearestNeighbors(n_neighbors=self.k).fit(pts)
+            idcs = random_state.choice(minority_recs, n_samples, replace=replace)
+            pts = features[idcs]
 
-            # do imputation
-            synthetics_pts = []
-            for neighbors in nn.kneighbors()[1]:  # go over indices
-                mn = pts.iloc[neighbors].mean()
+            # Find the neighbors among the random points, and write
+            # the mean of each point's neighbors into the output
+            _neighbor_means(pts, self._kneighbors(pts, random_state), out=balanced[start:start + n_samples])
+            start += n_samples
 
-                # add the minority target, and the mean record
-                synthetics_pts.append(mn.tolist())
-
-            # append the minority target to the frame
-            syn_frame = pd.DataFrame.from_records(data=synthetics_pts, columns=pts.columns)
-            syn_frame[self.y_] = np.array([minority] * syn_frame.shape[0])
-
-            # reorder the columns
-            syn_frame = syn_frame[X.columns]
-
-            # append to X
-            X = pd.concat([X, syn_frame])
-
-        # reset index
-        X.index = np.arange(X.shape[0])
+        # append the minority targets, and put the target back in its place
+        target = np.concatenate([X[self.y_].values, np.repeat([m for m, _ in plan], [n for _, n in plan])])
+        X = pd.DataFrame(balanced, columns=feature_names)
+        X.insert(y_loc, self.y_, target)
 
         # shuffle if necessary
-        X = X if not self.shuffle else shuffle_dataframe(X)
+        X = X if not self.shuffle else shuffle_dataframe(X, random_state)
 
         # return the combined frame
         return X if self.as_df else X.as_matrix()
 
 
-class UndersamplingClassBalancer(_BaseBalancer):
+class UndersamplingClassBalancer(_BaseBalancer, _IndexBalancerMixin):
     """Undersample the majority class until it is represented
     at the target proportion to the most-represented minority class 
     (i.e., the second-most populous class).
@@ -615,6 +834,8 @@ class UndersamplingClassBalancer(_BaseBalancer):
         Name: A, dtype: int64
     """
 
+    _partitioner_class = _UndersamplingBalancePartitioner
+
     def __init__(self, y, ratio=0.2, shuffle=True, as_df=True):
         super(UndersamplingClassBalancer, self).__init__(ratio=ratio, y=y,
                                                          shuffle=shuffle,
@@ -642,5 +863,186 @@ class UndersamplingClassBalancer(_BaseBalancer):
         """
         blnc = _over_under_balance(X=X, y=self.y_, ratio=self.ratio,
                                    shuffle=self.shuffle, as_df=self.as_df,
-                                   partitioner_class=_UndersamplingBalancePartitioner)
+                                   partitioner_class=self._partitioner_class)
         return blnc
+
+
+def _iter_chunks(chunks):
+    # a callable produces a fresh iterable of frames on each call
+    return iter(chunks()) if callable(chunks) else iter(chunks)
+
+
+class StreamingUndersamplingClassBalancer(_BaseBalancer):
+    """Undersample the majority class of a frame too large for memory,
+    streamed as an iterable of ``DataFrame`` chunks (e.g., from
+    ``pd.read_csv(..., chunksize=...)``), until it is represented at the
+    target proportion to the most-represented minority class (i.e., the
+    second-most populous class). The result is the same as that of
+    ``UndersamplingClassBalancer`` on the concatenated chunks.
+
+    The sampling is exact, and takes two passes over the chunks: the
+    first counts the classes (into ``counts_``), and the second keeps
+    every minority row and a uniform sample of the majority rows. The
+    first pass can be done ahead of time with ``count``, and skipped by
+    passing ``use_counts=True`` to ``balance``.
+    Only the target column, the majority sample positions and the
+    retained rows are held in memory, so memory is bounded by the size
+    of the output, not of the input.
+
+    Parameters
+    ----------
+
+    y : str
+        The name of the response column.
+
+    ratio : float, optional (default=0.2)
+        The target ratio of the minority records to the majority records. If the
+        existing ratio is >= the provided ratio, every row is retained.
+
+    shuffle : bool, optional (default=True)
+        Whether or not to shuffle rows on return
+
+    as_df : bool, optional (default=True)
+        Whether to return a Pandas ``DataFrame`` in the ``transform``
+        method. If False, will return a Numpy ``ndarray`` instead. 
+        Since most skutil transformers depend on explicitly-named
+        ``DataFrame`` features, the ``as_df`` parameter is True by default.
+
+
+    Examples
+    --------
+
+        >>> import pandas as pd
+        >>> import numpy as np
+        >>> 
+        >>> # 150 zeros, 30 ones and 10 twos, in chunks of 50 rows
+        >>> X = pd.DataFrame(np.concatenate([np.zeros(150), np.ones(30), np.ones(10)*2]), columns=['A'])
+        >>> chunks = [X.iloc[i:i + 50] for i in range(0, X.shape[0], 50)]
+        >>> sampler = StreamingUndersamplingClassBalancer(y="A", ratio=0.5)
+        >>>
+        >>> X_balanced = sampler.balance(chunks)
+        >>> X_balanced['A'].value_counts().sort_index()
+        0.0    60
+        1.0    30
+        2.0    10
+        Name: A, dtype: int64
+
+
+    Attributes
+    ----------
+
+    counts_ : pd.Series
+        The count of each class over all the chunks, sorted ascending.
+    """
+
+    def __init__(self, y, ratio=0.2, shuffle=True, as_df=True):
+        super(StreamingUndersamplingClassBalancer, self).__init__(ratio=ratio, y=y,
+                                                                  shuffle=shuffle,
+                                                                  as_df=as_df)
+
+    def count(self, chunks):
+        """Count the classes in one pass over the chunks, and store
+        the counts in ``counts_``, for a subsequent call to ``balance``
+        (with ``use_counts=True``) on the same chunks.
+
+        Parameters
+        ----------
+
+        chunks : iterable or callable
+            An iterable of ``DataFrame`` chunks, or a callable
+            that returns one.
+
+        Returns
+        -------
+
+        self
+        """
+        y = _validate_target(self.y_)
+        counts = None
+        for chunk in _iter_chunks(chunks):
+            cts = chunk[y].value_counts()
+            counts = cts if counts is None else counts.add(cts, fill_value=0)
+
+        if counts is None:
+            raise ValueError('chunks must contain at least one frame')
+
+        _validate_num_classes(counts)
+        self.counts_ = counts.astype(np.int64).sort_values(ascending=True)
+        return self
+
+    @overrides(BalancerMixin)
+    def balance(self, chunks, use_counts=False):
+        """Apply the undersampling balance operation to the chunks.
+        Undersamples the majority class to the provided ratio over the
+        second-most-populous class label.
+
+        Parameters
+        ----------
+
+        chunks : iterable or callable
+            An iterable of ``DataFrame`` chunks, or a callable that
+            returns one (e.g., ``lambda: pd.read_csv(path, chunksize=10000)``).
+            Unless ``use_counts`` is True, the chunks are read twice,
+            so a one-shot iterator must be given as a callable.
+
+        use_counts : bool, optional (default=False)
+            Whether to use the ``counts_`` from a prior call to ``count``
+            on these same chunks, rather than counting them again. If the
+            chunks turn out not to match the counts, a ValueError is raised.
+
+        Returns
+        -------
+
+        blnc : pandas ``DataFrame``, shape=(n_samples, n_features)
+            The balanced dataframe. The dataframe will be
+            explicitly shuffled if ``self.shuffle`` is True.
+        """
+        ratio = _validate_ratio(self.ratio)
+        y = _validate_target(self.y_)
+
+        if use_counts:
+            if not hasattr(self, 'counts_'):
+                raise ValueError('use_counts requires a prior call to count')
+        else:
+            if not callable(chunks) and iter(chunks) is chunks:
+                raise ValueError('chunks is an iterator that cannot be read twice; pass '
+                                 'a callable that returns the chunks, or call count first')
+            self.count(chunks)
+
+        cts = self.counts_
+        majority, next_most = cts.index[-1], cts.index[-2]
+        n_required = int((1 / ratio) * cts[next_most])
+        needs_balancing = (cts.values[0] / cts.values[-1]) < ratio and cts[majority] > n_required
+
+        # the (sorted) positions, among all majority rows, of the majority rows to keep
+        keep = np.sort(sample_without_replacement(cts[majority], n_required)) \
+            if needs_balancing else None
+
+        retained, n_seen = [], 0
+        for chunk in _iter_chunks(chunks):
+            is_majority = (chunk[y] == majority).values
+            if keep is None:
+                n_seen += np.count_nonzero(is_majority)
+                retained.append(chunk)
+                continue
+
+            majority_rows = np.flatnonzero(is_majority)
+
+            # the kept positions that fall within this chunk's majority rows
+            lo, hi = np.searchsorted(keep, [n_seen, n_seen + majority_rows.shape[0]])
+            is_majority[majority_rows[keep[lo:hi] - n_seen]] = False
+            n_seen += majority_rows.shape[0]
+
+            retained.append(chunk.iloc[np.flatnonzero(~is_majority)])
+
+        # the sample is only uniform (and of the right size) if the counts are right
+        if n_seen != cts[majority]:
+            raise ValueError('the chunks contain %i rows of the majority class, but %i were '
+                             'counted; were the chunks changed since count?' % (n_seen, cts[majority]))
+
+        X = pd.concat(retained)
+        X.index = np.arange(X.shape[0])
+
+        # shuffle if necessary
+        X = X if not self.shuffle else shuffle_dataframe(X)
+        return X if self.as_df else X.as_matrix()
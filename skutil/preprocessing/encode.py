@@ -1,13 +1,16 @@
 from __future__ import print_function, division, absolute_import
 from sklearn.preprocessing import LabelEncoder, OneHotEncoder
 from sklearn.base import TransformerMixin, BaseEstimator
+from sklearn.externals.joblib import Parallel, delayed
 from sklearn.utils.validation import check_is_fitted
 from sklearn.utils import column_or_1d
-from sklearn.preprocessing.label import _check_numpy_unicode_bug
 import numpy as np
 import pandas as pd
+from scipy import sparse
 from skutil.base import BaseSkutil
 from skutil.utils import validate_is_pd
+from skutil.utils.fixes import hash_array
+from .transform import _hstack_csr
 
 __all__ = [
     'SafeLabelEncoder',
@@ -31,8 +34,57 @@ class SafeLabelEncoder(LabelEncoder):
     ----------
 
     classes_ : the classes that are encoded
+
+    lookup_ : a ``pd.Index`` of the classes, whose
+        hash table maps values to their codes
     """
 
+    def fit(self, y):
+        """Fit the label encoder.
+
+        Parameters
+        ----------
+
+        y : array_like, shape=(n_samples,)
+            The array to fit
+
+        Returns
+        -------
+
+        self
+        """
+        super(SafeLabelEncoder, self).fit(y)
+        self._set_lookup()
+        return self
+
+    def fit_transform(self, y):
+        """Fit the label encoder and return the encoded labels.
+
+        Parameters
+        ----------
+
+        y : array_like, shape=(n_samples,)
+            The array to fit and encode
+
+        Returns
+        -------
+
+        e : array_like, shape=(n_samples,)
+            The encoded array
+        """
+        e = super(SafeLabelEncoder, self).fit_transform(y)
+        self._set_lookup()
+        return e
+
+    def _set_lookup(self):
+        # Check not too many (the codes cannot reach the unseen value):
+        unseen = _get_unseen()
+        if len(self.classes_) >= unseen:
+            raise ValueError('Too many factor levels in feature. Max is %i' % unseen)
+
+        self.lookup_ = pd.Index(self.classes_)
+        self._lookup_src = self.classes_
+
     def transform(self, y):
         """Perform encoding if already fit.
 
@@ -51,20 +103,59 @@ class SafeLabelEncoder(LabelEncoder):
         check_is_fitted(self, 'classes_')
         y = column_or_1d(y, warn=True)
 
-        classes = np.unique(y)
-        _check_numpy_unicode_bug(classes)
+        # the classes may have been set (or replaced) without fit
+        if getattr(self, '_lookup_src', None) is not self.classes_:
+            self._set_lookup()
 
-        # Check not too many:
-        unseen = _get_unseen()
-        if len(classes) >= unseen:
-            raise ValueError('Too many factor levels in feature. Max is %i' % unseen)
+        # map the whole column through the hash table at once;
+        # anything not in classes_ comes back as -1
+        e = self.lookup_.get_indexer(y)
+        e[e < 0] = _get_unseen()
+        return e
 
-        e = np.array([
-                         np.searchsorted(self.classes_, x) if x in self.classes_ else unseen
-                         for x in y
-                         ])
 
-        return e
+def _indicator_csr(codes, n_levels):
+    """Build the one-hot CSR matrix of the label ``codes``, shape=(n_samples,
+    n_features), where feature j has ``n_levels[j]`` levels, directly: each row
+    has exactly one non-zero per feature, at the feature's column offset
+    plus the code.
+    """
+    n_rows, n_features = codes.shape
+    offsets = np.concatenate(([0], np.cumsum(n_levels)[:-1])).astype(codes.dtype)
+    indices = (codes + offsets).ravel()
+    indptr = np.arange(0, n_rows * n_features + 1, n_features)
+    return sparse.csr_matrix((np.ones(indices.shape[0]), indices, indptr),
+                             shape=(n_rows, int(np.sum(n_levels))))
+
+
+def _hash_levels(col, n_buckets, prefix=''):
+    """Map the values of ``col`` to signed hash buckets without a
+    vocabulary. Each distinct value (as ``prefix`` + its string form) is
+    hashed once; the low bits of the hash give its bucket in [0, n_buckets),
+    and the top bit its sign. Returns the bucket and the sign of each value.
+    """
+    codes, uniques = pd.factorize(col)
+
+    # missing values have the code -1, i.e., the last hash
+    levels = prefix + pd.Index(uniques).astype(str)
+    levels = np.append(levels.values.astype(object), prefix + 'nan')
+    hashes = hash_array(levels)[codes]
+
+    buckets = (hashes % np.uint64(n_buckets)).astype(np.intp)
+    signs = np.where(hashes >> np.uint64(63), -1., 1.)
+    return buckets, signs
+
+
+def _signed_csr(buckets, signs, n_columns):
+    """Build a CSR matrix with the ``signs`` at the column ``buckets``
+    (both of shape=(n_samples, n_features)) of each row, summing
+    any values that collide in the same column.
+    """
+    n_rows, n_features = buckets.shape
+    indptr = np.arange(0, n_rows * n_features + 1, n_features)
+    csr = sparse.csr_matrix((signs.ravel(), buckets.ravel(), indptr), shape=(n_rows, n_columns))
+    csr.sum_duplicates()
+    return csr
 
 
 class OneHotCategoricalEncoder(BaseSkutil, TransformerMixin):
@@ -87,6 +178,32 @@ class OneHotCategoricalEncoder(BaseSkutil, TransformerMixin):
         Since most skutil transformers depend on explicitly-named
         ``DataFrame`` features, the ``as_df`` parameter is True by default.
 
+    sparse_output : bool, optional (default=False)
+        Whether ``transform`` should return a ``scipy.sparse`` CSR matrix
+        (in which case ``as_df`` is ignored). The non-object columns lead,
+        followed by the dummy columns, which are built directly from the
+        label codes without ever densifying. The column names are
+        given by ``trans_nms_``.
+
+    hashing : int or None, optional (default=None)
+        If set, the object columns are not dummied out level-by-level, but
+        mapped to ``hashing`` signed hash buckets (the hashing trick),
+        which needs no vocabulary: ``fit`` only records the object columns,
+        and memory is constant in the number of levels. Each value adds its
+        sign (+/-1) to its bucket. The output is always sparse, as with
+        ``sparse_output``.
+
+    hash_scope : str, optional (default='column')
+        Only used if ``hashing`` is set. One of ('column', 'global'). If
+        'column', each object column has its own ``hashing`` buckets; if
+        'global', all of the object columns share ``hashing`` buckets
+        (a value is hashed along with its column name).
+
+    n_jobs : int, optional (default=1)
+        Only used if ``hashing`` is set. The number of threads used to
+        hash the object columns. If -1, then the number of jobs is set to
+        the number of cores.
+
 
     Examples
     --------
@@ -118,14 +235,19 @@ class OneHotCategoricalEncoder(BaseSkutil, TransformerMixin):
     lab_encoders_ : array_like
         The label encoders
 
-    one_hot_ : an instance of a OneHotEncoder
+    one_hot_ : an instance of a OneHotEncoder (None if ``sparse_output``)
 
-    trans_nms_ : the dummified names
+    trans_nms_ : the dummified names (the names of the output columns)
     """
 
-    def __init__(self, fill='Missing', as_df=True):
+    def __init__(self, fill='Missing', as_df=True, sparse_output=False, hashing=None,
+                 hash_scope='column', n_jobs=1):
         super(OneHotCategoricalEncoder, self).__init__(cols=None, as_df=as_df)
         self.fill = fill
+        self.sparse_output = sparse_output
+        self.hashing = hashing
+        self.hash_scope = hash_scope
+        self.n_jobs = n_jobs
 
     def fit(self, X, y=None):
         """Fit the encoder.
@@ -152,6 +274,9 @@ class OneHotCategoricalEncoder(BaseSkutil, TransformerMixin):
         # Extract the object columns
         obj_cols_ = X.select_dtypes(include=['object']).columns.values
 
+        if self.hashing is not None:
+            return self._fit_hashing(X, obj_cols_)
+
         # If we need to fill in the NAs, take care of it
         if self.fill is not None:
             X[obj_cols_] = X[obj_cols_].fillna(self.fill)
@@ -201,7 +326,7 @@ class OneHotCategoricalEncoder(BaseSkutil, TransformerMixin):
         is_empty = len(shape_tup) < 2 or shape_tup[1] == 0  # zero cols
 
         # Now we can do the actual one hot encoding, set internal state
-        self.one_hot_ = None if is_empty else OneHotEncoder().fit(trans)
+        self.one_hot_ = None if is_empty or self.sparse_output else OneHotEncoder().fit(trans)
         self.obj_cols_ = obj_cols_
         self.lab_encoders_ = lab_encoders_
 
@@ -228,6 +353,11 @@ class OneHotCategoricalEncoder(BaseSkutil, TransformerMixin):
         # check on state of X, don't care about cols or warning
         X, _ = validate_is_pd(X, None)
 
+        if self.hashing is not None:
+            return self._transform_hashing(X)
+        if self.sparse_output:
+            return self._transform_sparse(X)
+
         # if there is no encoder to speak of, just bail early
         if not self.one_hot_:
             return X if self.as_df else X.as_matrix()
@@ -249,3 +379,79 @@ class OneHotCategoricalEncoder(BaseSkutil, TransformerMixin):
         x = np.array(np.hstack((numers, oh)))
 
         return x if not self.as_df else pd.DataFrame.from_records(data=x, columns=self.trans_nms_)
+
+    def _transform_sparse(self, X):
+        # the non-object columns lead, as a sparse block
+        numers = X[[nm for nm in X.columns.values if nm not in self.obj_cols_]]
+        numers = sparse.csr_matrix(np.asarray(numers.values, dtype=np.float64))
+        if not len(self.obj_cols_):
+            return numers
+
+        objs = X[self.obj_cols_]
+
+        # If we need to fill in the NAs, take care of it
+        if self.fill is not None:
+            objs = objs.fillna(self.fill)
+
+        # the label codes, with the unseen value moved to each feature's last (NA) level
+        unseen = _get_unseen()
+        n_levels = [len(v.classes_) + 1 for v in self.lab_encoders_]
+        codes = np.empty((X.shape[0], len(self.obj_cols_)), dtype=np.intp)
+        for i, v in enumerate(self.lab_encoders_):
+            code = v.transform(objs[self.obj_cols_[i]])
+            code[code == unseen] = n_levels[i] - 1
+            codes[:, i] = code
+
+        return _hstack_csr(numers, _indicator_csr(codes, n_levels))
+
+    def _fit_hashing(self, X, obj_cols_):
+        # there's no vocabulary to learn, just the output names
+        n_buckets = self.hashing
+        if not isinstance(n_buckets, (int, np.integer)) or n_buckets < 1:
+            raise ValueError('hashing should be a positive int, but got %r' % n_buckets)
+        if self.hash_scope not in ('column', 'global'):
+            raise ValueError('hash_scope should be one of (\'column\', \'global\'), '
+                             'but got %r' % self.hash_scope)
+        if hash_array is None:
+            raise ImportError('hashing requires pandas >= 0.19.2 (found %s)' % pd.__version__)
+
+        if self.hash_scope == 'column':
+            hash_nms = ['%s.hash%i' % (nm, i) for nm in obj_cols_ for i in range(n_buckets)]
+        else:
+            hash_nms = ['hash%i' % i for i in range(n_buckets)] if len(obj_cols_) else []
+
+        num_nms = [n for n in X.columns.values if n not in obj_cols_]
+        self.trans_nms_ = num_nms + hash_nms
+        self.one_hot_ = None
+        self.obj_cols_ = obj_cols_
+        self.lab_encoders_ = []
+
+        return self
+
+    def _transform_hashing(self, X):
+        # the non-object columns lead, as a sparse block
+        numers = X[[nm for nm in X.columns.values if nm not in self.obj_cols_]]
+        numers = sparse.csr_matrix(np.asarray(numers.values, dtype=np.float64))
+        if not len(self.obj_cols_):
+            return numers
+
+        objs = X[self.obj_cols_]
+
+        # If we need to fill in the NAs, take care of it
+        if self.fill is not None:
+            objs = objs.fillna(self.fill)
+
+        n_buckets, is_global = self.hashing, self.hash_scope == 'global'
+        hashed = Parallel(n_jobs=self.n_jobs, backend='threading')(
+            delayed(_hash_levels)(objs[nm].values, n_buckets, '%s=' % nm if is_global else '')
+            for nm in self.obj_cols_)
+
+        buckets = np.empty((X.shape[0], len(self.obj_cols_)), dtype=np.intp)
+        signs = np.empty(buckets.shape)
+        for i, (bucket, sign) in enumerate(hashed):
+            # each column has its own block of buckets, unless they're shared
+            buckets[:, i] = bucket if is_global else bucket + i * n_buckets
+            signs[:, i] = sign
+
+        n_columns = n_buckets if is_global else n_buckets * len(self.obj_cols_)
+        return _hstack_csr(numers, _signed_csr(buckets, signs, n_columns))
@@ -6,6 +6,10 @@ import pandas as pd
 from sklearn.base import BaseEstimator, TransformerMixin, is_classifier
 from sklearn.ensemble import BaggingRegressor, BaggingClassifier
 from sklearn.externals import six
+from sklearn.externals.joblib import Parallel, delayed
+from sklearn.neighbors import NearestNeighbors
+from sklearn.utils import check_random_state
+from sklearn.utils.random import sample_without_replacement
 from sklearn.utils.validation import check_is_fitted
 from abc import ABCMeta
 from skutil.base import SelectiveMixin, BaseSkutil
@@ -16,7 +20,8 @@ __all__ = [
     'BaggedImputer',
     'BaggedCategoricalImputer',
     'ImputerMixin',
-    'SelectiveImputer'
+    'SelectiveImputer',
+    'SelectiveKNNImputer'
 ]
 
 
@@ -54,6 +59,19 @@ def _col_mode(col):
     return com
 
 
+def _exact_fill(col, fill):
+    """Compute the fill value of a column given its
+    fill, which is a number or in ('mode', 'median', 'mean').
+    """
+    if is_numeric(fill):
+        return fill
+    elif fill == 'mode':
+        return _col_mode(col)
+    elif fill == 'median':
+        return np.nanmedian(col.values)
+    return np.nanmean(col.values)
+
+
 def _val_values(vals):
     """Validate that all values in the iterable
     are either numeric, or in ('mode', 'median', 'mean').
@@ -73,6 +91,200 @@ def _val_values(vals):
                         'Got: %s' % ', '.join(vals))
 
 
+class _MeanAccumulator(object):
+    """Accumulates the mean of a stream of values, ignoring NaNs. Each
+    chunk is merged into the running mean by Chan et al.'s pairwise update,
+    which avoids the loss of precision of a running sum.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = np.nan
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        n = values.shape[0]
+        if n:
+            chunk_mean = values.mean()
+            total = self.count + n
+            self.mean = chunk_mean if not self.count else self.mean + (chunk_mean - self.mean) * n / total
+            self.count = total
+        return self
+
+    def value(self):
+        return self.mean
+
+
+class _QuantileSketch(object):
+    """A mergeable quantile sketch (in the style of the KLL sketch) over a
+    stream of values, ignoring NaNs. Values are buffered in a hierarchy of
+    compactors, where an item at level ``h`` represents ``2 ** h`` of the
+    original values. Whenever a compactor exceeds its capacity ``k``, it is
+    sorted and every other item (alternating between the even and odd
+    offsets) is promoted to the next level. The memory used is
+    ``O(k * log(n / k))``, and the rank error of a quantile is on the order
+    of ``n / k``; while fewer than ``k`` values have been seen, the sketch is
+    exact.
+
+    Parameters
+    ----------
+
+    error : float, optional (default=0.001)
+        The approximate relative rank error. The capacity
+        of each compactor is ``ceil(2 / error)``.
+    """
+
+    def __init__(self, error=0.001):
+        if not 0 < error < 1:
+            raise ValueError('error must be between 0 and 1, but got %r' % error)
+        self.k = int(np.ceil(2. / error))
+        self.levels = [np.empty(0)]
+        self.offsets = [0]
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.levels[0] = np.concatenate((self.levels[0], values[~np.isnan(values)]))
+        return self._compress()
+
+    def merge(self, other):
+        for h, items in enumerate(other.levels):
+            if h == len(self.levels):
+                self.levels.append(np.empty(0))
+                self.offsets.append(0)
+            self.levels[h] = np.concatenate((self.levels[h], items))
+        return self._compress()
+
+    def _compress(self):
+        h = 0
+        while h < len(self.levels):
+            items = self.levels[h]
+            if items.shape[0] > self.k:
+                if h + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                    self.offsets.append(0)
+
+                # keep the odd one out at this level (if any), promote every other one of the rest
+                items = np.sort(items)
+                n_pairs = items.shape[0] // 2
+                promoted = items[self.offsets[h]:2 * n_pairs:2]
+                self.offsets[h] = 1 - self.offsets[h]
+                self.levels[h] = items[2 * n_pairs:]
+                self.levels[h + 1] = np.concatenate((self.levels[h + 1], promoted))
+            h += 1
+        return self
+
+    def quantile(self, q):
+        # exact if nothing has been compacted yet
+        if len(self.levels) == 1:
+            return np.percentile(self.levels[0], q * 100) if self.levels[0].shape[0] else np.nan
+
+        items = np.concatenate(self.levels)
+        weights = np.concatenate([np.repeat(2. ** h, lvl.shape[0]) for h, lvl in enumerate(self.levels)])
+        order = np.argsort(items)
+        cum_weights = np.cumsum(weights[order])
+        return items[order][np.searchsorted(cum_weights, q * cum_weights[-1])]
+
+    def value(self):
+        return self.quantile(0.5)
+
+
+class _FrequencyTable(object):
+    """A bounded table of the most frequent values in a stream, ignoring
+    NaNs (a mergeable Misra-Gries summary). When the table exceeds
+    ``capacity`` distinct values, the ``capacity + 1``-th largest count
+    is subtracted from every count, and only the ``capacity`` largest
+    are kept. Each count is thus underestimated by at most
+    ``n / (capacity + 1)``, so any value more frequent than that is
+    retained, and the table is exact while there are no more than
+    ``capacity`` distinct values.
+
+    Parameters
+    ----------
+
+    capacity : int, optional (default=1000)
+        The maximum number of distinct values to track.
+    """
+
+    def __init__(self, capacity=1000):
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1, but got %r' % capacity)
+        self.capacity = capacity
+        self.counts = pd.Series([], dtype=np.int64)
+
+    def update(self, values):
+        return self._merge_counts(pd.Series(values).value_counts())
+
+    def merge(self, other):
+        return self._merge_counts(other.counts)
+
+    def _merge_counts(self, counts):
+        counts = self.counts.add(counts, fill_value=0)
+        if counts.shape[0] > self.capacity:
+            counts = counts.sort_values(ascending=False)
+            counts = counts.iloc[:self.capacity] - counts.iloc[self.capacity]
+        self.counts = counts
+        return self
+
+    def value(self):
+        return self.counts.idxmax() if self.counts.shape[0] else np.nan
+
+
+def _sample_train_rows(missing, max_rows, sampling, random_state):
+    """Draw (once, for all imputed columns) a sorted sample of at most
+    ``max_rows`` row indices. If ``sampling`` is 'stratified', the rows are
+    stratified on their missingness pattern across the imputed columns (the
+    columns of ``missing``) with proportional allocation, so each column
+    keeps its share of observed rows; otherwise they are drawn uniformly.
+    """
+    n_rows = missing.shape[0]
+    if sampling == 'uniform':
+        return np.sort(sample_without_replacement(n_rows, max_rows, random_state=random_state))
+
+    # strata are the distinct bit-packed missingness patterns
+    _, strata = np.unique(np.packbits(missing, axis=1).view(
+        np.dtype((np.void, (missing.shape[1] + 7) // 8))), return_inverse=True)
+    strata = strata.ravel()
+    counts = np.bincount(strata)
+
+    # proportional allocation, handing out the remainder by largest fraction
+    quota = counts * (max_rows / n_rows)
+    alloc = np.floor(quota).astype(np.int64)
+    short = max_rows - alloc.sum()
+    if short:
+        alloc[np.argsort(alloc - quota, kind='mergesort')[:short]] += 1
+
+    # shuffle the rows within each stratum and keep the first alloc of each
+    order = np.lexsort((random_state.random_sample(n_rows), strata))
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    rank = np.arange(n_rows) - starts[strata[order]]
+    return np.sort(order[rank < alloc[strata[order]]])
+
+
+def _fit_impute_column(model, design, y_missing, target, features, sample=None):
+    """Fit ``model`` to predict the ``target`` column of the filled design
+    matrix from the ``features`` columns using the rows (of ``sample``, if
+    provided) where the target is present, and predict the target where it
+    is missing. Returns the fit model, the predictions (ordered as the
+    missing rows) and the number of rows the model was trained on.
+
+    Note that the training and test blocks are selected with index arrays
+    (the feature columns exclude the target), so each is a copy of just
+    those rows and columns rather than a view of ``design``; they are only
+    alive while this column is being fit.
+    """
+    if sample is None:
+        train = np.flatnonzero(~y_missing)
+    else:
+        train = sample[~y_missing[sample]]
+    test = np.flatnonzero(y_missing)
+    model.fit(design[np.ix_(train, features)], design[train, target])
+
+    if test.shape[0] == 0:
+        return model, np.empty(0), train.shape[0]
+    return model, model.predict(design[np.ix_(test, features)]), train.shape[0]
+
+
 class ImputerMixin:
     """A mixin for all imputer classes. Contains the default fill value.
     This mixin is used for the H2O imputer, as well.
@@ -148,6 +360,17 @@ class SelectiveImputer(_BaseImputer):
         the fill to use for missing values in the training matrix
         when fitting a ``SelectiveImputer``. If None, will default to 'mean'
 
+    median_error : float, optional (default=0.001)
+        Only used by ``partial_fit``. The approximate relative rank error of
+        the quantile sketch from which 'median' fills are computed. The memory
+        used per column is on the order of ``log(n_samples) / median_error``.
+
+    mode_capacity : int, optional (default=1000)
+        Only used by ``partial_fit``. The maximum number of distinct values
+        whose frequencies are tracked for 'mode' fills. The mode is exact if a
+        column has no more distinct values than this; otherwise, any value more
+        frequent than ``n_samples / (mode_capacity + 1)`` is still found.
+
 
     Examples
     --------
@@ -175,10 +398,16 @@ class SelectiveImputer(_BaseImputer):
 
     fills_ : iterable, int or float
         The imputer fill-values
+
+    accumulators_ : dict
+        Only set by ``partial_fit``. The running statistics
+        from which each computed fill-value is derived.
     """
 
-    def __init__(self, cols=None, as_df=True, fill='mean'):
+    def __init__(self, cols=None, as_df=True, fill='mean', median_error=0.001, mode_capacity=1000):
         super(SelectiveImputer, self).__init__(cols, as_df, fill)
+        self.median_error = median_error
+        self.mode_capacity = mode_capacity
 
     def fit(self, X, y=None):
         """Fit the imputer and return the
@@ -206,7 +435,90 @@ class SelectiveImputer(_BaseImputer):
         X, self.cols = validate_is_pd(X, self.cols)
         cols = self.cols if self.cols is not None else X.columns.values
 
+        # a fit from scratch discards any partial_fit statistics
+        if hasattr(self, 'accumulators_'):
+            del self.accumulators_
+
         # validate the fill, do fit
+        cols, fills = self._validate_fills(cols)
+        if fills is None:
+            self.fills_ = self.fill
+        else:
+            self.fills_ = dict((c, _exact_fill(X[c], f)) for c, f in zip(cols, fills))
+
+        return self
+
+    def partial_fit(self, X, y=None):
+        """Update the imputer's statistics with a chunk of the
+        training frame, and recompute the fill values. This allows
+        the imputer to be fit on a frame too large for memory.
+        'mean' fills are exact, while 'median' and 'mode' fills are
+        estimated from bounded sketches (see ``median_error`` and
+        ``mode_capacity``).
+
+        Parameters
+        ----------
+
+        X : Pandas ``DataFrame``, shape=(n_samples, n_features)
+            The next chunk of the frame to fit. The chunk will only
+            be fit on the prescribed ``cols`` (see ``__init__``) or
+            all of them if ``cols`` is None.
+
+        y : None
+            Passthrough for ``sklearn.pipeline.Pipeline``. Even
+            if explicitly set, will not change behavior of ``partial_fit``.
+
+        Returns
+        -------
+
+        self
+        """
+        # check on state of X and cols
+        X, self.cols = validate_is_pd(X, self.cols)
+        cols = self.cols if self.cols is not None else X.columns.values
+
+        cols, fills = self._validate_fills(cols)
+        if fills is None:
+            self.fills_ = self.fill
+            return self
+
+        # the first chunk creates the accumulators for the computed fills
+        if not hasattr(self, 'accumulators_'):
+            self.accumulators_ = dict((c, self._make_accumulator(f))
+                                      for c, f in zip(cols, fills) if not is_numeric(f))
+
+        fills_ = {}
+        for c, f in zip(cols, fills):
+            if is_numeric(f):
+                fills_[c] = f
+            else:
+                fills_[c] = self.accumulators_[c].update(X[c].values).value()
+
+        self.fills_ = fills_
+        return self
+
+    def _make_accumulator(self, fill):
+        if fill == 'mode':
+            return _FrequencyTable(capacity=self.mode_capacity)
+        elif fill == 'median':
+            return _QuantileSketch(error=self.median_error)
+        return _MeanAccumulator()
+
+    def _validate_fills(self, cols):
+        """Validate the fill, and resolve it to one fill (a number, or
+        one of 'mode', 'median' or 'mean') per column. If the fill is a
+        dict, its keys are the columns, and ``self.cols`` is reset.
+
+        Returns
+        -------
+
+        cols : array_like
+            The columns to fill
+
+        fills : list or None
+            The fill of each column, or None if the
+            fill is a single number for all columns.
+        """
         fill = self.fill
         if isinstance(fill, six.string_types):
             fill = str(fill)
@@ -214,16 +526,7 @@ class SelectiveImputer(_BaseImputer):
                 raise TypeError('self.fill must be either "mode", "mean", "median", None, '
                                 'a number, or an iterable. Got %s' % fill)
 
-            if fill == 'mode':
-                # for each column to impute, we go through and get the value counts
-                # of each, sorting by the max...
-                self.fills_ = dict(zip(cols, X[cols].apply(lambda x: _col_mode(x))))
-
-            elif fill == 'median':
-                self.fills_ = dict(zip(cols, X[cols].apply(lambda x: np.nanmedian(x.values))))
-
-            else:
-                self.fills_ = dict(zip(cols, X[cols].apply(lambda x: np.nanmean(x.values))))
+            return cols, [fill] * len(cols)
 
         # if the fill is an iterable, we have to get a bit more stringent on our validation
         elif is_iterable(fill):
@@ -241,34 +544,16 @@ class SelectiveImputer(_BaseImputer):
 
             # make sure they're all ints
             _val_values(fill)
-            d = {}
-            for ind, c in enumerate(cols):
-                f = fill[ind]
-
-                if is_numeric(f):
-                    d[c] = f
-                else:
-                    the_col = X[c]
-                    if f == 'mode':
-                        d[c] = _col_mode(the_col)
-                    elif f == 'median':
-                        d[c] = np.nanmedian(the_col.values)
-                    else:
-                        d[c] = np.nanmean(the_col.values)
-
-            self.fills_ = d
+            return cols, list(fill)
 
-        else:
-            if not is_numeric(fill):
-                raise TypeError('self.fill must be either "mode", "mean", "median", None, '
-                                'a number, or an iterable. Got %s' % str(fill))
-
-            # either the fill is an int, or it's something the user provided...
-            # if it's not an int or float, we'll let it go and not catch it because
-            # the it's their fault they were dumb.
-            self.fills_ = fill
+        if not is_numeric(fill):
+            raise TypeError('self.fill must be either "mode", "mean", "median", None, '
+                            'a number, or an iterable. Got %s' % str(fill))
 
-        return self
+        # either the fill is an int, or it's something the user provided...
+        # if it's not an int or float, we'll let it go and not catch it because
+        # the it's their fault they were dumb.
+        return cols, None
 
     def transform(self, X):
         """Transform a dataframe given the fit imputer.
@@ -313,7 +598,8 @@ class _BaseBaggedImputer(_BaseImputer):
     def __init__(self, cols=None, base_estimator=None, n_estimators=10,
                  max_samples=1.0, max_features=1.0, bootstrap=True, bootstrap_features=True,
                  oob_score=False, n_jobs=1, random_state=None, verbose=0, as_df=True,
-                 fill=None, is_classification=False):
+                 fill=None, is_classification=False, column_n_jobs=1, max_train_rows=None,
+                 sampling='uniform'):
 
         super(_BaseBaggedImputer, self).__init__(cols=cols, as_df=as_df, fill=fill)
 
@@ -329,6 +615,9 @@ class _BaseBaggedImputer(_BaseImputer):
         self.random_state = random_state
         self.verbose = verbose
         self.is_classification = is_classification
+        self.column_n_jobs = column_n_jobs
+        self.max_train_rows = max_train_rows
+        self.sampling = sampling
 
     def fit(self, X, y=None):
         """Fit the bagged imputer.
@@ -387,7 +676,6 @@ class _BaseBaggedImputer(_BaseImputer):
         # we need to get all of the numerics out of X, because these are
         # the features we'll be modeling on.
         numeric_cols = get_numeric(X)
-        numerics = X[numeric_cols]
 
         # if is_classification and our estimator is NOT, then we need to raise
         if self.base_estimator is not None:
@@ -395,76 +683,96 @@ class _BaseBaggedImputer(_BaseImputer):
                 raise TypeError('self.is_classification=True, '
                                 'but base_estimator is not a classifier')
 
-        # set which estimator type to fit:
-        _model = BaggingRegressor if not self.is_classification else BaggingClassifier
-
         # if there's only one numeric, we know at this point it's the one
         # we're imputing. In that case, there's too few cols on which to model
-        if numerics.shape[1] == 1:
+        if len(numeric_cols) == 1:
             raise ValueError('too few numeric columns on which to model')
 
         # the core algorithm:
+        # - build the missingness mask and the filled design matrix once
         # - for each col to impute
-        #   - subset to all numeric columns except the col to impute
+        #   - index all numeric columns except the col to impute
         #   - retain only the complete observations, separate the missing observations
         #   - build a bagging regressor model to predict for observations with missing values
-        #   - fill in missing values in a copy of the dataframe
-
-        models = {}
-        for col in cols:
-            x = numerics.copy()  # get copy of numerics for this model iteration
-            y_missing = pd.isnull(x[col])  # boolean vector of which are missing in the current y
-            y = x.pop(col)  # pop off the y vector from the matrix
-
+        #
+        # There are a few corner cases we need to account for:
+        #
+        # 1. there are no complete rows in the X matrix
+        #   - we can eliminate some columns to model on in this case, but there's no silver bullet
+        # 2. the cols selected for model building are missing in the rows needed to impute.
+        #   - this is a hard solution that requires even more NA imputation...
+        #
+        # the most "catch-all" solution is going to be to fill all missing values with some val, say -999999
+        design = np.array(X[numeric_cols].values, dtype=np.float64)
+        missing = np.isnan(design)
+        design[missing] = self.fill
+
+        numeric_idcs = np.arange(len(numeric_cols))
+        targets = [numeric_cols.index(col) for col in cols]
+        for col, j in zip(cols, targets):
             # if y_missing is all of the rows, we need to bail
-            if y_missing.sum() == x.shape[0]:
+            if missing[:, j].all():
                 raise ValueError('%s has all missing values, cannot train model' % col)
 
-            # at this point we've identified which y values we need to predict, however, we still
-            # need to prep our x matrix... There are a few corner cases we need to account for:
-            #
-            # 1. there are no complete rows in the X matrix
-            #   - we can eliminate some columns to model on in this case, but there's no silver bullet
-            # 2. the cols selected for model building are missing in the rows needed to impute.
-            #   - this is a hard solution that requires even more NA imputation...
-            #
-            # the most "catch-all" solution is going to be to fill all missing values with some val, say -999999
-
-            x = x.fillna(self.fill)
-            X_train = x[~y_missing]  # the rows that don't correspond to missing y values
-            X_test = x[y_missing]  # the rows to "predict" on
-            y_train = y[~y_missing]  # the training y vector
-
-            # define the model
-            model = _model(
-                base_estimator=self.base_estimator,
-                n_estimators=self.n_estimators,
-                max_samples=self.max_samples,
-                max_features=self.max_features,
-                bootstrap=self.bootstrap,
-                bootstrap_features=self.bootstrap_features,
-                oob_score=self.oob_score,
-                n_jobs=self.n_jobs,
-                random_state=self.random_state,
-                verbose=self.verbose)
-
-            # fit the model
-            model.fit(X_train, y_train)
-
-            # predict on the missing values, stash the model and the features used to train it
-            if X_test.shape[0] != 0:  # only do this step if there are actually any missing
-                y_pred = model.predict(X_test)
-                X.loc[y_missing, col] = y_pred  # fill the y vector missing slots and reassign back to X
+        # cap the training rows with one sample shared by every column
+        sample, max_rows = None, self.max_train_rows
+        if self.sampling not in ('uniform', 'stratified'):
+            raise ValueError('sampling should be one of (\'uniform\', \'stratified\'), '
+                             'but got %r' % self.sampling)
+        if max_rows is not None:
+            if max_rows < 1:
+                raise ValueError('max_train_rows should be at least one, but got %i' % max_rows)
+            if max_rows < design.shape[0]:
+                sample = _sample_train_rows(missing[:, targets], max_rows, self.sampling,
+                                            check_random_state(self.random_state))
+                for col, j in zip(cols, targets):
+                    if missing[sample, j].all():
+                        raise ValueError('%s has no observed values in the sampled rows, '
+                                         'cannot train model' % col)
+
+        # each column is an independent model fit on the same (read-only) design
+        # matrix, so the columns can be fit in parallel. Joblib memmaps the design
+        # matrix when dispatching to worker processes rather than copying it, but
+        # each fit copies out its own training rows and features, so up to
+        # column_n_jobs such copies are alive at once.
+        fits = Parallel(n_jobs=self.column_n_jobs)(
+            delayed(_fit_impute_column)(
+                self._make_model(), design, missing[:, j], j, numeric_idcs[numeric_idcs != j], sample)
+            for j in targets)
+
+        models = {}
+        for col, j, (model, y_pred, n_train) in zip(cols, targets, fits):
+            # fill the y vector missing slots and reassign back to X
+            if y_pred.shape[0] != 0:  # only do this step if there are actually any missing
+                y = X[col].values.copy()
+                y[missing[:, j]] = y_pred
+                X[col] = y
 
             models[col] = {
                 'model': model,
-                'feature_names': X_train.columns.values
+                'feature_names': np.array([c for c in numeric_cols if c != col]),
+                'n_train_rows': n_train
             }
 
         # assign the model dict to self -- this is the "fit" portion
         self.models_ = models
         return X if self.as_df else X.as_matrix()
 
+    def _make_model(self):
+        """Build an unfit bagging model for a single column."""
+        _model = BaggingRegressor if not self.is_classification else BaggingClassifier
+        return _model(
+            base_estimator=self.base_estimator,
+            n_estimators=self.n_estimators,
+            max_samples=self.max_samples,
+            max_features=self.max_features,
+            bootstrap=self.bootstrap,
+            bootstrap_features=self.bootstrap_features,
+            oob_score=self.oob_score,
+            n_jobs=self.n_jobs,
+            random_state=self.random_state,
+            verbose=self.verbose)
+
     def transform(self, X):
         """Impute the test data after fit.
 
@@ -484,29 +792,50 @@ class _BaseBaggedImputer(_BaseImputer):
         # check on state of X and cols
         X, _ = validate_is_pd(X, self.cols)
 
-        # perform the transformations for missing vals
+        # gather every column the models touch -- the imputed columns and
+        # the features they're modeled on -- and index them once
         models = self.models_
+        names, position = [], {}
         for col, kv in six.iteritems(models):
-            features, model = kv['feature_names'], kv['model']
-            y = X[col]  # the y we're predicting
-
-            # this will throw a key error if one of the features isn't there
-            X_test = X[features]  # we need another copy
+            features = kv['feature_names']
 
             # if col is in the features, there's something wrong internally
             assert col not in features, 'predictive column should not be in fit features (%s)' % col
 
-            # since this is a copy, we can add the missing vals where needed
-            X_test = X_test.fillna(self.fill)
-
-            # generate predictions, subset where y was null
-            y_null = pd.isnull(y)
-            pred_y = model.predict(X_test.loc[y_null])
-
-            # fill where necessary:
-            if y_null.sum() > 0:
-                y[y_null] = pred_y  # fill where null
-                X[col] = y  # set back to X
+            for c in [col] + list(features):
+                if c not in position:
+                    position[c] = len(names)
+                    names.append(c)
+
+        # this will throw a key error if one of the features isn't there
+        values = X[names].values
+
+        # bit-pack the missingness mask (one bit per cell) and keep only
+        # the rows that are missing at least one value; complete rows
+        # never touch a model
+        packed = np.packbits(pd.isnull(values), axis=1)
+        incomplete = np.flatnonzero(packed.any(axis=1))
+        if incomplete.shape[0] == 0:
+            return X if self.as_df else X.as_matrix()
+
+        missing = np.unpackbits(packed[incomplete], axis=1)[:, :len(names)].astype(bool)
+        design = np.array(values[incomplete], dtype=np.float64)
+        design[missing] = self.fill
+
+        # predict only the rows missing each column, writing all the
+        # predictions into a single array of the imputed columns
+        targets = [col for col in models if missing[:, position[col]].any()]
+        imputed = design[:, [position[col] for col in targets]]
+        for k, col in enumerate(targets):
+            j = position[col]
+            rows = np.flatnonzero(missing[:, j])
+            features = [position[c] for c in models[col]['feature_names']]
+            # (a copy of just the missing rows and the model's features)
+            imputed[rows, k] = models[col]['model'].predict(design[np.ix_(rows, features)])
+
+        # set back to X in one pass
+        if targets:
+            X.iloc[incomplete, [X.columns.get_loc(col) for col in targets]] = imputed
 
         return X if self.as_df else X.as_matrix()
 
@@ -570,6 +899,28 @@ class BaggedCategoricalImputer(_BaseBaggedImputer):
         the fill to use for missing values in the training matrix
         when fitting a BaggingClassifier. If None, will default to -999999
 
+    column_n_jobs : int, optional (default=1)
+        The number of columns whose models are fit in parallel. This is
+        separate from ``n_jobs``, which parallelizes the estimators within
+        each column's bagging model. The filled design matrix is built once
+        and shared (memory-mapped) across the worker processes, but each
+        worker copies out its own training block (the observed rows of its
+        column, by all of the other columns), so peak memory grows with
+        ``column_n_jobs``. If -1, then the number of jobs is set to the
+        number of cores.
+
+    max_train_rows : int or None, optional (default=None)
+        If set, and ``X`` has more rows than this, the per-column models are
+        trained on a sample of at most ``max_train_rows`` rows. The sample
+        is drawn once and shared by all of the imputed columns; each model
+        trains on the sampled rows in which its column is observed. Missing
+        values are still imputed in every row.
+
+    sampling : str, optional (default='uniform')
+        How the ``max_train_rows`` sample is drawn. One of ('uniform',
+        'stratified'). 'stratified' samples proportionally within each
+        pattern of missingness across the imputed columns.
+
 
     Examples
     --------
@@ -595,14 +946,17 @@ class BaggedCategoricalImputer(_BaseBaggedImputer):
     Attributes
     ----------
 
-    models_ : dict, (string : ``sklearn.base.BaseEstimator``)
-        A dictionary mapping column names to the fit
-        bagged estimator.
+    models_ : dict, (string : dict)
+        A dictionary mapping column names to a dict of the fit bagged
+        estimator ('model'), the names of the features it was fit on
+        ('feature_names') and the number of rows it was trained on
+        ('n_train_rows').
     """
 
     def __init__(self, cols=None, base_estimator=None, n_estimators=10,
                  max_samples=1.0, max_features=1.0, bootstrap=True, bootstrap_features=True,
-                 oob_score=False, n_jobs=1, random_state=None, verbose=0, as_df=True, fill=None):
+                 oob_score=False, n_jobs=1, random_state=None, verbose=0, as_df=True, fill=None,
+                 column_n_jobs=1, max_train_rows=None, sampling='uniform'):
 
         # categorical imputer needs to be classification
         super(BaggedCategoricalImputer, self).__init__(
@@ -611,7 +965,8 @@ class BaggedCategoricalImputer(_BaseBaggedImputer):
             max_samples=max_samples, max_features=max_features, bootstrap=bootstrap,
             bootstrap_features=bootstrap_features, oob_score=oob_score,
             n_jobs=n_jobs, random_state=random_state, verbose=verbose,
-            is_classification=True)
+            is_classification=True, column_n_jobs=column_n_jobs,
+            max_train_rows=max_train_rows, sampling=sampling)
 
 
 class BaggedImputer(_BaseBaggedImputer):
@@ -673,6 +1028,28 @@ class BaggedImputer(_BaseBaggedImputer):
         the fill to use for missing values in the training matrix
         when fitting a BaggingRegressor. If None, will default to -999999
 
+    column_n_jobs : int, optional (default=1)
+        The number of columns whose models are fit in parallel. This is
+        separate from ``n_jobs``, which parallelizes the estimators within
+        each column's bagging model. The filled design matrix is built once
+        and shared (memory-mapped) across the worker processes, but each
+        worker copies out its own training block (the observed rows of its
+        column, by all of the other columns), so peak memory grows with
+        ``column_n_jobs``. If -1, then the number of jobs is set to the
+        number of cores.
+
+    max_train_rows : int or None, optional (default=None)
+        If set, and ``X`` has more rows than this, the per-column models are
+        trained on a sample of at most ``max_train_rows`` rows. The sample
+        is drawn once and shared by all of the imputed columns; each model
+        trains on the sampled rows in which its column is observed. Missing
+        values are still imputed in every row.
+
+    sampling : str, optional (default='uniform')
+        How the ``max_train_rows`` sample is drawn. One of ('uniform',
+        'stratified'). 'stratified' samples proportionally within each
+        pattern of missingness across the imputed columns.
+
 
     Examples
     --------
@@ -698,14 +1075,17 @@ class BaggedImputer(_BaseBaggedImputer):
     Attributes
     ----------
 
-    models_ : dict, (string : ``sklearn.base.BaseEstimator``)
-        A dictionary mapping column names to the fit
-        bagged estimator.
+    models_ : dict, (string : dict)
+        A dictionary mapping column names to a dict of the fit bagged
+        estimator ('model'), the names of the features it was fit on
+        ('feature_names') and the number of rows it was trained on
+        ('n_train_rows').
     """
 
     def __init__(self, cols=None, base_estimator=None, n_estimators=10,
                  max_samples=1.0, max_features=1.0, bootstrap=True, bootstrap_features=True,
-                 oob_score=False, n_jobs=1, random_state=None, verbose=0, as_df=True, fill=None):
+                 oob_score=False, n_jobs=1, random_state=None, verbose=0, as_df=True, fill=None,
+                 column_n_jobs=1, max_train_rows=None, sampling='uniform'):
         # invoke super constructor
         super(BaggedImputer, self).__init__(
             cols=cols, as_df=as_df, fill=fill,
@@ -713,4 +1093,215 @@ class BaggedImputer(_BaseBaggedImputer):
             max_samples=max_samples, max_features=max_features, bootstrap=bootstrap,
             bootstrap_features=bootstrap_features, oob_score=oob_score,
             n_jobs=n_jobs, random_state=random_state, verbose=verbose,
-            is_classification=False)
+            is_classification=False, column_n_jobs=column_n_jobs,
+            max_train_rows=max_train_rows, sampling=sampling)
+
+
+class SelectiveKNNImputer(BaseSkutil, TransformerMixin):
+    """Performs nearest-neighbor imputation on select columns. A single
+    spatial index (KD-tree or ball tree) is built on the complete rows of
+    the numeric columns, and each row with missing values is imputed from
+    one neighbor lookup: every missing column in the row is filled with the
+    (optionally distance-weighted) mean of its ``n_neighbors`` nearest complete
+    rows. The coordinates missing in a query row are set to the mean of the
+    complete rows before the lookup. Queries are issued in batches of
+    ``batch_size`` rows.
+
+    Parameters
+    ----------
+
+    cols : array_like, optional (default=None)
+        The columns on which the transformer will be ``fit``. In
+        the case that ``cols`` is None, the transformer will be fit
+        on all columns. Note that since this transformer can only operate
+        on numeric columns, not explicitly setting the ``cols`` parameter
+        may result in errors for categorical data.
+
+    n_neighbors : int, optional (default=5)
+        The number of neighbors from which each row is imputed.
+
+    algorithm : str, optional (default='kd_tree')
+        The spatial index to build. One of ('kd_tree', 'ball_tree').
+
+    leaf_size : int, optional (default=30)
+        The leaf size of the spatial index.
+
+    weights : str, optional (default='uniform')
+        How the neighbors' values are averaged. One of ('uniform',
+        'distance'). 'distance' weights each neighbor by the inverse of
+        its distance to the row being imputed.
+
+    batch_size : int, optional (default=10000)
+        The number of rows queried against the index at once. This
+        caps the memory used by the neighbor lookups.
+
+    n_jobs : int, optional (default=1)
+        The number of threads used to query each batch. If -1,
+        then the number of jobs is set to the number of cores.
+
+    as_df : bool, optional (default=True)
+        Whether to return a Pandas DataFrame in the ``transform``
+        method. If False, will return a NumPy ndarray instead. 
+        Since most skutil transformers depend on explicitly-named
+        DataFrame features, the ``as_df`` parameter is True by default.
+
+
+    Examples
+    --------
+
+        >>> import numpy as np
+        >>> import pandas as pd
+        >>> from skutil.preprocessing import SelectiveKNNImputer
+        >>>
+        >>> nan = np.nan
+        >>> X = pd.DataFrame.from_records(data=np.array([
+        ...                                 [1.0,  2.0,  3.0],
+        ...                                 [nan,  2.2,  nan],
+        ...                                 [2.0,  4.0,  6.0],
+        ...                                 [1.2,  2.4,  3.2]]),
+        ...                               columns=['a','b','c'])
+        >>> imputer = SelectiveKNNImputer(n_neighbors=2)
+        >>> imputer.fit_transform(X)
+             a    b    c
+        0  1.0  2.0  3.0
+        1  1.1  2.2  3.1
+        2  2.0  4.0  6.0
+        3  1.2  2.4  3.2
+
+
+    Attributes
+    ----------
+
+    features_ : np.ndarray
+        The names of the numeric columns the index is built on.
+
+    means_ : np.ndarray
+        The mean of each of the ``features_`` over the complete rows.
+
+    tree_ : ``sklearn.neighbors.NearestNeighbors``
+        The fit nearest-neighbor index.
+
+    reference_ : np.ndarray, shape=(n_complete_rows, n_cols)
+        The values of the imputed columns in the complete rows.
+    """
+
+    def __init__(self, cols=None, n_neighbors=5, algorithm='kd_tree', leaf_size=30,
+                 weights='uniform', batch_size=10000, n_jobs=1, as_df=True):
+        super(SelectiveKNNImputer, self).__init__(cols=cols, as_df=as_df)
+        self.n_neighbors = n_neighbors
+        self.algorithm = algorithm
+        self.leaf_size = leaf_size
+        self.weights = weights
+        self.batch_size = batch_size
+        self.n_jobs = n_jobs
+
+    def fit(self, X, y=None):
+        """Fit the nearest-neighbor imputer.
+
+        Parameters
+        ----------
+
+        X : Pandas ``DataFrame``, shape=(n_samples, n_features)
+            The Pandas frame to fit. The frame will only
+            be fit on the prescribed ``cols`` (see ``__init__``) or
+            all of them if ``cols`` is None.
+
+        y : None
+            Passthrough for ``sklearn.pipeline.Pipeline``. Even
+            if explicitly set, will not change behavior of ``fit``.
+
+        Returns
+        -------
+
+        self
+        """
+        # check on state of X and cols
+        X, self.cols = validate_is_pd(X, self.cols)
+        cols = self.cols if self.cols is not None else X.columns.values
+
+        # the imputed columns must be numeric; all numerics are the coordinates
+        _validate_all_numeric(X[cols])
+        numeric_cols = get_numeric(X)
+
+        if self.algorithm not in ('kd_tree', 'ball_tree'):
+            raise ValueError('algorithm should be one of (\'kd_tree\', \'ball_tree\'), '
+                             'but got %r' % self.algorithm)
+        if self.weights not in ('uniform', 'distance'):
+            raise ValueError('weights should be one of (\'uniform\', \'distance\'), '
+                             'but got %r' % self.weights)
+
+        values = np.array(X[numeric_cols].values, dtype=np.float64)
+        complete = values[~np.isnan(values).any(axis=1)]
+        if complete.shape[0] < self.n_neighbors:
+            raise ValueError('need at least n_neighbors=%i complete rows, but got %i'
+                             % (self.n_neighbors, complete.shape[0]))
+
+        self.features_ = np.array(numeric_cols)
+        self.means_ = complete.mean(axis=0)
+        self.tree_ = NearestNeighbors(n_neighbors=self.n_neighbors, algorithm=self.algorithm,
+                                      leaf_size=self.leaf_size, n_jobs=self.n_jobs).fit(complete)
+        self.reference_ = complete[:, [numeric_cols.index(c) for c in cols]]
+
+        return self
+
+    def transform(self, X):
+        """Impute the test data after fit.
+
+        Parameters
+        ----------
+
+        X : Pandas ``DataFrame``, shape=(n_samples, n_features)
+            The Pandas frame to transform.
+
+        Returns
+        -------
+
+        X : pd.DataFrame or np.ndarray
+            The imputed matrix.
+        """
+        check_is_fitted(self, 'tree_')
+        # check on state of X and cols
+        X, _ = validate_is_pd(X, self.cols)
+        features = list(self.features_)
+        cols = self.cols if self.cols is not None else features
+        targets = np.array([features.index(c) for c in cols])
+
+        # this will throw a key error if one of the features isn't there
+        query = np.array(X[features].values, dtype=np.float64)
+        missing = np.isnan(query)
+
+        # only the rows missing one of the imputed columns are looked up
+        rows = np.flatnonzero(missing[:, targets].any(axis=1))
+        if rows.shape[0] == 0:
+            return X if self.as_df else X.as_matrix()
+
+        query, missing = query[rows], missing[rows]
+        query[missing] = np.take(self.means_, np.nonzero(missing)[1])
+        missing = missing[:, targets]
+        imputed = query[:, targets]
+
+        batch_size = max(1, self.batch_size)
+        for start in range(0, rows.shape[0], batch_size):
+            batch = slice(start, start + batch_size)
+            dist, ind = self.tree_.kneighbors(query[batch])
+            neighbors = self.reference_[ind]  # shape=(batch, n_neighbors, n_cols)
+
+            if self.weights == 'uniform':
+                estimates = neighbors.mean(axis=1)
+            else:
+                # rows that coincide with a neighbor are imputed from the coincident neighbors
+                with np.errstate(divide='ignore'):
+                    weights = 1. / dist
+                exact = np.isinf(weights)
+                weights[exact.any(axis=1)] = exact[exact.any(axis=1)]
+                estimates = np.einsum('ij,ijk->ik', weights, neighbors) / weights.sum(axis=1)[:, np.newaxis]
+
+            fill = missing[batch]
+            imputed[batch][fill] = estimates[fill]
+
+        # set back to X in one pass, only for the columns that had missing values
+        has_missing = missing.any(axis=0)
+        if has_missing.any():
+            X.iloc[rows, [X.columns.get_loc(c) for c in np.asarray(cols)[has_missing]]] = imputed[:, has_missing]
+
+        return X if self.as_df else X.as_matrix()
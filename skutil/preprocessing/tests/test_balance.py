@@ -131,6 +131,69 @@ def test_smote():
     assert cts[2] == expected_2_ct
 
 
+def test_smote_synthetics():
+    from skutil.preprocessing.balance import _neighbor_means
+    rs = np.random.RandomState(42)
+    pts, neighbors = rs.rand(20, 4), rs.randint(0, 20, (20, 3))
+    assert np.allclose(_neighbor_means(pts, neighbors, np.empty((20, 4))), pts[neighbors].mean(axis=1))
+
+    # the target keeps its position, and the originals come first, untouched
+    x = X.iloc[:60][['sepal length (cm)', 'target', 'petal width (cm)']]
+    b = SMOTEClassBalancer(y='target', ratio=0.5, shuffle=False).balance(x.copy())
+    assert list(b.columns) == list(x.columns)
+    assert b.shape[0] == 75
+    assert_array_equal(b.iloc[:60].values, x.values)
+
+    # every synthetic record lies within the range of its class
+    synthetic = b.iloc[60:]
+    assert (synthetic.target == 1).all()
+    ones = x[x.target == 1]
+    assert (synthetic.min() >= ones.min() - 1e-8).all()
+    assert (synthetic.max() <= ones.max() + 1e-8).all()
+
+    # nothing to synthesize after truncation (int(0.5 * 5) == 2): returned as is
+    x = pd.DataFrame({'a': np.arange(7), 'b': list('abcdefg'), 'target': [0] * 5 + [1] * 2})
+    b = SMOTEClassBalancer(y='target', ratio=0.5, shuffle=False).balance(x)
+    assert b.dtypes.tolist() == x.dtypes.tolist()
+    assert_array_equal(b.values, x.values)
+
+
+def test_smote_neighbors():
+    from sklearn.neighbors import NearestNeighbors
+    from skutil.preprocessing.balance import _exact_kneighbors, _rp_forest_kneighbors
+    rs = np.random.RandomState(42)
+    pts = rs.rand(300, 4)
+    expected = np.sort(NearestNeighbors(n_neighbors=3).fit(pts).kneighbors(return_distance=False), axis=1)
+
+    # blocked exact queries match the unblocked search
+    for algorithm in ('ball_tree', 'kd_tree', 'brute'):
+        assert_array_equal(np.sort(_exact_kneighbors(pts, 3, algorithm, 30, 1, 7), axis=1), expected)
+
+    # the approximate neighbors are distinct, exclude the point itself, and
+    # are exact when a single leaf holds every point
+    approx = _rp_forest_kneighbors(pts, 3, 5, 10, 50, rs)
+    assert not (approx == np.arange(300)[:, np.newaxis]).any()
+    assert all(len(set(row)) == 3 for row in approx)
+    assert_array_equal(np.sort(_rp_forest_kneighbors(pts, 3, 1, 300, 50, rs), axis=1), expected)
+
+    # more trees find more of the true neighbors
+    recall = [np.mean([len(set(a) & set(b)) for a, b in zip(_rp_forest_kneighbors(pts, 3, t, 10, 50, rs), expected)])
+              for t in (1, 20)]
+    assert recall[0] < recall[1]
+
+    for algorithm in ('kd_tree', 'rp_forest'):
+        b = SMOTEClassBalancer(y='target', ratio=0.5, algorithm=algorithm, batch_size=5).balance(X.iloc[:60])
+        assert b.target.value_counts()[1] == 25
+
+        # the same seed gives the same synthetic records and shuffle
+        c, d = [SMOTEClassBalancer(y='target', ratio=0.5, algorithm=algorithm,
+                                   random_state=42).balance(X.iloc[:60]) for _ in range(2)]
+        assert_array_equal(c.index.values, d.index.values)
+        assert_array_equal(c.values, d.values)
+
+    assert_fails(SMOTEClassBalancer(y='target', ratio=0.5, algorithm='bad').balance, ValueError, X.iloc[:60])
+
+
 def test_undersample():
     # since all classes are equal, should be no change here
     b = UndersamplingClassBalancer(y='target').balance(X)
@@ -152,6 +215,76 @@ def test_undersample():
     assert cts[1] == 10
 
 
+def test_balance_indices():
+    x = X.iloc[:60]  # 50 zeros, 10 ones
+
+    for sampler, n_rows in ((OversamplingClassBalancer(y='target', ratio=0.5, shuffle=False), 75),
+                            (UndersamplingClassBalancer(y='target', ratio=0.5, shuffle=False), 30)):
+        np.random.seed(42)
+        idcs = sampler.balance_indices(x)
+        assert isinstance(idcs, np.ndarray)
+        assert idcs.shape[0] == n_rows
+        assert_array_equal(idcs, np.sort(idcs))
+
+        # the indices reproduce the balanced frame
+        np.random.seed(42)
+        assert_array_equal(x.iloc[idcs].values, sampler.balance(x).values)
+
+        # the weights are the multiplicity of each row
+        np.random.seed(42)
+        weights = sampler.balance_indices(x, sample_weight=True)
+        assert weights.shape[0] == x.shape[0]
+        assert_array_equal(weights, np.bincount(idcs, minlength=x.shape[0]))
+
+    # oversampling never drops a row, undersampling never duplicates one
+    weights = OversamplingClassBalancer(y='target', ratio=0.5).balance_indices(x, sample_weight=True)
+    assert weights.min() == 1
+    assert weights[50:].sum() == 25
+    weights = UndersamplingClassBalancer(y='target', ratio=0.5).balance_indices(x, sample_weight=True)
+    assert weights.max() == 1
+    assert weights[:50].sum() == 20
+
+
+def test_streaming_undersample():
+    x = X.iloc[:60]  # 50 zeros, 10 ones
+    chunks = [x.iloc[i:i + 7] for i in range(0, x.shape[0], 7)]
+
+    sampler = StreamingUndersamplingClassBalancer(y='target', ratio=0.5, shuffle=False)
+    b = sampler.balance(chunks)
+    assert b.shape[0] == 30
+    cts = b.target.value_counts()
+    assert cts[0] == 20
+    assert cts[1] == 10
+    assert sampler.counts_[0] == 50
+
+    # rows are retained whole, in their original order, without duplicates
+    x = x.copy()
+    x['row'] = np.arange(x.shape[0])
+    b = sampler.balance([x.iloc[:25], x.iloc[25:]])
+    assert b.row.is_unique and b.row.is_monotonic_increasing
+    assert_array_equal(b.values, x.values[b.row.values])
+
+    # a one-shot iterator needs the counts first, or to be given as a callable
+    sampler = StreamingUndersamplingClassBalancer(y='target', ratio=0.25)
+    assert_fails(sampler.balance, ValueError, iter(chunks))
+    assert sampler.balance(lambda: iter(chunks)).shape[0] == 50
+    assert_fails(sampler.balance, ValueError, iter(chunks))  # counts_ is not reused implicitly
+    assert sampler.count(chunks).balance(iter(chunks), use_counts=True).shape[0] == 50
+    assert_fails(StreamingUndersamplingClassBalancer(y='target').balance, ValueError, chunks, True)
+
+    # each call counts its own chunks...
+    assert sampler.balance(chunks[4:]).shape[0] == 32
+    assert sampler.counts_[0] == 22
+
+    # ...and counts that don't match the chunks are caught
+    assert_fails(sampler.count(chunks).balance, ValueError, chunks[4:], True)
+    assert_fails(sampler.count(chunks[4:]).balance, ValueError, chunks, True)
+
+    # nothing to do when the classes are balanced enough
+    b = StreamingUndersamplingClassBalancer(y='target', shuffle=False).balance([X.iloc[:75], X.iloc[75:]])
+    assert_array_equal(b.values, X.values)
+
+
 def test_unneeded():
     for sample_class in (UndersamplingClassBalancer, 
                          SMOTEClassBalancer, 
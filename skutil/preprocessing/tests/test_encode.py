@@ -1,6 +1,7 @@
 import numpy as np
 from numpy.testing import assert_array_equal
-from skutil.preprocessing import OneHotCategoricalEncoder
+from skutil.preprocessing import OneHotCategoricalEncoder, SafeLabelEncoder
+from skutil.testing import assert_fails
 import pandas as pd
 
 # Def data for testing
@@ -35,3 +36,93 @@ def test_encode_1():
     # assert default is pd DF
     o = OneHotCategoricalEncoder().fit(x)
     assert isinstance(o.transform(x), pd.DataFrame)
+
+
+def test_safe_label_encoder():
+    encoder = SafeLabelEncoder().fit(['b', 'a', 'c', 'a'])
+    assert_array_equal(encoder.classes_, ['a', 'b', 'c'])
+
+    # seen values get their sorted position, anything else the unseen value
+    e = encoder.transform(np.array(['c', 'd', 'a', None, np.nan, 'b'], dtype=object))
+    assert_array_equal(e, [2, 99999, 0, 99999, 99999, 1])
+
+    # fit_transform agrees with transform, for numerics as well
+    y = np.array([3, 1, 2, 3])
+    encoder = SafeLabelEncoder()
+    assert_array_equal(encoder.fit_transform(y), encoder.transform(y))
+    assert_array_equal(encoder.transform([1, 4, 3]), [0, 99999, 2])
+
+    # classes_ replaced with as many different classes rebuilds the lookup
+    encoder.classes_ = np.array([4, 5, 6])
+    assert_array_equal(encoder.transform([1, 4, 6]), [99999, 0, 2])
+
+
+def test_encode_sparse():
+    from scipy import sparse
+
+    o = OneHotCategoricalEncoder(sparse_output=True).fit(x)
+    dense = OneHotCategoricalEncoder(as_df=False).fit(x)
+    assert o.one_hot_ is None
+    assert o.trans_nms_ == dense.trans_nms_
+
+    t = o.transform(x)
+    assert sparse.isspmatrix_csr(t)
+    assert t.shape == (3, len(o.trans_nms_))
+    assert_array_equal(t.toarray(), dense.transform(x))
+
+    # unseen and missing levels land in the NA columns
+    y = pd.DataFrame.from_records(data=np.array([['CAN', 'BLU', 'c'], ['USA', None, 'a']], dtype=object),
+                                  columns=['A', 'B', 'C'])
+    y['n'] = np.array([7, 0])
+    assert_array_equal(o.transform(y).toarray(), dense.transform(y))
+
+    # no object columns at all
+    t = OneHotCategoricalEncoder(sparse_output=True).fit(x[['n']]).transform(x[['n']])
+    assert_array_equal(t.toarray(), [[5.], [6.], [7.]])
+
+
+def test_encode_hashing():
+    from scipy import sparse
+
+    o = OneHotCategoricalEncoder(hashing=8).fit(x)
+    assert o.lab_encoders_ == []
+    assert o.trans_nms_[:2] == ['n', 'A.hash0']
+    assert len(o.trans_nms_) == 1 + 3 * 8
+
+    t = o.transform(x)
+    assert sparse.isspmatrix_csr(t)
+    assert t.shape == (3, 25)
+    assert_array_equal(t[:, 0].toarray().ravel(), [5, 6, 7])
+
+    # one signed entry per object column, each in its own block of buckets
+    hashed = t[:, 1:].toarray()
+    assert_array_equal(np.abs(hashed).sum(axis=1), [3, 3, 3])
+    for i in range(3):
+        assert_array_equal(np.abs(hashed[:, i * 8:(i + 1) * 8]).sum(axis=1), [1, 1, 1])
+
+    # equal levels hash equally, and hashing needs no fit-time vocabulary
+    assert_array_equal(hashed[0, 8:16], hashed[2, 8:16])  # both 'RED'
+    y = pd.DataFrame.from_records(data=np.array([['CAN', 'RED', 'zzz']]), columns=['A', 'B', 'C'])
+    y['n'] = np.array([7])
+    assert_array_equal(o.transform(y)[:, 9:17].toarray(), hashed[[0], 8:16])
+
+    # the global scope shares its buckets, and agrees when run in parallel
+    o = OneHotCategoricalEncoder(hashing=1000, hash_scope='global', n_jobs=2).fit(x)
+    assert len(o.trans_nms_) == 1001
+    t = o.transform(x)
+    assert t.shape == (3, 1001)
+    assert_array_equal(np.abs(t[:, 1:].toarray()).sum(axis=1), [3, 3, 3])
+    serial = OneHotCategoricalEncoder(hashing=1000, hash_scope='global').fit(x).transform(x)
+    assert_array_equal(serial.toarray(), t.toarray())
+
+    for kwargs in ({'hashing': 0}, {'hashing': 8, 'hash_scope': 'bad'}):
+        assert_fails(OneHotCategoricalEncoder(**kwargs).fit, ValueError, x)
+
+    # without pandas' hash_array, only hashing is unavailable
+    from skutil.preprocessing import encode
+    hash_array, encode.hash_array = encode.hash_array, None
+    try:
+        assert_fails(OneHotCategoricalEncoder(hashing=8).fit, ImportError, x)
+        OneHotCategoricalEncoder().fit(x)
+    finally:
+        encode.hash_array = hash_array
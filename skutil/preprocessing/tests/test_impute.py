@@ -56,6 +56,76 @@ def test_bagged_imputer():
     assert null_ct == 0, 'expected no nulls but got %i' % null_ct
 
 
+def test_bagged_imputer_column_parallel():
+    rs = np.random.RandomState(42)
+    X = pd.DataFrame.from_records(data=rs.rand(300, 5), columns=['a', 'b', 'c', 'd', 'e'])
+    X = X.mask(rs.rand(*X.shape) < 0.1)
+
+    # fitting the columns in parallel should not change the imputations
+    serial = BaggedImputer(random_state=42).fit_transform(X.copy())
+    imputer = BaggedImputer(random_state=42, column_n_jobs=2)
+    parallel = imputer.fit_transform(X.copy())
+    assert parallel.isnull().sum().sum() == 0
+    assert np.allclose(serial.values, parallel.values)
+
+    # the target column is never among the features it's modeled on
+    for col, kv in imputer.models_.items():
+        assert col not in kv['feature_names']
+        assert len(kv['feature_names']) == 4
+
+
+def test_bagged_imputer_transform():
+    rs = np.random.RandomState(42)
+    nms = ['a', 'b', 'c', 'd']
+    X = pd.DataFrame.from_records(data=rs.rand(300, 4), columns=nms)
+    X = X.mask(rs.rand(*X.shape) < 0.1)
+    imputer = BaggedImputer(random_state=42).fit(X)
+
+    # complete frames pass through untouched
+    Z = pd.DataFrame.from_records(data=rs.rand(50, 4), columns=nms)
+    assert np.array_equal(imputer.transform(Z.copy()).values, Z.values)
+
+    # only the missing cells are written, each with its column's model
+    Z['e'] = 'x'
+    Z.iloc[[3, 7], [0, 1, 2]] = np.nan
+    imputed = imputer.transform(Z.copy())
+    assert imputed[nms].isnull().sum().sum() == 0
+    assert (imputed['e'] == 'x').all()
+    assert np.array_equal(imputed.drop([3, 7])[nms].values, Z.drop([3, 7])[nms].values)
+
+    design = Z[nms].iloc[[3]].fillna(imputer.fill)
+    expected = imputer.models_['a']['model'].predict(design[['b', 'c', 'd']].values)
+    assert np.allclose(imputed.loc[3, 'a'], expected)
+
+
+def test_bagged_imputer_max_train_rows():
+    rs = np.random.RandomState(42)
+    X = pd.DataFrame.from_records(data=rs.rand(1000, 4), columns=['a', 'b', 'c', 'd'])
+    X = X.mask(rs.rand(*X.shape) < np.array([0.5, 0.1, 0.1, 0.02]))
+
+    # without a cap, every observed row is used
+    imputer = BaggedImputer(random_state=42).fit(X)
+    for col, kv in imputer.models_.items():
+        assert kv['n_train_rows'] == X[col].notnull().sum()
+
+    for sampling in ('uniform', 'stratified'):
+        imputer = BaggedImputer(random_state=42, max_train_rows=200, sampling=sampling)
+        imputed = imputer.fit_transform(X.copy())
+        assert imputed.isnull().sum().sum() == 0
+        for col, kv in imputer.models_.items():
+            assert 0 < kv['n_train_rows'] <= 200
+
+    # stratified allocation is proportional to each missingness pattern
+    from skutil.preprocessing.impute import _sample_train_rows
+    missing = X.isnull().values
+    sample = _sample_train_rows(missing, 200, 'stratified', np.random.RandomState(42))
+    assert sample.shape[0] == np.unique(sample).shape[0] == 200
+    assert np.allclose(missing[sample].mean(axis=0), missing.mean(axis=0), atol=0.01)
+
+    assert_fails(BaggedImputer(max_train_rows=200, sampling='bad').fit, ValueError, X)
+    assert_fails(BaggedImputer(max_train_rows=0).fit, ValueError, X)
+
+
 def test_bagged_imputer_classification():
     iris = load_iris()
 
@@ -153,6 +223,72 @@ def test_selective_imputer():
     assert_fails(SelectiveImputer(fill=SomeObject()).fit, TypeError, a)
 
 
+def test_selective_imputer_partial_fit():
+    rs = np.random.RandomState(42)
+    X = pd.DataFrame(rs.normal(size=(5000, 3)), columns=['a', 'b', 'c'])
+    X['c'] = rs.randint(0, 5, 5000).astype(float)
+    X[rs.rand(5000, 3) < 0.1] = np.nan
+    chunks = np.array_split(np.arange(5000), 9)
+
+    # each strategy, streamed in chunks, approximates the full fit
+    for fill in ('mean', 'median', 'mode', ['median', 7, 'mode']):
+        imputer = SelectiveImputer(fill=fill)
+        for chunk in chunks:
+            imputer.partial_fit(X.iloc[chunk])
+        expected = SelectiveImputer(fill=fill).fit(X).fills_
+
+        assert sorted(imputer.fills_.keys()) == sorted(expected.keys())
+        col_fills = dict(zip(X.columns, fill if isinstance(fill, list) else [fill] * 3))
+        for c, f in col_fills.items():
+            if f == 'median' and c != 'c':
+                # within the sketch's rank error
+                rank = (X[c] < imputer.fills_[c]).sum() / float(X[c].notnull().sum())
+                assert abs(rank - 0.5) < 0.001, (fill, c, rank)
+            elif f == 'mode' and c != 'c':
+                # every value of a continuous column is (about) as common
+                assert imputer.fills_[c] in X[c].values
+            else:
+                # c only has a few distinct values
+                assert abs(imputer.fills_[c] - expected[c]) < 1e-12, (fill, c)
+
+    # small streams are exact, and a fit discards the accumulators
+    imputer = SelectiveImputer(fill='median', median_error=0.01).partial_fit(X.iloc[:50])
+    assert imputer.fills_['a'] == np.nanmedian(X['a'].values[:50])
+    assert not hasattr(imputer.fit(X), 'accumulators_')
+
+    # numeric fills don't need any statistics
+    imputer = SelectiveImputer(fill=-1).partial_fit(X)
+    assert imputer.fills_ == -1
+
+
+def test_quantile_sketch():
+    from skutil.preprocessing.impute import _QuantileSketch, _FrequencyTable
+    rs = np.random.RandomState(42)
+    x = rs.exponential(size=200000)
+
+    # the rank error is bounded, and merged sketches are as good
+    sketch = _QuantileSketch(error=0.005)
+    others = [_QuantileSketch(error=0.005).update(chunk) for chunk in np.array_split(x, 4)]
+    for chunk in np.array_split(x, 20):
+        sketch.update(chunk)
+    merged = others[0].merge(others[1]).merge(others[2]).merge(others[3])
+
+    for s in (sketch, merged):
+        for q in (0.1, 0.5, 0.9):
+            assert abs((x < s.quantile(q)).mean() - q) < 0.005
+        assert sum(level.shape[0] for level in s.levels) < 200 * 20
+
+    assert_fails(_QuantileSketch, ValueError, 0.)
+
+    # a frequent value survives a bounded table of a long tail
+    values = np.concatenate([np.repeat(-1, 1000), np.arange(20000)])
+    table = _FrequencyTable(capacity=50)
+    for chunk in np.array_split(rs.permutation(values), 13):
+        table.update(chunk)
+    assert table.value() == -1
+    assert table.counts.shape[0] <= 50
+
+
 def test_bagged_imputer_errors():
     nms = ['a', 'b', 'c', 'd', 'e']
     X = _random_X(500, 5, nms)
@@ -190,3 +326,48 @@ def test_bagged_imputer_errors():
     except ValueError:
         failed = True
     assert failed, 'Expected imputation with categorical feature to fail'
+
+
+def test_selective_knn_imputer():
+    nan = np.nan
+    X = pd.DataFrame.from_records(data=np.array([
+        [1.0, 2.0, 3.0],
+        [nan, 2.2, nan],
+        [2.0, 4.0, 6.0],
+        [1.2, 2.4, 3.2]]), columns=['a', 'b', 'c'])
+
+    # both missing columns are imputed from the same two neighbors
+    imputed = SelectiveKNNImputer(n_neighbors=2).fit_transform(X.copy())
+    assert np.allclose(imputed.iloc[1].values, [1.1, 2.2, 3.1])
+    assert np.array_equal(imputed.drop(1).values, X.drop(1).values)
+
+    # distance weighting favors the nearer neighbor
+    imputed = SelectiveKNNImputer(n_neighbors=2, weights='distance').fit_transform(X.copy())
+    assert 1.1 < imputed.loc[1, 'a'] < 1.2
+
+    # only the selected cols are imputed, in batches
+    imputer = SelectiveKNNImputer(cols=['a'], n_neighbors=2, batch_size=1, algorithm='ball_tree')
+    imputed = imputer.fit_transform(X.copy())
+    assert np.isclose(imputed.loc[1, 'a'], 1.1)
+    assert np.isnan(imputed.loc[1, 'c'])
+    assert imputer.reference_.shape == (3, 1)
+
+    # matches a brute-force neighbor search on larger data
+    rs = np.random.RandomState(42)
+    X = pd.DataFrame.from_records(data=rs.rand(500, 5), columns=['a', 'b', 'c', 'd', 'e'])
+    X = X.mask(rs.rand(*X.shape) < 0.05)
+    imputer = SelectiveKNNImputer(n_neighbors=3, batch_size=7, n_jobs=2).fit(X)
+    imputed = imputer.transform(X.copy())
+    assert imputed.isnull().sum().sum() == 0
+
+    values = X.values
+    complete = values[~np.isnan(values).any(axis=1)]
+    row = np.flatnonzero(np.isnan(values).any(axis=1))[0]
+    query = np.where(np.isnan(values[row]), complete.mean(axis=0), values[row])
+    nearest = np.argsort(((complete - query) ** 2).sum(axis=1))[:3]
+    assert np.allclose(imputed.iloc[row].values, np.where(np.isnan(values[row]),
+                                                          complete[nearest].mean(axis=0), values[row]))
+
+    assert_fails(SelectiveKNNImputer(algorithm='brute').fit, ValueError, X)
+    assert_fails(SelectiveKNNImputer(weights='bad').fit, ValueError, X)
+    assert_fails(SelectiveKNNImputer(n_neighbors=1000).fit, ValueError, X)
@@ -1,8 +1,12 @@
 from __future__ import print_function
+import os
+import tempfile
 import numpy as np
 import pandas as pd
 from numpy.testing import (assert_array_equal, assert_array_almost_equal)
+from sklearn.base import clone
 from sklearn.datasets import load_iris
+from sklearn.preprocessing import MinMaxScaler, RobustScaler, StandardScaler
 from skutil.preprocessing import *
 from skutil.decomposition import *
 from skutil.utils import validate_is_pd
@@ -59,6 +63,80 @@ def test_boxcox():
     assert_fails(BoxCoxTransformer().fit, ValueError, X.iloc[0])
     assert_fails(BoxCoxTransformer().fit, ValueError, np.random.rand(1, 5))
 
+    # parallel and float32 transforms match the serial float64 transform
+    transformed = transformer.transform(x)
+    assert_array_equal(BoxCoxTransformer(n_jobs=2).fit(x).transform(x).values, transformed.values)
+    t32 = BoxCoxTransformer(dtype=np.float32).fit(X).transform(X)
+    assert all(t32.dtypes == np.float32)
+    assert_array_almost_equal(t32.values, BoxCoxTransformer().fit(X).transform(X).values, decimal=4)
+    assert_fails(BoxCoxTransformer(dtype=int).fit(x).transform, ValueError, x)
+
+    # a zero lambda is the (truncated) log
+    transformer.lambda_ = dict((k, 0.) for k in transformer.lambda_)
+    assert_array_almost_equal(transformer.transform(X).values, np.log(X.values + np.array(dict_values(transformer.shift_))))
+
+    # only the selected columns are transformed
+    cols = ['sepal length (cm)']
+    transformed = BoxCoxTransformer(cols=cols).fit(x).transform(x)
+    assert_array_equal(transformed.drop(cols, axis=1).values, x.drop(cols, axis=1).values)
+
+
+def test_lambda_subsample():
+    rs = np.random.RandomState(42)
+    x = pd.DataFrame(rs.chisquare(3, size=(2000, 3)), columns=['a', 'b', 'c'])
+
+    for est in (BoxCoxTransformer, YeoJohnsonTransformer):
+        # without a limit, every row is used and there is no diagnostic
+        transformer = est().fit(x)
+        assert transformer.lambda_stability_ is None
+        assert not hasattr(transformer, 'reservoir_')
+        assert transformer.n_samples_seen_ == 2000
+
+        # a limit samples the rows, and reports the stability of the lambdas
+        sampled = est(max_fit_rows=500, random_state=42).fit(x)
+        assert sampled.reservoir_.shape == (500, 3)
+        assert sorted(sampled.lambda_stability_.keys()) == ['a', 'b', 'c']
+        assert sampled.lambda_ == est(max_fit_rows=500, random_state=42).fit(x).lambda_
+        assert_array_almost_equal(dict_values(sampled.lambda_), dict_values(transformer.lambda_), decimal=0)
+        assert_fails(est(max_fit_rows=1).fit, ValueError, x)
+
+        # partial_fit keeps a bounded reservoir of the rows seen so far
+        streamed = est(max_fit_rows=500, random_state=42)
+        for chunk in np.array_split(np.arange(2000), 8):
+            streamed.partial_fit(x.iloc[chunk])
+        assert streamed.n_samples_seen_ == 2000
+        assert streamed.reservoir_.shape == (500, 3)
+        assert streamed.lambda_stability_ is not None
+        assert_array_almost_equal(dict_values(streamed.lambda_), dict_values(transformer.lambda_), decimal=0)
+        assert isinstance(streamed.transform(x), pd.DataFrame)
+        assert_fails(streamed.partial_fit, ValueError, x[['a', 'b']])
+
+    # the BoxCox shifts are computed from all the rows seen, not just the sample
+    x['a'] -= 10
+    streamed = BoxCoxTransformer(max_fit_rows=10, random_state=1)
+    streamed.partial_fit(x.iloc[:1000]).partial_fit(x.iloc[1000:])
+    assert_array_almost_equal(streamed.shift_['a'], np.abs(x['a'].min()) + 1e-6)
+    assert streamed.shift_ == BoxCoxTransformer().fit(x).shift_
+
+
+def test_reservoir_update():
+    from skutil.preprocessing.transform import _reservoir_update
+    rs = np.random.RandomState(42)
+
+    # every row of the stream should be kept with equal probability
+    counts = np.zeros(100)
+    for _ in range(500):
+        reservoir = np.empty((0, 1))
+        for chunk in np.array_split(np.arange(100.).reshape(-1, 1), 7):
+            reservoir = _reservoir_update(reservoir, int(chunk[0, 0]), chunk, 10, rs)
+        assert reservoir.shape == (10, 1)
+        assert np.unique(reservoir).shape[0] == 10
+        counts[reservoir.ravel().astype(int)] += 1
+
+    # each expected 50 times
+    assert np.abs(counts - 50).max() < 30
+    assert np.abs(counts[:50].sum() - counts[50:].sum()) < 250
+
 
 def test_function_mapper():
     Y = np.array([['USA', 'RED', 'a'],
@@ -91,6 +169,36 @@ def test_function_mapper():
     # Test on non-function
     assert_fails(FunctionMapper(fun='woo-hoo').fit, ValueError, x)
 
+    # chunks of columns in parallel give the same result
+    t = FunctionMapper(fun=fun, n_jobs=2).fit_transform(x)
+    assert t['D'].dtype == float and t['E'].dtype == float
+    assert_array_equal(t.values, FunctionMapper(fun=fun).fit_transform(x).values)
+
+    t = FunctionMapper(fun=np.sqrt, n_jobs=2, backend='multiprocessing').fit_transform(X)
+    assert_array_equal(t.values, np.sqrt(X.values))
+
+    # a vectorized function is applied to the whole block at once
+    expected = X.apply(np.log)
+    for n_jobs in (1, 2):
+        t = FunctionMapper(fun=np.log, vectorized=True, n_jobs=n_jobs).fit_transform(X)
+        assert t.columns.tolist() == X.columns.tolist()
+        assert_array_almost_equal(t.values, expected.values)
+
+    # only the selected columns, and kwargs are passed along
+    t = FunctionMapper(cols=X.columns[:2], fun=np.round, vectorized=True, decimals=0).fit_transform(X)
+    assert_array_equal(t[X.columns[:2]].values, np.round(X[X.columns[:2]].values))
+    assert_array_equal(t[X.columns[2:]].values, X[X.columns[2:]].values)
+
+    # kwargs meant for fun that share a name with our own params raise
+    def fun_with_jobs(x, n_jobs=1):
+        return x * n_jobs
+
+    assert_fails(FunctionMapper(fun=fun_with_jobs, n_jobs=2).fit, ValueError, X)
+    assert_array_equal(FunctionMapper(fun=fun_with_jobs).fit_transform(X).values, X.values)
+
+    # a vectorized function must preserve the shape
+    assert_fails(FunctionMapper(fun=np.ravel, vectorized=True).fit_transform, ValueError, X)
+
 
 def test_interactions():
     x_dict = {
@@ -150,6 +258,65 @@ def test_interactions():
     actual_names = sorted(X_trans.columns.tolist())
     assert all([expected_names[i] == actual_names[i] for i in range(len(expected_names))])
 
+    # a vectorized custom function matches the pairwise one, in any number of threads
+    expected = InteractionTermTransformer(interaction_function=cust_add).fit_transform(X_pd)
+    for n_jobs in (1, 2):
+        trans = InteractionTermTransformer(interaction_function=np.add, vectorized=True, n_jobs=n_jobs)
+        X_trans = trans.fit_transform(X_pd)
+        assert X_trans.columns.tolist() == expected.columns.tolist()
+        assert_array_equal(X_trans.values, expected.values)
+
+    # the products are aligned with the index, and other columns keep their dtypes
+    X_pd.index = [9, 7, 5, 3]
+    X_pd['e'] = ['w', 'x', 'y', 'z']
+    X_trans = InteractionTermTransformer(cols=['a', 'b', 'c'], n_jobs=2).fit_transform(X_pd)
+    assert X_trans.index.tolist() == [9, 7, 5, 3]
+    assert X_trans['e'].tolist() == ['w', 'x', 'y', 'z']
+    assert_array_equal(X_trans['b_c_I'].values, (X_pd['b'] * X_pd['c']).values)
+
+    # sparse and memmap outputs match the dense output
+    X_pd = X_pd[['a', 'b', 'c', 'd']]
+    for only in (False, True):
+        expected = InteractionTermTransformer(only_return_interactions=only).fit_transform(X_pd)
+
+        trans = InteractionTermTransformer(only_return_interactions=only, output='sparse').fit(X_pd)
+        X_trans = trans.transform(X_pd)
+        assert X_trans.format == 'csr'
+        assert_array_equal(X_trans.toarray(), expected.values)
+        assert trans.interaction_names_ == expected.columns.tolist()[-6:]
+
+        X_trans = InteractionTermTransformer(only_return_interactions=only, output='memmap',
+                                             max_block_bytes=8, n_jobs=2).fit_transform(X_pd)
+        assert X_trans.columns.tolist() == expected.columns.tolist()
+        assert_array_equal(X_trans.values, expected.values)
+
+    # the temporary memmap file is removed with the result
+    trans = InteractionTermTransformer(output='memmap', as_df=False).fit(X_pd)
+    X_trans = trans.transform(X_pd)
+    if os.name == 'posix':
+        assert not os.path.exists(X_trans.filename)
+    assert not hasattr(trans, 'memmap_file_')
+
+    # a fixed path is not overwritten while a prior result still maps it
+    from skutil.preprocessing.transform import _live_memmaps
+    path = os.path.join(tempfile.mkdtemp(), 'interactions.mmap')
+    trans = InteractionTermTransformer(output='memmap', memmap_path=path).fit(X_pd)
+    X_trans = trans.transform(X_pd)
+    assert _live_memmaps.get(os.path.abspath(path)) is not None
+    assert_fails(trans.transform, ValueError, X_pd)
+    del X_trans
+    assert_array_equal(trans.transform(X_pd).values, InteractionTermTransformer().fit_transform(X_pd).values)
+    os.remove(path)
+
+    # sparse output needs a vectorized function, and numeric columns
+    X_trans = InteractionTermTransformer(interaction_function=np.multiply, vectorized=True,
+                                         output='sparse').fit_transform(X_pd)
+    assert_array_equal(X_trans.toarray(), InteractionTermTransformer().fit_transform(X_pd).values)
+    assert_fails(InteractionTermTransformer(interaction_function=cust_add, output='sparse').fit, ValueError, X_pd)
+    assert_fails(InteractionTermTransformer(output='csv').fit, ValueError, X_pd)
+    trans = InteractionTermTransformer(cols=['a', 'b'], output='sparse').fit(X_pd)
+    assert_fails(trans.transform, ValueError, X_pd.assign(e=['w', 'x', 'y', 'z']))
+
 
 def test_yeo_johnson():
     transformer = YeoJohnsonTransformer().fit(X)  # will fit on all cols
@@ -177,6 +344,28 @@ def test_yeo_johnson():
 
     YeoJohnsonTransformer().fit(x)
 
+    # the vectorized transform matches the piecewise definition
+    from skutil.preprocessing.transform import _yj_transform_y, _yj_llf, _yj_normmax_block
+    y, lam = x[:, 0], 0.5
+    expected = np.array([((v + 1) ** lam - 1) / lam if v >= 0 else
+                         -((-v + 1) ** (2 - lam) - 1) / (2 - lam) for v in y])
+    assert_array_almost_equal(_yj_transform_y(y, lam), expected)
+    assert_array_almost_equal(_yj_transform_y(np.abs(y), 0.), np.log1p(np.abs(y)))
+
+    # batched lambdas don't depend on the block layout (n_jobs)
+    transformer = YeoJohnsonTransformer().fit(x)
+    assert transformer.lambda_ == YeoJohnsonTransformer(n_jobs=2).fit(x).lambda_
+    assert_array_almost_equal(transformer.transform(x).values,
+                              YeoJohnsonTransformer(n_jobs=2).fit(x).transform(x).values)
+
+    # and each column's lambda is a minimizer of the negative LLF
+    x = np.random.RandomState(42).chisquare(3, size=(500, 4))
+    lambdas = _yj_normmax_block(x.copy())
+    for j, lmb in enumerate(lambdas):
+        best = _yj_llf(x[:, j], lmb)
+        assert best >= _yj_llf(x[:, j], lmb + 1e-3)
+        assert best >= _yj_llf(x[:, j], lmb - 1e-3)
+
 
 # TODO: more
 
@@ -209,6 +398,31 @@ def test_spatial_sign():
     assert isinstance(SpatialSignTransformer(as_df=False).fit_transform(X), np.ndarray)
     assert transformer.cols is None
 
+    # features are divided by their squared norms, in any number of chunks or threads
+    expected = X / (X ** 2).sum()
+    for chunk_size, n_jobs in ((None, 1), (7, 1), (7, 2)):
+        transformer = SpatialSignTransformer(chunk_size=chunk_size, n_jobs=n_jobs).fit(X)
+        assert_array_almost_equal(transformer.transform(X).values, expected.values)
+
+    # the row projection puts every row on the unit sphere
+    x = X.copy()
+    x.iloc[0] = 0.
+    transformed = SpatialSignTransformer(projection='row', chunk_size=10).fit_transform(x)
+    assert_array_almost_equal(np.sqrt((transformed.iloc[1:] ** 2).sum(axis=1)), np.ones(x.shape[0] - 1))
+    assert_array_equal(transformed.iloc[0].values, np.zeros(4))
+    rows = x.values[1:]
+    assert_array_almost_equal(transformed.values[1:], rows / np.sqrt((rows ** 2).sum(axis=1))[:, np.newaxis])
+
+    # only the selected cols are projected, into the provided buffer
+    cols = X.columns[:2]
+    transformer = SpatialSignTransformer(cols=cols, projection='row').fit(X)
+    out = np.empty((X.shape[0], 2))
+    assert transformer.transform(X, out=out) is out
+    assert_array_almost_equal(out, transformer.transform(X)[cols].values)
+    assert_array_equal(transformer.transform(X)[X.columns[2:]].values, X[X.columns[2:]].values)
+    assert_fails(transformer.transform, ValueError, X, np.empty((2, 2)))
+    assert_fails(SpatialSignTransformer(projection='column').fit, ValueError, X)
+
 
 def test_strange_input():
     # test numpy array input with numeric cols
@@ -245,3 +459,17 @@ def test_selective_scale():
 
     # test the selective mixin
     assert isinstance(transformer.cols, list)
+
+    # fitting in chunks matches fitting on the whole frame
+    for scaler in (StandardScaler(), MinMaxScaler()):
+        transformer = SelectiveScaler(cols=cols, scaler=scaler)
+        for chunk in np.array_split(np.arange(X.shape[0]), 7):
+            transformer.partial_fit(X.iloc[chunk])
+        expected = SelectiveScaler(cols=cols, scaler=clone(scaler)).fit_transform(X)
+        assert_array_almost_equal(transformer.transform(X).values, expected.values)
+
+        # the constructor parameter is not replaced by the fit clone
+        assert transformer.get_params()['scaler'] is scaler
+        assert not hasattr(scaler, 'scale_')
+
+    assert_fails(SelectiveScaler(scaler=RobustScaler()).partial_fit, TypeError, X)
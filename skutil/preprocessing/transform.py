@@ -1,18 +1,26 @@
 # -*- coding: utf-8 -*-
 
 from __future__ import print_function, absolute_import, division
+import abc
+import os
+import tempfile
+import weakref
 import numpy as np
 import pandas as pd
-from scipy import optimize
+from scipy import sparse
 from scipy.stats import boxcox
-from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.base import BaseEstimator, TransformerMixin, clone
 from sklearn.externals import six
 from sklearn.externals.joblib import Parallel, delayed
 from sklearn.preprocessing import StandardScaler
+from sklearn.utils import gen_even_slices, _get_n_jobs, check_random_state
+from sklearn.utils.fixes import signature
+from sklearn.utils.random import sample_without_replacement
 from sklearn.utils.validation import check_is_fitted
 from skutil.base import *
 from ..utils import *
 from ..utils.fixes import _cols_if_none
+from ..utils.util import __min_log__
 
 __all__ = [
     'BoxCoxTransformer',
@@ -31,6 +39,9 @@ EPS = 1e-12
 # A very small number used to represent zero.
 ZERO = 1e-16
 
+# The reservoir size used by ``partial_fit`` when ``max_fit_rows`` is None
+MAX_RESERVOIR_ROWS = 100000
+
 
 # Helper funtions:
 def _eqls(lam, v):
@@ -43,6 +54,93 @@ def _validate_rows(X):
         raise ValueError('n_samples should be at least two, but got %i' % m)
 
 
+def _validate_float_dtype(dtype):
+    dtype = np.dtype(dtype)
+    if not np.issubdtype(dtype, np.floating):
+        raise ValueError('dtype must be a float type, but got %s' % str(dtype))
+    return dtype
+
+
+def _apply_column_blocks(fun, X, n_jobs, *col_args, **kwargs):
+    """Apply ``fun`` in-place over column blocks of the 2d array ``X``,
+    in parallel if ``n_jobs`` != 1. Each of ``col_args`` should be an array
+    with one element per column of ``X``; each call receives the slice of
+    ``X`` and of each ``col_args`` array corresponding to its block. Since
+    the work is dominated by numpy ufuncs (which release the GIL), this uses
+    the threading backend so the blocks can be written into ``X`` directly.
+
+    Parameters
+    ----------
+
+    fun : callable
+        The function to apply to each block: ``fun(X_block, *col_arg_blocks)``
+
+    X : np.ndarray, shape=(n_samples, n_features)
+        The (ideally column-major) array to transform in-place
+
+    n_jobs : int
+        The number of threads to use
+
+    col_args : np.ndarray, shape=(n_features,)
+        Per-column arguments to pass along with each block
+
+    kwargs : dict
+        Keyword arguments passed (un-sliced) to each call
+    """
+    n_features = X.shape[1]
+    n_jobs = min(_get_n_jobs(n_jobs), n_features)
+
+    if n_jobs <= 1:
+        fun(X, *col_args, **kwargs)
+    else:
+        Parallel(n_jobs=n_jobs, backend='threading')(
+            delayed(fun)(X[:, s], *[a[s] for a in col_args], **kwargs)
+            for s in gen_even_slices(n_features, n_jobs))
+    return X
+
+
+def _arg_names(fun):
+    """The names of the arguments ``fun`` accepts, or an empty
+    set if its signature cannot be inspected (e.g., a ufunc).
+    """
+    try:
+        return set(signature(fun).parameters)
+    except (TypeError, ValueError):
+        return set()
+
+
+def _assign_columns(X, cols, out):
+    """Replace the ``cols`` of ``X`` with the columns of the 2d array ``out``.
+    If every column of ``X`` is replaced, ``out`` backs the returned frame
+    directly, rather than being copied column by column.
+
+    Parameters
+    ----------
+
+    X : Pandas ``DataFrame``
+        The frame (which may be modified in place)
+
+    cols : array_like, shape=(n_cols,)
+        The names of the columns to replace
+
+    out : np.ndarray, shape=(n_samples, n_cols)
+        The new columns
+
+    Returns
+    -------
+
+    X : Pandas ``DataFrame``
+        The frame with replaced columns
+    """
+    if list(cols) == X.columns.tolist():
+        return pd.DataFrame(out, index=X.index, columns=X.columns)
+
+    # assigning whole columns (rather than X[cols] = out) lets their dtypes change
+    for j, nm in enumerate(cols):
+        X[nm] = out[:, j]
+    return X
+
+
 class FunctionMapper(BaseSkutil, TransformerMixin):
     """Apply a function to a column or set of columns.
 
@@ -62,6 +160,30 @@ class FunctionMapper(BaseSkutil, TransformerMixin):
         one another). Therefore, the callable should accept an array-like
         argument.
 
+    vectorized : bool, optional (default=False)
+        Whether ``fun`` should be called once on the entire block of columns
+        rather than once per column. If True, ``fun`` receives a 2d ``np.ndarray``
+        of shape (n_samples, n_cols) and must return an array of the same shape.
+        Most numpy functions (such as ``np.log``) can be applied this way, and
+        are much faster than being applied one Pandas ``Series`` at a time.
+
+    n_jobs : int, 1 by default
+       The number of jobs used to apply ``fun`` to chunks of columns
+       in parallel. If -1 all CPUs are used.
+
+    backend : str, optional (default='threading')
+        The joblib backend used when ``n_jobs`` is not 1. 'threading' is best
+        for functions that release the GIL (most numpy functions), while
+        'multiprocessing' is better for pure-Python functions, but requires
+        ``fun`` (and each chunk of columns) to be picklable.
+
+    **kwargs : keyword args, optional
+        Any keyword arguments to pass to ``fun``. Note that ``vectorized``,
+        ``n_jobs`` and ``backend`` are consumed by the ``FunctionMapper``
+        itself, and are never passed to ``fun``. If ``fun`` accepts an
+        argument of one of these names and it is set to a non-default value,
+        ``fit`` raises a ValueError rather than silently withholding it.
+
 
     Attributes
     ----------
@@ -102,10 +224,13 @@ class FunctionMapper(BaseSkutil, TransformerMixin):
 
     """
 
-    def __init__(self, cols=None, fun=None, **kwargs):
+    def __init__(self, cols=None, fun=None, vectorized=False, n_jobs=1, backend='threading', **kwargs):
         super(FunctionMapper, self).__init__(cols=cols)
 
         self.fun = fun
+        self.vectorized = vectorized
+        self.n_jobs = n_jobs
+        self.backend = backend
         self.kwargs = kwargs
 
     def fit(self, X, y=None):
@@ -143,6 +268,13 @@ class FunctionMapper(BaseSkutil, TransformerMixin):
             if not hasattr(self.fun, '__call__'):
                 raise ValueError('passed fun arg is not a function')
 
+            # our own params shadow any kwargs of the same name meant for fun
+            fun_params = _arg_names(self.fun)
+            for name, default in (('vectorized', False), ('n_jobs', 1), ('backend', 'threading')):
+                if name in fun_params and getattr(self, name) != default:
+                    raise ValueError('fun accepts an argument named %r, but %s=%r is used by '
+                                     'the FunctionMapper and is not passed to fun' % (name, name, getattr(self, name)))
+
         # since we aren't checking is fit, we should set
         # an arbitrary value to show validation has already occurred
         self.is_fit_ = True
@@ -175,13 +307,99 @@ class FunctionMapper(BaseSkutil, TransformerMixin):
         X, _ = validate_is_pd(X, self.cols)
         cols = _cols_if_none(X, self.cols)
 
-        # apply the function
-        # TODO: do we want to change the behavior to where the function
-        # should accept an entire frame and not a series?
-        X[cols] = X[cols].apply(lambda x: self.fun(x, **self.kwargs))
+        # apply the function to chunks of columns (in parallel)
+        n_jobs = min(_get_n_jobs(self.n_jobs), len(cols))
+        slices = list(gen_even_slices(len(cols), n_jobs)) if n_jobs > 1 else [slice(0, len(cols))]
+        mapper = _map_block if self.vectorized else _map_columns
+        chunks = [mapper(self.fun, X[cols], self.kwargs)] if n_jobs <= 1 else \
+            Parallel(n_jobs=n_jobs, backend=self.backend)(
+                delayed(mapper)(self.fun, X[cols[s]], self.kwargs) for s in slices)
+
+        # write the results into one preallocated array if they share a
+        # dtype (a single vectorized result already is such an array)
+        if self.vectorized and len(chunks) == 1:
+            out = chunks[0]
+        elif self.vectorized:
+            out = np.empty((X.shape[0], len(cols)), dtype=np.result_type(*chunks), order='F')
+            for s, chunk in zip(slices, chunks):
+                out[:, s] = chunk
+        elif len(set(c.dtype for chunk in chunks for c in chunk)) == 1:
+            out = np.empty((X.shape[0], len(cols)), dtype=chunks[0][0].dtype, order='F')
+            for s, chunk in zip(slices, chunks):
+                for j, c in zip(range(s.start, s.stop), chunk):
+                    out[:, j] = c
+        else:
+            out = None
+
+        if out is not None:
+            return _assign_columns(X, cols, out)
+
+        for nm, c in zip(cols, [c for chunk in chunks for c in chunk]):
+            X[nm] = c
         return X
 
 
+def _map_block(fun, X, kwargs):
+    """Apply the vectorized ``fun`` to the 2d block of values of ``X``.
+
+    Parameters
+    ----------
+
+    fun : callable
+        The function to apply
+
+    X : Pandas ``DataFrame``, shape=(n_samples, n_cols)
+        The chunk of columns
+
+    kwargs : dict
+        The keyword args for ``fun``
+
+    Returns
+    -------
+
+    result : np.ndarray, shape=(n_samples, n_cols)
+        The transformed chunk
+    """
+    result = np.asarray(fun(X.values, **kwargs))
+    if result.shape != X.shape:
+        raise ValueError('vectorized fun should return an array of shape %r, but got %r'
+                         % (X.shape, result.shape))
+    return result
+
+
+def _map_columns(fun, X, kwargs):
+    """Apply ``fun`` to each column of ``X``, one Pandas ``Series``
+    at a time.
+
+    Parameters
+    ----------
+
+    fun : callable
+        The function to apply
+
+    X : Pandas ``DataFrame``, shape=(n_samples, n_cols)
+        The chunk of columns
+
+    kwargs : dict
+        The keyword args for ``fun``
+
+    Returns
+    -------
+
+    columns : list, shape=(n_cols,)
+        The transformed columns (as ``np.ndarray``)
+    """
+    columns = []
+    for nm in X.columns:
+        result = fun(X[nm], **kwargs)
+
+        # align to the frame as the Pandas apply would
+        if isinstance(result, pd.Series):
+            result = result.reindex(X.index)
+        columns.append(np.asarray(result))
+    return columns
+
+
 def _mul(a, b):
     """Multiplies two series objects
     (no validation since internally used).
@@ -206,6 +424,130 @@ def _mul(a, b):
     return (a * b).values
 
 
+def _interaction_names(cols, suffix):
+    """The names of the interaction terms of ``cols``, in the order of
+    the N choose 2 loop, in the form of <feature_x>_<feature_y>_<suffix>.
+    """
+    n_features = len(cols)
+    return ['%s_%s_%s' % (cols[i], cols[j], suffix)
+            for i in range(n_features - 1) for j in range(i + 1, n_features)]
+
+
+def _interaction_block(out, left, right, values, interaction=None, vectorized=True):
+    """Compute a block of interaction terms in-place. The pairs are
+    ordered by their left operand, so the block is a sequence of runs
+    sharing a left column ``i``, each of which interacts ``values[:, i]``
+    with a contiguous range of right columns at once.
+
+    Parameters
+    ----------
+
+    out : np.ndarray, shape=(n_samples, n_pairs)
+        The array into which the interaction terms are written
+
+    left : np.ndarray, shape=(n_pairs,)
+        The index of the left column of each pair
+
+    right : np.ndarray, shape=(n_pairs,)
+        The index of the right column of each pair
+
+    values : np.ndarray or Pandas ``DataFrame``, shape=(n_samples, n_features)
+        The selected columns. Must be a ``DataFrame`` if ``vectorized`` is False.
+
+    interaction : callable or None, optional (default=None)
+        The interaction function. If None, the product is written
+        directly into ``out``.
+
+    vectorized : bool, optional (default=True)
+        Whether ``interaction`` operates on 2d blocks (see ``InteractionTermTransformer``)
+        or on pairs of Pandas ``Series``.
+    """
+    if not vectorized:
+        for k, (i, j) in enumerate(zip(left, right)):
+            out[:, k] = interaction(values.iloc[:, i], values.iloc[:, j])
+        return out
+
+    # the boundaries of the runs of pairs sharing a left column
+    bounds = np.concatenate(([0], np.flatnonzero(np.diff(left)) + 1, [left.shape[0]]))
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        i, j0, j1 = left[start], right[start], right[stop - 1] + 1
+        a, b = values[:, i:i + 1], values[:, j0:j1]
+
+        if interaction is None:
+            np.multiply(a, b, out=out[:, start:stop])
+        else:
+            out[:, start:stop] = interaction(a, b)
+    return out
+
+
+def _sparse_interactions(S, interaction=None):
+    """Compute the pairwise interaction terms of the columns of a CSR
+    matrix directly in CSR form. Only the pairs of nonzero elements within
+    each row are interacted, so ``interaction`` must map zero operands to zero.
+
+    Parameters
+    ----------
+
+    S : scipy.sparse.csr_matrix, shape=(n_samples, n_features)
+        The selected columns
+
+    interaction : callable or None, optional (default=None)
+        A vectorized interaction function (see ``InteractionTermTransformer``).
+        If None, the products are computed.
+
+    Returns
+    -------
+
+    interactions : scipy.sparse.csr_matrix, shape=(n_samples, n_features * (n_features - 1) / 2)
+        The interaction terms, in the same column order as the dense output
+    """
+    S = sparse.csr_matrix(S)
+    S.sum_duplicates()  # also sorts the indices
+    n_samples, n_features = S.shape
+    row_nnz = np.diff(S.indptr)
+
+    # each nonzero is the left operand of a pair with every later nonzero in its row
+    position = np.arange(S.nnz) - np.repeat(S.indptr[:-1], row_nnz)
+    n_right = np.repeat(row_nnz, row_nnz) - position - 1
+    left = np.repeat(np.arange(S.nnz), n_right)
+    starts = np.cumsum(n_right) - n_right
+    right = left + 1 + np.arange(left.shape[0]) - np.repeat(starts, n_right)
+
+    # the output column of the pair (i, j), i < j, as in the N choose 2 loop
+    i, j = S.indices[left], S.indices[right]
+    offsets = np.cumsum(np.arange(n_features - 1, -1, -1)) - np.arange(n_features - 1, -1, -1)
+    columns = offsets[i] + j - i - 1
+
+    a, b = S.data[left], S.data[right]
+    data = a * b if interaction is None else np.asarray(interaction(a.reshape(-1, 1), b.reshape(-1, 1))).ravel()
+
+    # since the indices were sorted, so are the pairs within each row
+    indptr = np.concatenate(([0], np.cumsum(row_nnz * (row_nnz - 1) // 2)))
+    interactions = sparse.csr_matrix((data, columns, indptr),
+                                     shape=(n_samples, n_features * (n_features - 1) // 2))
+    interactions.eliminate_zeros()
+    return interactions
+
+
+def _hstack_csr(a, b):
+    """Horizontally stack two CSR matrices with the same number of rows.
+    Unlike ``scipy.sparse.hstack``, this does not go through COO (and sort
+    every element); since all of the columns of ``a`` precede those of ``b``,
+    each row of the result is just the row of ``a`` followed by that of ``b``.
+    """
+    nnz_a, nnz_b = np.diff(a.indptr), np.diff(b.indptr)
+    indptr = a.indptr + b.indptr
+    dest_a = np.arange(a.nnz) + np.repeat(b.indptr[:-1], nnz_a)
+    dest_b = np.arange(b.nnz) + np.repeat(a.indptr[1:], nnz_b)
+
+    data = np.empty(a.nnz + b.nnz, dtype=np.result_type(a.dtype, b.dtype))
+    indices = np.empty(a.nnz + b.nnz, dtype=np.result_type(a.indices.dtype, b.indices.dtype))
+    data[dest_a], data[dest_b] = a.data, b.data
+    indices[dest_a], indices[dest_b] = a.indices, b.indices + a.shape[1]
+
+    return sparse.csr_matrix((data, indices, indptr), shape=(a.shape[0], a.shape[1] + b.shape[1]))
+
+
 class InteractionTermTransformer(BaseSkutil, TransformerMixin):
     """A class that will generate interaction terms between selected columns.
     An interaction captures some relationship between two independent variables
@@ -241,6 +583,56 @@ class InteractionTermTransformer(BaseSkutil, TransformerMixin):
         If set to True, will only return features in feature_names
         and their respective generated interaction terms.
 
+    vectorized : bool, optional (default=False)
+        Whether ``interaction_function`` accepts blocks of columns rather than
+        pairs of Pandas ``Series``. If True, the function will be called as
+        ``fun(a, b)``, where ``a`` is a single column with shape (n_samples, 1)
+        and ``b`` is a block of columns with shape (n_samples, n_block), and
+        must return the block of elementwise interactions of ``a`` with each
+        column of ``b``, i.e., an array with shape (n_samples, n_block). Any
+        function composed of numpy ufuncs (such as ``np.add``) broadcasts this
+        way, and will be much faster than being called once per pair. The
+        default interaction (multiplication) is always vectorized.
+
+    n_jobs : int, 1 by default
+       The number of threads used to compute blocks of interaction
+       terms at once. If -1 all CPUs are used.
+
+    output : str, optional (default='dense')
+        How the transformed matrix is stored. One of ('dense', 'sparse', 'memmap'):
+
+        * 'dense' stores the result in memory.
+
+        * 'sparse' computes only the interactions of nonzero elements, directly
+          in CSR form, and returns a ``scipy.sparse.csr_matrix`` (regardless of
+          ``as_df``) whose column names are the returned columns of ``X`` followed
+          by ``interaction_names_``. The interaction function must be the default
+          or ``vectorized``, and must map zero operands to zero. This is far
+          cheaper for sparse inputs, such as dummy-encoded features.
+
+        * 'memmap' writes the result into an ``np.memmap``, one block of
+          interaction terms at a time (see ``max_block_bytes``), which is
+          flushed to disk after each block.
+
+        For 'sparse' and 'memmap', the returned columns of ``X`` must be numeric.
+
+    max_block_bytes : int or None, optional (default=None)
+        The maximum size in bytes of each block of interaction terms that is
+        computed at once (split among the ``n_jobs`` threads). This bounds the
+        temporary memory used by custom interaction functions and, for the
+        'memmap' output, the amount of output held in memory before it is
+        flushed. If None, all of the terms are computed in a single block.
+
+    memmap_path : str or None, optional (default=None)
+        The file backing the 'memmap' output. If None, a temporary file is
+        created in the default temporary directory for each call to
+        ``transform``; on POSIX systems it is unlinked as soon as it is
+        mapped, so it is removed once the result is garbage collected
+        (elsewhere, it is left for the caller to delete; its path is the
+        ``filename`` of the returned ``np.memmap`` when ``as_df`` is False).
+        If set, the file is overwritten by each call to ``transform``, which
+        raises a ValueError if the result of a prior call still maps it.
+
 
     Attributes
     ----------
@@ -248,6 +640,9 @@ class InteractionTermTransformer(BaseSkutil, TransformerMixin):
     fun_ : callable
         The interaction term function
 
+    interaction_names_ : list
+        The names of the interaction terms generated from the fit columns
+
 
     Examples
     --------
@@ -276,12 +671,18 @@ class InteractionTermTransformer(BaseSkutil, TransformerMixin):
     """
 
     def __init__(self, cols=None, as_df=True, interaction_function=None,
-                 name_suffix='I', only_return_interactions=False):
+                 name_suffix='I', only_return_interactions=False, vectorized=False,
+                 n_jobs=1, output='dense', max_block_bytes=None, memmap_path=None):
 
         super(InteractionTermTransformer, self).__init__(cols=cols, as_df=as_df)
         self.interaction_function = interaction_function
         self.name_suffix = name_suffix
         self.only_return_interactions = only_return_interactions
+        self.vectorized = vectorized
+        self.n_jobs = n_jobs
+        self.output = output
+        self.max_block_bytes = max_block_bytes
+        self.memmap_path = memmap_path
 
     def fit(self, X, y=None):
         """Fit the transformer.
@@ -316,6 +717,13 @@ class InteractionTermTransformer(BaseSkutil, TransformerMixin):
         if len(cols) < 2:
             raise ValueError('need at least two columns')
 
+        # validate output
+        if self.output not in ('dense', 'sparse', 'memmap'):
+            raise ValueError('output must be one of (dense, sparse, memmap), but got %s' % str(self.output))
+        if self.output == 'sparse' and not (self.fun_ is _mul or self.vectorized):
+            raise ValueError('sparse output requires a vectorized interaction_function')
+
+        self.interaction_names_ = _interaction_names(cols, self.name_suffix)
         return self
 
     def transform(self, X):
@@ -342,29 +750,106 @@ class InteractionTermTransformer(BaseSkutil, TransformerMixin):
         cols = _cols_if_none(X, self.cols)
 
         n_features = len(cols)
-        suff = self.name_suffix
 
         fun = self.fun_
-        append_dict = {}
-        interaction_names = [x for x in cols]
+        interaction = None if fun is _mul else fun
+        vectorized = fun is _mul or self.vectorized
+        prefix = X[cols] if self.only_return_interactions else X
+        output = self.output
+
+        if output != 'dense' and any(dt == object for dt in prefix.dtypes):
+            raise ValueError('%s output requires all returned columns to be numeric' % output)
+
+        # compute only the nonzero interactions, and stack them onto the returned columns
+        if output == 'sparse':
+            S = sparse.csr_matrix(X[cols].values)
+            P = S if self.only_return_interactions else sparse.csr_matrix(prefix.values)
+            return _hstack_csr(P, _sparse_interactions(S, interaction))
+
+        # the pairs of column indices in the same order as the N choose 2 loop
+        left, right = np.triu_indices(n_features, 1)
+        n_pairs = left.shape[0]
+        interaction_names = _interaction_names(cols, self.name_suffix)
+
+        # for custom functions, probe the output dtype on a couple of rows of the first pair
+        if vectorized:
+            values = np.asfortranarray(X[cols].values)
+            dtype = values.dtype if fun is _mul else np.result_type(fun(values[:2, :1], values[:2, 1:2]))
+        else:
+            values = X[cols]
+            dtype = np.asarray(fun(values.iloc[:2, 0], values.iloc[:2, 1])).dtype
+
+        # if the columns being returned along with the interactions share their dtype,
+        # preallocate one array for all of them so the frame needn't be concatenated
+        if output == 'memmap':
+            dtype = np.result_type(dtype, *prefix.dtypes.values)
+            n_prefix = prefix.shape[1]
+            result = _open_memmap(self.memmap_path, dtype, (X.shape[0], n_prefix + n_pairs))
+        else:
+            n_prefix = prefix.shape[1] if all(dt == dtype for dt in prefix.dtypes) else 0
+            result = np.empty((X.shape[0], n_prefix + n_pairs), dtype=dtype, order='F')
+
+        if n_prefix:
+            result[:, :n_prefix] = prefix.values
+
+        # compute the interactions in blocks of at most max_block_bytes
+        block_size = n_pairs
+        if self.max_block_bytes is not None:
+            block_size = max(1, int(self.max_block_bytes // (max(X.shape[0], 1) * dtype.itemsize)))
+
+        for start in range(0, n_pairs, block_size):
+            block = slice(start, min(start + block_size, n_pairs))
+            _apply_column_blocks(_interaction_block, result[:, n_prefix + block.start:n_prefix + block.stop],
+                                 self.n_jobs, left[block], right[block], values=values,
+                                 interaction=interaction, vectorized=vectorized)
+            if output == 'memmap':
+                result.flush()
+
+        # attach the names once (the memmap is only wrapped, not copied)
+        if not self.as_df and n_prefix:
+            return result
+        elif n_prefix:
+            X = pd.DataFrame(result, index=X.index, columns=list(prefix.columns) + interaction_names)
+        else:
+            X = pd.concat([prefix, pd.DataFrame(result, index=X.index, columns=interaction_names)], axis=1)
 
-        # we can do this in N^2 or we can do it in the uglier N choose 2...
-        for i in range(n_features - 1):
-            for j in range(i + 1, n_features):
-                col_i, col_j = cols[i], cols[j]
-                new_nm = '%s_%s_%s' % (col_i, col_j, suff)
-                append_dict[new_nm] = fun(X[col_i], X[col_j])
-                interaction_names.append(new_nm)
+        # return matrix if needed
+        return X if self.as_df else X.as_matrix()
 
-        # create DF 2:
-        df2 = pd.DataFrame.from_dict(append_dict)
-        X = pd.concat([X, df2], axis=1)
 
-        # if we only want to keep interaction names, filter now
-        X = X if not self.only_return_interactions else X[interaction_names]
+# The np.memmap results of InteractionTermTransformer, keyed on the
+# absolute path of their file, for as long as they (or views of them)
+# are alive, so that a fixed memmap_path is never overwritten in use.
+_live_memmaps = weakref.WeakValueDictionary()
 
-        # return matrix if needed
-        return X if self.as_df else X.as_matrix()
+
+def _open_memmap(memmap_path, dtype, shape):
+    """Open a new, writable np.memmap of ``shape`` for the 'memmap' output
+    of the InteractionTermTransformer, backed by ``memmap_path`` or, if None,
+    by a temporary file. No estimator state is kept: the path of the file is
+    the ``filename`` of the returned memmap.
+    """
+    if memmap_path is None:
+        fd, path = tempfile.mkstemp(suffix='.mmap')
+        os.close(fd)
+    else:
+        # 'w+' truncates the file, which would overwrite a result still in use
+        path = os.path.abspath(memmap_path)
+        if _live_memmaps.get(path) is not None:
+            raise ValueError('memmap_path %r still backs the result of a previous '
+                             'transform; release that result or use another path' % path)
+
+    result = np.memmap(path, dtype=dtype, mode='w+', shape=shape, order='F')
+    if memmap_path is None:
+        # the mapping outlives the name on POSIX, so the file goes with the result
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+    else:
+        _live_memmaps[path] = result
+
+    return result
 
 
 class SelectiveScaler(BaseSkutil, TransformerMixin):
@@ -409,6 +894,12 @@ class SelectiveScaler(BaseSkutil, TransformerMixin):
         the ``fit`` method, which performs some validation, to ensure the
         ``scaler`` parameter has been validated.
 
+    scaler_ : instance of a sklearn Scaler
+        The fit scaler used by ``transform``. After ``fit``, this is
+        ``scaler`` itself; after ``partial_fit``, an unfit clone of
+        ``scaler`` updated with each chunk, so that ``scaler`` is left
+        as it was passed in.
+
 
     Examples
     --------
@@ -466,11 +957,55 @@ class SelectiveScaler(BaseSkutil, TransformerMixin):
 
         # throws exception if the cols don't exist
         self.scaler.fit(X[cols])
+        self.scaler_ = self.scaler
 
         # this is our fit param
         self.is_fit_ = True
         return self
 
+    def partial_fit(self, X, y=None):
+        """Update the scaler's statistics with a chunk of the training
+        frame. This allows the scaler to be fit on a frame too large for
+        memory. It requires a ``scaler`` that implements ``partial_fit``
+        (``StandardScaler``, ``MinMaxScaler`` or ``MaxAbsScaler``). For
+        the ``StandardScaler``, the means and variances of the chunks are
+        merged with Chan et al.'s pairwise update, so they match those of
+        a single ``fit`` on the whole frame.
+
+        Parameters
+        ----------
+
+        X : Pandas ``DataFrame``
+            The next chunk of the frame to fit. The chunk will only
+            be fit on the prescribed ``cols`` (see ``__init__``) or
+            all of them if ``cols`` is None.
+
+        y : None
+            Passthrough for ``sklearn.pipeline.Pipeline``. Even
+            if explicitly set, will not change behavior of ``partial_fit``.
+
+        Returns
+        -------
+
+        self
+        """
+        if not hasattr(self.scaler, 'partial_fit'):
+            raise TypeError('%s does not implement partial_fit' % type(self.scaler).__name__)
+
+        # check on state of X and cols
+        X, self.cols = validate_is_pd(X, self.cols)
+        cols = _cols_if_none(X, self.cols)
+
+        # the first chunk starts from an unfit copy of the scaler, so that
+        # statistics are never accumulated into a (shared) fit instance, and
+        # the constructor parameter is left as it was passed in
+        if not hasattr(self, 'scaler_'):
+            self.scaler_ = clone(self.scaler)
+
+        self.scaler_.partial_fit(X[cols])
+        self.is_fit_ = True
+        return self
+
     def transform(self, X):
         """Transform a test matrix given the already-fit transformer.
 
@@ -494,12 +1029,227 @@ class SelectiveScaler(BaseSkutil, TransformerMixin):
         X, _ = validate_is_pd(X, self.cols)
         cols = _cols_if_none(X, self.cols)
 
-        # Fails through if cols don't exist or if the scaler isn't fit yet
-        X[cols] = self.scaler.transform(X[cols])
+        check_is_fitted(self, 'scaler_')
+
+        # Fails through if cols don't exist
+        X[cols] = self.scaler_.transform(X[cols])
         return X if self.as_df else X.as_matrix()
 
 
-class BoxCoxTransformer(BaseSkutil, TransformerMixin):
+def _reservoir_update(reservoir, n_seen, X, max_rows, random_state):
+    """Update a uniform row reservoir of at most ``max_rows`` rows with the
+    rows of ``X``, given that ``n_seen`` rows have already been offered to it.
+    This is a vectorized version of Vitter's Algorithm R: each new row with
+    (zero-based) position ``t`` in the stream replaces a uniformly chosen slot
+    with probability ``max_rows / (t + 1)``.
+
+    Parameters
+    ----------
+
+    reservoir : np.ndarray, shape (n_rows, n_features)
+        The current reservoir, where ``n_rows <= max_rows``
+
+    n_seen : int
+        The number of rows previously offered to the reservoir
+
+    X : np.ndarray, shape (n_samples, n_features)
+        The new rows
+
+    max_rows : int
+        The capacity of the reservoir
+
+    random_state : RandomState
+        The random state used to draw the replaced slots
+
+    Returns
+    -------
+
+    reservoir : np.ndarray, shape (n_rows, n_features)
+        The updated reservoir (which might be the same object)
+    """
+    n_fill = min(max(max_rows - reservoir.shape[0], 0), X.shape[0])
+    if n_fill:
+        reservoir = np.concatenate((reservoir, X[:n_fill]))
+
+    n_rest = X.shape[0] - n_fill
+    if n_rest:
+        # the stream position of each remaining row, and the slot it would replace
+        position = np.arange(n_seen + n_fill, n_seen + X.shape[0])
+        slots = (random_state.random_sample(n_rest) * (position + 1)).astype(np.int64)
+        rows = np.where(slots < max_rows)[0]
+        slots = slots[rows]
+
+        # if several rows draw the same slot, the latest one wins
+        _, last = np.unique(slots[::-1], return_index=True)
+        last = slots.shape[0] - 1 - last
+        reservoir[slots[last]] = X[n_fill + rows[last]]
+
+    return reservoir
+
+
+class _BaseLambdaTransformer(six.with_metaclass(abc.ABCMeta, BaseSkutil, TransformerMixin)):
+    """The base class for the power transformers that estimate a lambda for
+    each feature via maximum likelihood. Since the estimates converge long
+    before every row of a very large frame has been seen, the lambdas can be
+    estimated on a uniform sample of at most ``max_fit_rows`` rows, either
+    drawn from ``X`` in ``fit`` or maintained as a reservoir over successive
+    calls to ``partial_fit``.
+
+    Parameters
+    ----------
+
+    cols : array_like, shape=(n_features,), optional (default=None)
+        The names of the columns on which to apply the transformation.
+
+    n_jobs : int, 1 by default
+       The number of jobs to use for the computation.
+
+    as_df : bool, optional (default=True)
+        Whether to return a Pandas ``DataFrame`` in the ``transform``
+        method.
+
+    max_fit_rows : int or None, optional (default=None)
+        The maximum number of rows on which to estimate the lambdas.
+
+    random_state : int, RandomState or None, optional (default=None)
+        The seed or random state used to sample the rows.
+    """
+
+    def __init__(self, cols=None, n_jobs=1, as_df=True, max_fit_rows=None, random_state=None):
+        super(_BaseLambdaTransformer, self).__init__(cols=cols, as_df=as_df)
+        self.n_jobs = n_jobs
+        self.max_fit_rows = max_fit_rows
+        self.random_state = random_state
+
+    def _validate_max_rows(self, default=None):
+        max_rows = self.max_fit_rows if self.max_fit_rows is not None else default
+        if max_rows is not None and max_rows < 2:
+            raise ValueError('max_fit_rows should be at least two, but got %i' % max_rows)
+        return max_rows
+
+    def fit(self, X, y=None):
+        """Fit the transformer. If ``max_fit_rows`` is set and ``X`` has
+        more rows than that, the lambdas are estimated on a uniform random
+        sample of ``max_fit_rows`` rows, which is kept as the reservoir for
+        any subsequent calls to ``partial_fit``.
+
+        Parameters
+        ----------
+
+        X : Pandas ``DataFrame``
+            The Pandas frame to fit. The frame will only
+            be fit on the prescribed ``cols`` (see ``__init__``) or
+            all of them if ``cols`` is None. Furthermore, ``X`` will
+            not be altered in the process of the fit.
+
+        y : None
+            Passthrough for ``sklearn.pipeline.Pipeline``. Even
+            if explicitly set, will not change behavior of ``fit``.
+
+        Returns
+        -------
+
+        self
+        """
+        # check on state of X and cols
+        X, self.cols = validate_is_pd(X, self.cols, assert_all_finite=True)  # creates a copy -- we need all to be finite
+        cols = _cols_if_none(X, self.cols)
+
+        # ensure enough rows
+        _validate_rows(X)
+        max_rows = self._validate_max_rows()
+
+        self._reset()
+        sample = X[cols].values
+        n_samples = sample.shape[0]
+        self.n_samples_seen_ = n_samples
+        self.data_min_ = sample.min(axis=0)
+
+        if max_rows is not None and n_samples > max_rows:
+            self.random_state_ = check_random_state(self.random_state)
+            idcs = np.sort(sample_without_replacement(n_samples, max_rows, random_state=self.random_state_))
+            sample = self.reservoir_ = np.array(sample[idcs], dtype=np.float64)
+
+        self._fit_sample(cols, sample)
+        return self
+
+    def partial_fit(self, X, y=None):
+        """Update the reservoir with the rows in ``X``, and re-estimate the
+        lambdas from it. The reservoir is a uniform sample of at most
+        ``max_fit_rows`` (or, if None, 100,000) of all the rows passed to
+        ``partial_fit`` so far, so the cost of each call is bounded regardless
+        of how many rows have been seen. If the transformer was last ``fit``
+        on all of the rows of a frame, a new reservoir is started.
+
+        Parameters
+        ----------
+
+        X : Pandas ``DataFrame``
+            The next chunk of the frame to fit. Must contain the
+            same columns as the previous chunks.
+
+        y : None
+            Passthrough for ``sklearn.pipeline.Pipeline``. Even
+            if explicitly set, will not change behavior of ``partial_fit``.
+
+        Returns
+        -------
+
+        self
+        """
+        X, self.cols = validate_is_pd(X, self.cols, assert_all_finite=True)
+        cols = _cols_if_none(X, self.cols)
+        max_rows = self._validate_max_rows(default=MAX_RESERVOIR_ROWS)
+        chunk = np.array(X[cols].values, dtype=np.float64)
+
+        if not hasattr(self, 'reservoir_'):
+            self._reset()
+            self.random_state_ = check_random_state(self.random_state)
+            self.reservoir_ = np.empty((0, len(cols)))
+            self.n_samples_seen_ = 0
+            self.data_min_ = chunk.min(axis=0) if chunk.shape[0] else np.full(len(cols), np.inf)
+        elif self.reservoir_.shape[1] != len(cols):
+            raise ValueError('expected %i features, but got %i' % (self.reservoir_.shape[1], len(cols)))
+        elif chunk.shape[0]:
+            self.data_min_ = np.minimum(self.data_min_, chunk.min(axis=0))
+
+        self.reservoir_ = _reservoir_update(self.reservoir_, self.n_samples_seen_,
+                                            chunk, max_rows, self.random_state_)
+        self.n_samples_seen_ += chunk.shape[0]
+
+        # need at least two rows in the reservoir to estimate anything
+        _validate_rows(self.reservoir_)
+        self._fit_sample(cols, self.reservoir_)
+        return self
+
+    def _reset(self):
+        for attr in ('reservoir_', 'random_state_', 'lambda_stability_'):
+            if hasattr(self, attr):
+                delattr(self, attr)
+
+    def _fit_sample(self, cols, sample):
+        """Estimate the lambdas on ``sample``. If the sample is only part of
+        the rows seen, the lambdas are also estimated on two disjoint random
+        halves of it, and their absolute difference is recorded as the
+        stability diagnostic.
+        """
+        self.lambda_ = dict(zip(cols, self._estimate_lambdas(sample)))
+        self.lambda_stability_ = None
+
+        n_rows = sample.shape[0]
+        half = n_rows // 2
+        if n_rows < self.n_samples_seen_ and half >= 2:
+            perm = self.random_state_.permutation(n_rows)
+            first = self._estimate_lambdas(sample[np.sort(perm[:half])])
+            second = self._estimate_lambdas(sample[np.sort(perm[half:2 * half])])
+            self.lambda_stability_ = dict(zip(cols, np.abs(first - second)))
+
+    @abc.abstractmethod
+    def _estimate_lambdas(self, sample):
+        """Estimate the lambda of each column of the 2d array ``sample``"""
+
+
+class BoxCoxTransformer(_BaseLambdaTransformer):
     """Estimate a lambda parameter for each feature, and transform
        it to a distribution more-closely resembling a Gaussian bell
        using the Box-Cox transformation.
@@ -538,6 +1288,21 @@ class BoxCoxTransformer(BaseSkutil, TransformerMixin):
         method. In the ``transform`` method, if any of the test data is less than zero 
         after shifting, it will be truncated at the ``shift_amt`` value.
 
+    dtype : float type, optional (default=np.float64)
+        The float type of the transformed columns. Using ``np.float32`` halves
+        the memory required to transform very large frames, at the cost of
+        precision.
+
+    max_fit_rows : int or None, optional (default=None)
+        If set, the lambdas are estimated on a uniform random sample of at most
+        this many rows rather than on every row of the frame (the shifts are still
+        computed from every row). This bounds the cost of ``fit`` for very
+        large frames, and is also the size of the reservoir kept by ``partial_fit``.
+
+    random_state : int, RandomState or None, optional (default=None)
+        The seed or random state used to sample the rows when ``max_fit_rows``
+        is exceeded, or to maintain the ``partial_fit`` reservoir.
+
 
     Attributes
     ----------
@@ -548,56 +1313,47 @@ class BoxCoxTransformer(BaseSkutil, TransformerMixin):
 
     lambda_ : dict
        The lambda values corresponding to each feature
-    """
-
-    def __init__(self, cols=None, n_jobs=1, as_df=True, shift_amt=1e-6):
-        super(BoxCoxTransformer, self).__init__(cols=cols, as_df=as_df)
-        self.n_jobs = n_jobs
-        self.shift_amt = shift_amt
-
-    def fit(self, X, y=None):
-        """Fit the transformer.
 
-        Parameters
-        ----------
+    lambda_stability_ : dict or None
+       If the lambdas were estimated on a sample of the rows, the absolute
+       difference between the lambdas estimated on two disjoint random halves
+       of the sample, for each feature. This is roughly twice the standard error
+       of each lambda; large values indicate ``max_fit_rows`` is too small. None
+       if every row was used.
 
-        X : Pandas ``DataFrame``
-            The Pandas frame to fit. The frame will only
-            be fit on the prescribed ``cols`` (see ``__init__``) or
-            all of them if ``cols`` is None. Furthermore, ``X`` will
-            not be altered in the process of the fit.
+    n_samples_seen_ : int
+       The number of rows seen by ``fit`` or (cumulatively) by ``partial_fit``
 
-        y : None
-            Passthrough for ``sklearn.pipeline.Pipeline``. Even
-            if explicitly set, will not change behavior of ``fit``.
+    data_min_ : np.ndarray, shape=(n_features,)
+       The minimum of each feature over all the rows seen
 
-        Returns
-        -------
-
-        self
-        """
-        # check on state of X and cols
-        X, self.cols = validate_is_pd(X, self.cols, assert_all_finite=True)  # creates a copy -- we need all to be finite
-        cols = _cols_if_none(X, self.cols)
+    reservoir_ : np.ndarray, shape=(n_rows, n_features)
+       The sample of rows on which the lambdas were estimated. Only
+       present if the lambdas were estimated on a sample.
+    """
 
-        # ensure enough rows
-        _validate_rows(X)
+    def __init__(self, cols=None, n_jobs=1, as_df=True, shift_amt=1e-6, dtype=np.float64,
+                 max_fit_rows=None, random_state=None):
+        super(BoxCoxTransformer, self).__init__(cols=cols, n_jobs=n_jobs, as_df=as_df,
+                                                max_fit_rows=max_fit_rows, random_state=random_state)
+        self.shift_amt = shift_amt
+        self.dtype = dtype
 
-        # First step is to compute all the shifts needed, then add back to X...
-        min_Xs = X[cols].min(axis=0)
-        shift = np.array([np.abs(x) + self.shift_amt if x <= 0.0 else 0.0 for x in min_Xs])
-        X[cols] += shift
+    def _fit_sample(self, cols, sample):
+        # First step is to compute all the shifts needed (from the min of every row seen)
+        shift = np.array([np.abs(x) + self.shift_amt if x <= 0.0 else 0.0 for x in self.data_min_])
 
         # now put shift into a dict
         self.shift_ = dict(zip(cols, shift))
 
-        # Now estimate the lambdas in parallel
-        self.lambda_ = dict(zip(cols,
-                                Parallel(n_jobs=self.n_jobs)(
-                                    delayed(_estimate_lambda_single_y)
-                                    (X[i].tolist()) for i in cols)))
+        # estimate the lambdas on the shifted sample
+        super(BoxCoxTransformer, self)._fit_sample(cols, sample + shift)
 
-        return self
+    def _estimate_lambdas(self, sample):
+        # Now estimate the lambdas in parallel
+        return np.array(Parallel(n_jobs=self.n_jobs)(
+            delayed(_estimate_lambda_single_y)
+            (sample[:, j]) for j in range(sample.shape[1])))
 
     def transform(self, X):
         """Transform a test matrix given the already-fit transformer.
@@ -622,26 +1378,51 @@ class BoxCoxTransformer(BaseSkutil, TransformerMixin):
         # check on state of X and cols
         X, _ = validate_is_pd(X, self.cols, assert_all_finite=True)
         cols = _cols_if_none(X, self.cols)
+        dtype = _validate_float_dtype(self.dtype)
 
-        _, n_features = X.shape
-        lambdas_, shifts_ = self.lambda_, self.shift_
+        lambdas = np.array([self.lambda_[nm] for nm in cols])
+        shifts = np.array([self.shift_[nm] for nm in cols])
 
-        # Add the shifts in, and if they're too low,
-        # we have to truncate at some low value: 1e-6
-        for nm in cols:
-            X[nm] += shifts_[nm]
+        # a single column-major float copy of only the selected
+        # columns, which is shifted, truncated and transformed in-place
+        trans = np.array(X[cols].values, dtype=dtype, order='F')
+        _apply_column_blocks(_bc_transform_block, trans, self.n_jobs,
+                             lambdas, shifts, shift_amt=self.shift_amt)
 
-        # If the shifts are too low, truncate...
-        X = X.apply(lambda x: x.apply(lambda y: np.maximum(self.shift_amt, y)))
+        X[cols] = trans
+        return X if self.as_df else X.as_matrix()
 
-        # do transformations
-        for nm in cols:
-            X[nm] = _transform_y(X[nm].tolist(), lambdas_[nm])
 
-        return X if self.as_df else X.as_matrix()
+def _bc_transform_block(X, lambdas, shifts, shift_amt):
+    """Transform a (column-major) float block in-place, given the
+    lambda and shift of each column. No validation performed.
+
+    Parameters
+    ----------
+
+    X : np.ndarray, shape (n_samples, n_features)
+       The block being transformed
+
+    lambdas : np.ndarray, shape (n_features,)
+       The lambda values used for the transformation
+
+    shifts : np.ndarray, shape (n_features,)
+       The shift to add to each column
+
+    shift_amt : float
+       The value at which to truncate the columns after shifting
+    """
+    # Add the shifts in, and if they're too low,
+    # we have to truncate at some low value: 1e-6
+    X += shifts
+    np.maximum(X, shift_amt, out=X)
 
+    for j, lam in enumerate(lambdas):
+        _transform_y(X[:, j], lam, out=X[:, j])
+    return X
 
-def _transform_y(y, lam):
+
+def _transform_y(y, lam, out=None):
     """Transform a single y, given a single lambda value.
     No validation performed.
     
@@ -651,15 +1432,30 @@ def _transform_y(y, lam):
     y : array_like, shape (n_samples,)
        The vector being transformed
        
-    lam : ndarray, shape (n_lambdas,)
+    lam : float
        The lambda value used for the transformation
+
+    out : np.ndarray or None, shape (n_samples,)
+       If provided, the array into which the result is written.
+       May be ``y`` itself.
     """
-    # ensure np array
-    y = np.array(y)
-    y_prime = np.array([(np.power(x, lam) - 1) / lam if not _eqls(lam, ZERO) else log(x) for x in y])
+    # ensure float np array
+    y = np.asarray(y, dtype=out.dtype if out is not None else np.float64)
+    if out is None:
+        out = np.empty_like(y)
+
+    if not _eqls(lam, ZERO):
+        np.power(y, lam, out=out)
+        out -= 1
+        out /= lam
+    else:
+        # equivalent to the sanitized utils.log
+        np.maximum(y, 0, out=out)
+        with np.errstate(divide='ignore'):
+            np.log(out, out=out)
+        np.maximum(out, __min_log__, out=out)
 
-    # rarely -- very rarely -- we can get a NaN. Why?
-    return y_prime
+    return out
 
 
 def _estimate_lambda_single_y(y):
@@ -683,7 +1479,7 @@ def _estimate_lambda_single_y(y):
     return b[1]
 
 
-class YeoJohnsonTransformer(BaseSkutil, TransformerMixin):
+class YeoJohnsonTransformer(_BaseLambdaTransformer):
     """Estimate a lambda parameter for each feature, and transform
        it to a distribution more-closely resembling a Gaussian bell
        using the Yeo-Johnson transformation.
@@ -715,53 +1511,49 @@ class YeoJohnsonTransformer(BaseSkutil, TransformerMixin):
         Since most skutil transformers depend on explicitly-named
         ``DataFrame`` features, the ``as_df`` parameter is True by default.
 
+    max_fit_rows : int or None, optional (default=None)
+        If set, the lambdas are estimated on a uniform random sample of at most
+        this many rows rather than on every row of the frame. This bounds the
+        cost of ``fit`` for very large frames, and is also the size of the
+        reservoir kept by ``partial_fit``.
+
+    random_state : int, RandomState or None, optional (default=None)
+        The seed or random state used to sample the rows when ``max_fit_rows``
+        is exceeded, or to maintain the ``partial_fit`` reservoir.
+
 
     Attributes
     ----------
 
     lambda_ : dict
        The lambda values corresponding to each feature
-    """
-
-    def __init__(self, cols=None, n_jobs=1, as_df=True):
-        super(YeoJohnsonTransformer, self).__init__(cols=cols, as_df=as_df)
-        self.n_jobs = n_jobs
-
-    def fit(self, X, y=None):
-        """Fit the transformer.
 
-        Parameters
-        ----------
+    lambda_stability_ : dict or None
+       If the lambdas were estimated on a sample of the rows, the absolute
+       difference between the lambdas estimated on two disjoint random halves
+       of the sample, for each feature. None if every row was used.
 
-        X : Pandas ``DataFrame``
-            The Pandas frame to fit. The frame will only
-            be fit on the prescribed ``cols`` (see ``__init__``) or
-            all of them if ``cols`` is None. Furthermore, ``X`` will
-            not be altered in the process of the fit.
+    n_samples_seen_ : int
+       The number of rows seen by ``fit`` or (cumulatively) by ``partial_fit``
 
-        y : None
-            Passthrough for ``sklearn.pipeline.Pipeline``. Even
-            if explicitly set, will not change behavior of ``fit``.
+    data_min_ : np.ndarray, shape=(n_features,)
+       The minimum of each feature over all the rows seen
 
-        Returns
-        -------
-
-        self
-        """
-        # check on state of X and cols
-        X, self.cols = validate_is_pd(X, self.cols, assert_all_finite=True)  # creates a copy -- we need all to be finite
-        cols = _cols_if_none(X, self.cols)
-
-        # ensure enough rows
-        _validate_rows(X)
+    reservoir_ : np.ndarray, shape=(n_rows, n_features)
+       The sample of rows on which the lambdas were estimated. Only
+       present if the lambdas were estimated on a sample.
+    """
 
-        # Now estimate the lambdas in parallel
-        self.lambda_ = dict(zip(cols,
-                                Parallel(n_jobs=self.n_jobs)(
-                                    delayed(_yj_estimate_lambda_single_y)
-                                    (X[nm]) for nm in cols)))
+    def __init__(self, cols=None, n_jobs=1, as_df=True, max_fit_rows=None, random_state=None):
+        super(YeoJohnsonTransformer, self).__init__(cols=cols, n_jobs=n_jobs, as_df=as_df,
+                                                    max_fit_rows=max_fit_rows, random_state=random_state)
 
-        return self
+    def _estimate_lambdas(self, sample):
+        # estimate the lambdas for blocks of columns at once (in parallel)
+        lambdas = np.empty(sample.shape[1])
+        _apply_column_blocks(_yj_normmax_block, np.array(sample, dtype=np.float64, order='F'),
+                             self.n_jobs, lambdas)
+        return lambdas
 
     def transform(self, X):
         """Transform a test matrix given the already-fit transformer.
@@ -787,87 +1579,235 @@ class YeoJohnsonTransformer(BaseSkutil, TransformerMixin):
         X, cols = validate_is_pd(X, self.cols, assert_all_finite=True)  # creates a copy -- we need all to be finite
         cols = _cols_if_none(X, self.cols)
 
-        lambdas_ = self.lambda_
+        lambdas = np.array([self.lambda_[nm] for nm in cols])
 
-        # do transformations
-        for nm in cols:
-            X[nm] = _yj_transform_y(X[nm], lambdas_[nm])
+        # do transformations on a column-major copy of the selected columns
+        trans = np.array(X[cols].values, dtype=np.float64, order='F')
+        _apply_column_blocks(_yj_transform_block, trans, self.n_jobs, lambdas)
 
+        X[cols] = trans
         return X if self.as_df else X.as_matrix()
 
 
-def _yj_trans_single_x(x, lam):
-    if x >= 0:
-        # Case 1: x >= 0 and lambda is not 0
-        if not _eqls(lam, ZERO):
-            return (np.power(x + 1, lam) - 1.0) / lam
-
-        # Case 2: x >= 0 and lambda is zero
-        return log(x + 1)
-    else:
-        # Case 2: x < 0 and lambda is not two
-        if not lam == 2.0:
-            denom = 2.0 - lam
-            numer = np.power((-x + 1), (2.0 - lam)) - 1.0
-            return -numer / denom
-
-        # Case 4: x < 0 and lambda is two
-        return -log(-x + 1)
-
-
-def _yj_transform_y(y, lam):
+def _yj_transform_y(y, lam, out=None):
     """Transform a single y, given a single lambda value.
     No validation performed.
 
     Parameters
     ----------
 
-    y : ndarray, shape (n_samples,)
+    y : array_like, shape (n_samples,)
        The vector being transformed
 
-    lam : ndarray, shape (n_lambdas,)
+    lam : float
        The lambda value used for the transformation
+
+    out : np.ndarray or None, shape (n_samples,)
+       If provided, the array into which the result is written.
+       May be ``y`` itself.
     """
-    y = np.array(y)
-    return np.array([_yj_trans_single_x(x, lam) for x in y])
+    y = np.asarray(y, dtype=np.float64)
+    if out is None:
+        out = np.empty_like(y)
+
+    # split on the sign, and transform each side as a whole
+    pos = y >= 0
+    neg = ~pos
+    y_pos, y_neg = y[pos], y[neg]
+
+    # Case 1: x >= 0 and lambda is not 0
+    if not _eqls(lam, ZERO):
+        out[pos] = (np.power(y_pos + 1, lam) - 1.0) / lam
+    # Case 2: x >= 0 and lambda is zero
+    else:
+        out[pos] = np.log1p(y_pos)
 
+    # Case 3: x < 0 and lambda is not two
+    if not lam == 2.0:
+        out[neg] = -(np.power(-y_neg + 1, 2.0 - lam) - 1.0) / (2.0 - lam)
+    # Case 4: x < 0 and lambda is two
+    else:
+        out[neg] = -np.log1p(-y_neg)
+
+    return out
 
-def _yj_estimate_lambda_single_y(y):
-    """Estimate lambda for a single y, given a range of lambdas
-    through which to search. No validation performed.
+
+def _yj_transform_block(X, lambdas):
+    """Transform a (column-major) float block in-place,
+    given the lambda of each column. No validation performed.
 
     Parameters
     ----------
 
-    y : ndarray, shape (n_samples,)
-       The vector being estimated against
+    X : np.ndarray, shape (n_samples, n_features)
+       The block being transformed
+
+    lambdas : np.ndarray, shape (n_features,)
+       The lambda values used for the transformation
     """
-    y = np.array(y)
-    # Use customlog-likelihood estimator
-    return _yj_normmax(y)
+    for j, lam in enumerate(lambdas):
+        _yj_transform_y(X[:, j], lam, out=X[:, j])
+    return X
+
 
+class _YJNegLLF(object):
+    """The negative of the ``_yj_llf`` log-likelihood for every column of
+    a block, evaluated at a vector of lambdas (one per column) at once.
 
-def _yj_normmax(x, brack=(-2, 2)):
-    """Compute optimal YJ transform parameter for input data.
+    Rather than transforming the data directly, this keeps ``log1p(|x|)``
+    and the signs, since ``(|x| + 1) ** c == exp(c * log1p(|x|))``. The
+    Jacobian term (``sum(log(data))``) does not depend on lambda at all, so it
+    is computed once. NaN log-likelihoods (constant columns) are mapped to
+    +inf so they are never preferred by the minimizer.
 
     Parameters
     ----------
 
-    x : array_like
-       Input array.
-    brack : 2-tuple
-       The starting interval for a downhill bracket search
+    X : np.ndarray, shape (n_samples, n_features)
+       The (untransformed) block of data
     """
 
-    # Use MLE to compute the optimal YJ parameter
-    def _mle_opt(i, brck):
-        def _eval_mle(lmb, data):
-            # Function to minimize
-            return -_yj_llf(data, lmb)
+    def __init__(self, X):
+        n_samples = X.shape[0]
+        self.n_samples = n_samples
+        self.sign = np.where(X >= 0, 1., -1.)
+        self.log_abs = np.log1p(np.abs(X))
+
+        # We can't take the canonical log of data, as there could be
+        # zeros or negatives. Thus, we need to shift the distributions
+        # up by some arbitrary factor just for the LLF computation
+        mins = X.min(axis=0)
+        shift = np.where(mins < ZERO, np.abs(mins) + 1, 0.)
+        with np.errstate(divide='ignore'):
+            self.log_data = np.maximum(__min_log__, np.log(X + shift)).sum(axis=0)
+
+    def __call__(self, lmb):
+        sign, log_abs = self.sign, self.log_abs
+
+        # the exponent for each element depends on its sign:
+        # lmb where x >= 0, else 2 - lmb
+        c = 1. - sign
+        c *= 1. - lmb
+        c += lmb
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            y = c * log_abs
+            np.exp(y, out=y)
+            y -= 1.
+            c *= sign
+            y /= c
+
+            # the lambda == 0 (or 2, for negatives) limit is just the log1p term
+            for j in np.where((lmb == 0) | (lmb == 2))[0]:
+                limit = c[:, j] == 0
+                y[limit, j] = sign[limit, j] * log_abs[limit, j]
+
+            var = y.var(axis=0)
+
+            llf = (lmb - 1) * self.log_data
+            llf -= self.n_samples / 2.0 * np.maximum(__min_log__, np.log(var))
+
+        # If var is 0.0, all the values were nearly identical
+        # in y, so we don't optimize for this value of lam
+        llf[var == 0] = np.nan
+        neg_llf = -llf
+        neg_llf[np.isnan(neg_llf)] = np.inf
+        return neg_llf
+
+
+# constants for the vectorized bracket/golden section search, as in scipy.optimize
+_GOLD = 1.618034
+_GR = 0.61803399
+_GC = 1. - _GR
+
+
+def _yj_normmax_block(X, out=None, brack=(-2, 2), tol=1.48e-8, maxiter=500):
+    """Compute the optimal YJ transform parameter for every column of ``X``
+    at once. This performs a downhill bracket search followed by a golden
+    section search (as in ``scipy.optimize.golden``) in which every step is
+    a single vectorized evaluation of the log-likelihood of all columns. Each
+    column's search is frozen as soon as it converges, so the result for a
+    column does not depend on the other columns in the block.
 
-        return optimize.brent(_eval_mle, brack=brck, args=(i,))
+    Parameters
+    ----------
 
-    return _mle_opt(x, brack)  # _mle(x, brack)
+    X : np.ndarray, shape (n_samples, n_features)
+       The block of data
+
+    out : np.ndarray or None, shape (n_features,)
+       If provided, the array into which the lambdas are written.
+
+    brack : 2-tuple
+       The starting interval for the downhill bracket search
+
+    tol : float
+       The relative tolerance of the golden section search
+
+    maxiter : int
+       The maximum number of bracket expansions and of golden section iterations
+
+    Returns
+    -------
+
+    lambdas : np.ndarray, shape (n_features,)
+       The estimated lambdas
+    """
+    n_features = X.shape[1]
+    func = _YJNegLLF(X)
+    ones = np.ones(n_features)
+
+    # bracket the minimum: walk downhill from brack, expanding by the golden ratio
+    xa, xb = ones * brack[0], ones * brack[1]
+    fa, fb = func(xa), func(xb)
+    swap = fa < fb
+    xa, xb = np.where(swap, xb, xa), np.where(swap, xa, xb)
+    fa, fb = np.where(swap, fb, fa), np.where(swap, fa, fb)
+    xc = xb + _GOLD * (xb - xa)
+    fc = func(xc)
+
+    active = fc < fb
+    n_iter = 0
+    while active.any() and n_iter < maxiter:
+        xn = xc + _GOLD * (xc - xb)
+        fn = func(xn)
+        xa, xb, xc = np.where(active, xb, xa), np.where(active, xc, xb), np.where(active, xn, xc)
+        fb, fc = np.where(active, fc, fb), np.where(active, fn, fc)
+        active &= fc < fb
+        n_iter += 1
+
+    # golden section search on the bracket (xa, xb, xc)
+    x0, x3 = xa, xc
+    right = np.abs(xc - xb) > np.abs(xb - xa)
+    x1 = np.where(right, xb, xb - _GC * (xb - xa))
+    x2 = np.where(right, xb + _GC * (xc - xb), xb)
+    f1, f2 = func(x1), func(x2)
+
+    n_iter = 0
+    active = np.abs(x3 - x0) > tol * (np.abs(x1) + np.abs(x2))
+    while active.any() and n_iter < maxiter:
+        left = f2 < f1  # the minimum is in (x1, x3)
+        step_right = active & left
+        step_left = active & ~left
+
+        # evaluate the one new point for every column at once
+        x_new = np.where(left, _GR * x2 + _GC * x3, _GR * x1 + _GC * x0)
+        f_new = func(x_new)
+
+        x0 = np.where(step_right, x1, x0)
+        x3 = np.where(step_left, x2, x3)
+        x1, x2 = np.where(step_right, x2, np.where(step_left, x_new, x1)), \
+            np.where(step_right, x_new, np.where(step_left, x1, x2))
+        f1, f2 = np.where(step_right, f2, np.where(step_left, f_new, f1)), \
+            np.where(step_right, f_new, np.where(step_left, f1, f2))
+
+        active &= np.abs(x3 - x0) > tol * (np.abs(x1) + np.abs(x2))
+        n_iter += 1
+
+    lambdas = np.where(f1 < f2, x1, x2)
+    if out is not None:
+        out[:] = lambdas
+    return lambdas
 
 
 def _yj_llf(data, lmb):
@@ -884,39 +1824,11 @@ def _yj_llf(data, lmb):
     lmb : scalar
        The lambda value
     """
+    data = np.asarray(data, dtype=np.float64).reshape(-1, 1)
+    neg_llf = _YJNegLLF(data)(np.array([lmb]))[0]
 
-    data = np.asarray(data)
-    N = data.shape[0]
-    y = _yj_transform_y(data, lmb)
-
-    # We can't take the canonical log of data, as there could be
-    # zeros or negatives. Thus, we need to shift both distributions
-    # up by some artbitrary factor just for the LLF computation
-    min_d, min_y = np.min(data), np.min(y)
-    if min_d < ZERO:
-        shift = np.abs(min_d) + 1
-        data += shift
-
-    # Same goes for Y
-    if min_y < ZERO:
-        shift = np.abs(min_y) + 1
-        y += shift
-
-    # Compute mean on potentially shifted data
-    y_mean = np.mean(y, axis=0)
-    var = np.sum((y - y_mean) ** 2. / N, axis=0)
-
-    # If var is 0.0, we'll get a warning. Means all the
-    # values were nearly identical in y, so we will return
-    # NaN so we don't optimize for this value of lam
-    if 0 == var:
-        return np.nan
-
-    # Can't use canonical log due to maybe negatives, so use the truncated log function in utils
-    llf = (lmb - 1) * np.sum(log(data), axis=0)
-    llf -= N / 2.0 * log(var)
-
-    return llf
+    # NaN if the variance of the transformed data is zero
+    return -neg_llf if np.isfinite(neg_llf) else np.nan
 
 
 class SpatialSignTransformer(BaseSkutil, TransformerMixin):
@@ -937,7 +1849,7 @@ class SpatialSignTransformer(BaseSkutil, TransformerMixin):
 
     n_jobs : int, 1 by default
        The number of jobs to use for the computation. This works by
-       estimating each of the feature lambdas in parallel.
+       transforming chunks of rows in parallel threads.
        
        If -1 all CPUs are used. If 1 is given, no parallel computing code
        is used at all, which is useful for debugging. For n_jobs below -1,
@@ -950,6 +1862,19 @@ class SpatialSignTransformer(BaseSkutil, TransformerMixin):
         Since most skutil transformers depend on explicitly-named
         ``DataFrame`` features, the ``as_df`` parameter is True by default.
 
+    projection : str, optional (default='feature')
+        One of ('feature', 'row'). If 'feature', each feature is divided by
+        its squared norm, as computed in ``fit``. If 'row', the standard
+        spatial sign projection is applied: each row (over the ``cols``) is
+        divided by its own Euclidean norm, projecting it onto the unit sphere.
+        Rows with a norm of zero are left as zeros.
+
+    chunk_size : int or None, optional (default=None)
+        The number of rows transformed at a time. Only a chunk of the
+        selected columns is converted to floats at once, which bounds
+        the temporary memory used by ``transform``. If None, all the
+        rows are transformed at once.
+
 
     Attributes
     ----------
@@ -958,9 +1883,11 @@ class SpatialSignTransformer(BaseSkutil, TransformerMixin):
        The squared norms for each feature
     """
 
-    def __init__(self, cols=None, n_jobs=1, as_df=True):
+    def __init__(self, cols=None, n_jobs=1, as_df=True, projection='feature', chunk_size=None):
         super(SpatialSignTransformer, self).__init__(cols=cols, as_df=as_df)
         self.n_jobs = n_jobs
+        self.projection = projection
+        self.chunk_size = chunk_size
 
     def fit(self, X, y=None):
         """Fit the transformer.
@@ -987,15 +1914,15 @@ class SpatialSignTransformer(BaseSkutil, TransformerMixin):
         X, self.cols = validate_is_pd(X, self.cols)
         cols = _cols_if_none(X, self.cols)
 
-        # Now get sqnms in parallel
-        self.sq_nms_ = dict(zip(cols,
-                                Parallel(n_jobs=self.n_jobs)(
-                                    delayed(_sq_norm_single)
-                                    (X[nm]) for nm in cols)))
+        if self.projection not in ('feature', 'row'):
+            raise ValueError('projection must be one of (feature, row), but got %s' % str(self.projection))
+
+        # Now get sqnms for all the columns at once
+        self.sq_nms_ = dict(zip(cols, _sq_norms(X[cols].values)))
 
         return self
 
-    def transform(self, X):
+    def transform(self, X, out=None):
         """Transform a test matrix given the already-fit transformer.
 
         Parameters
@@ -1006,6 +1933,11 @@ class SpatialSignTransformer(BaseSkutil, TransformerMixin):
             be applied to a copy of the input data, and the result
             will be returned.
 
+        out : np.ndarray or None, shape=(n_samples, n_cols), optional (default=None)
+            A float buffer into which the projected ``cols`` are written. If
+            provided, ``out`` itself is returned (regardless of ``as_df``),
+            rather than a copy of ``X`` with the projected columns.
+
 
         Returns
         -------
@@ -1018,19 +1950,69 @@ class SpatialSignTransformer(BaseSkutil, TransformerMixin):
 
         # check on state of X and cols
         X, _ = validate_is_pd(X, self.cols)
-        sq_nms_ = self.sq_nms_
+        cols = _cols_if_none(X, self.cols)
+        col_idcs = X.columns.get_indexer(cols)
+
+        n_samples = X.shape[0]
+        return_out = out is not None
+        if not return_out:
+            out = np.empty((n_samples, len(cols)))
+        elif out.shape != (n_samples, len(cols)):
+            raise ValueError('out should have shape %r, but has shape %r' % ((n_samples, len(cols)), out.shape))
+
+        # the features are scaled by their norms, or each row by its own
+        sq_nms = None if self.projection == 'row' else np.array([self.sq_nms_[nm] for nm in cols])
+
+        # project chunks of rows (in parallel)
+        chunk_size = self.chunk_size if self.chunk_size is not None else max(n_samples, 1)
+        chunks = [slice(start, min(start + chunk_size, n_samples)) for start in range(0, n_samples, chunk_size)]
+        n_jobs = min(_get_n_jobs(self.n_jobs), len(chunks))
+
+        if n_jobs <= 1:
+            for s in chunks:
+                _spatial_sign_chunk(X.iloc[s, col_idcs].values, out[s], sq_nms)
+        else:
+            Parallel(n_jobs=n_jobs, backend='threading')(
+                delayed(_spatial_sign_chunk)(X.iloc[s, col_idcs].values, out[s], sq_nms)
+                for s in chunks)
 
-        # scale by norms
-        for nm, the_norm in six.iteritems(sq_nms_):
-            X[nm] /= the_norm
+        if return_out:
+            return out
 
+        X = _assign_columns(X, cols, out)
         return X if self.as_df else X.as_matrix()
 
 
-def _sq_norm_single(x, zero_action=np.inf):
-    x = np.asarray(x)
-    nrm = np.dot(x, x)
+def _spatial_sign_chunk(X, out, sq_nms=None):
+    """Project a chunk of rows into ``out``.
+
+    Parameters
+    ----------
+
+    X : np.ndarray, shape=(n_samples, n_features)
+        The chunk of rows
+
+    out : np.ndarray, shape=(n_samples, n_features)
+        The array into which the projection is written
 
-    # What if a squared norm is zero? We want to
-    # avoid a divide-by-zero situation...
-    return nrm if not nrm == 0 else zero_action
+    sq_nms : np.ndarray or None, shape=(n_features,)
+        The squared norm of each feature. If None, each row
+        is divided by its own (non-squared) norm.
+    """
+    if sq_nms is not None:
+        return np.divide(X, sq_nms, out=out)
+
+    norms = np.sqrt(np.einsum('ij,ij->i', X, X))
+    norms[norms == 0] = 1.
+    return np.divide(X, norms[:, np.newaxis], out=out)
+
+
+def _sq_norms(X, zero_action=np.inf):
+    """Compute the squared norm of each column of ``X``.
+    What if a squared norm is zero? We want to avoid a
+    divide-by-zero situation, so it's replaced by ``zero_action``.
+    """
+    X = np.asarray(X, dtype=np.float64)
+    nrms = np.einsum('ij,ij->j', X, X)
+    nrms[nrms == 0] = zero_action
+    return nrms
@@ -93,6 +93,18 @@ else:
             for train, test in cv)
 
 
+# the vectorized hashing of object arrays was added in pandas 0.19.2
+# and moved in 0.20; it's only needed for hashing, so a missing one is
+# not fatal at import time (see ``OneHotCategoricalEncoder``)
+try:
+    from pandas.util import hash_array
+except ImportError:
+    try:
+        from pandas.tools.hashing import hash_array
+    except ImportError:
+        hash_array = None
+
+
 def dict_keys(d):
     """In python 3, the ``d.keys()`` method
     returns a view and not an actual list.
@@ -337,6 +349,31 @@ def _set_cv(cv, X, y, classifier):
     return check_cv(cv, X, y, classifier) if not SK18 else check_cv(cv, y, classifier)
 
 
+def _cv_split(cv, X, y):
+    """This method returns the iterable of (train, test) index
+    tuples from a cross validation object, agnostic of whether
+    sklearn-0.17 or sklearn-0.18 is being used.
+
+    Parameters
+    ----------
+
+    cv : `sklearn.cross_validation._PartitionIterator` or `sklearn.model_selection.BaseCrossValidator`
+        The cv object (as returned by ``_set_cv``) to split.
+
+    X : pd.DataFrame or np.ndarray, shape(n_samples, n_features)
+        The dataframe or np.ndarray being split.
+
+    y : np.ndarray, shape(n_samples,)
+        The target being split.
+
+    Returns
+    -------
+
+    iterable of (train, test) tuples
+    """
+    return cv if not SK18 else cv.split(X, y)
+
+
 def _get_groups(X, y):
     """Depending on whether using sklearn-0.17 or sklearn-0.18,
     groups must be computed differently. This method computes groups
@@ -390,6 +427,44 @@ def _as_numpy(y):
     raise TypeError('cannot convert type %s to numpy ndarray' % type(y))
 
 
+def _make_pca(n_components=None, whiten=False, svd_solver='auto', iterated_power='auto', random_state=None):
+    """Build an (unfit) ``sklearn.decomposition.PCA``. The ``svd_solver``,
+    ``iterated_power`` and ``random_state`` arguments were added in sklearn
+    0.18; before that, PCA always computes a full SVD, so they are only
+    passed on to newer versions.
+
+    Parameters
+    ----------
+
+    n_components : int, float, None or string, optional (default=None)
+        The number of components to keep.
+
+    whiten : bool, optional (default=False)
+        Whether to whiten the components.
+
+    svd_solver : string, optional (default='auto')
+        The solver. Prior to sklearn 0.18, only 'auto' and 'full' are
+        supported (as is 'randomized', which is only used to label a PCA
+        whose attributes are computed elsewhere).
+
+    iterated_power : int or 'auto', optional (default='auto')
+        The number of power iterations of the randomized solver.
+
+    random_state : int, RandomState or None, optional (default=None)
+        Seeds the randomized and arpack solvers.
+    """
+    from sklearn.decomposition import PCA
+
+    if SK18:
+        return PCA(n_components=n_components, whiten=whiten, svd_solver=svd_solver,
+                   iterated_power=iterated_power, random_state=random_state)
+
+    if svd_solver not in ('auto', 'full', 'randomized'):
+        raise ValueError('svd_solver=%r requires scikit-learn >= 0.18 (found %s)'
+                         % (svd_solver, sklearn.__version__))
+    return PCA(n_components=n_components, whiten=whiten)
+
+
 def _indexable(X, y):
     """Make arrays indexable for cross-validation. Checks consistent 
     length, passes through None, and ensures that everything can be indexed.
@@ -370,3 +370,21 @@ def test_conf_matrix():
 
 def test_load_iris_df():
     assert 'target' in load_iris_df(True, 'target').columns.values
+
+
+def test_validate_finite():
+    x = X_no_targ.copy()
+    validate_is_pd(x, None, assert_all_finite=True)
+
+    # a value changed in-place (same dtype) after a passing check is still caught
+    x.iloc[0, 0] = np.nan
+    assert_fails(validate_is_pd, ValueError, x, None, True)
+
+    # only the checked columns are scanned
+    validate_is_pd(x, [x.columns[1]], assert_all_finite=True)
+    x.iloc[0, 1] = np.inf
+    assert_fails(validate_is_pd, ValueError, x, [x.columns[1]], True)
+
+    # the copy can be skipped
+    assert validate_is_pd(x, None, copy=False)[0] is x
+    assert validate_is_pd(x, [x.columns[0]], copy=False)[0] is x
@@ -10,6 +10,7 @@ import numbers
 import scipy.stats as st
 from sklearn.datasets import load_iris, load_breast_cancer, load_boston
 from sklearn.externals import six
+from sklearn.utils import check_random_state
 from sklearn.metrics import confusion_matrix as cm
 from ..base import suppress_warnings
 from .fixes import (_grid_detail, _is_integer, is_iterable, 
@@ -384,22 +385,25 @@ def flatten_all_generator(container):
                 yield i
 
 
-def shuffle_dataframe(X):
+def shuffle_dataframe(X, random_state=None):
     """Shuffle the rows in a data frame without replacement.
     The random state used for shuffling is controlled by
-    numpy's random state.
+    numpy's random state, unless ``random_state`` is provided.
 
     Parameters
     ----------
 
     X : pd.DataFrame, shape=(n_samples, n_features)
         The dataframe to shuffle
+
+    random_state : int, RandomState or None, optional (default=None)
+        Seeds the shuffle. If None, numpy's global random state is used.
     """
     X, _ = validate_is_pd(X, None, False)
-    return X.iloc[np.random.permutation(np.arange(X.shape[0]))]
+    return X.iloc[check_random_state(random_state).permutation(np.arange(X.shape[0]))]
 
 
-def validate_is_pd(X, cols, assert_all_finite=False):
+def validate_is_pd(X, cols, assert_all_finite=False, copy=True):
     """Used within each SelectiveMixin fit method to determine whether
     the passed ``X`` is a dataframe, and whether the cols is appropriate.
     There are four scenarios (in the order in which they're checked):
@@ -439,12 +443,18 @@ def validate_is_pd(X, cols, assert_all_finite=False):
         If True, will raise an AssertionError if any np.nan or np.inf
         values reside in ``X``.
 
+    copy : bool, optional (default=True)
+        Whether to copy ``X`` if it is already a DataFrame. Callers that
+        only read from ``X`` (and never return or mutate it) can pass False
+        to avoid a full copy of the frame.
+
 
     Returns
     -------
 
     X : pd.DataFrame, shape=(n_samples, n_features)
-        A copy of the original input ``X``
+        A copy of the original input ``X`` (or ``X`` itself, if
+        ``copy`` is False and ``X`` is a DataFrame)
 
     cols : list or None, shape=(n_features,)
         If ``cols`` was not None and did not raise a TypeError,
@@ -483,11 +493,11 @@ def validate_is_pd(X, cols, assert_all_finite=False):
 
         # case 2, we have a DF but no cols, def behavior: use all
         elif is_df and cols is None:
-            return X.copy(), None
+            return X.copy() if copy else X, None
 
         # case 3, we have a DF AND cols
         elif is_df and cols is not None:
-            return X.copy(), cols
+            return X.copy() if copy else X, cols
 
         # case 4, we have neither a frame nor cols (maybe JUST a np.array?)
         else:
@@ -505,15 +515,20 @@ def validate_is_pd(X, cols, assert_all_finite=False):
     if assert_all_finite:
         # if cols, we only need to ensure the specified columns are finite
         cols_tmp = _cols_if_none(X, cols)
-        X_prime = X[get_numeric(X[cols_tmp])]  # subset the subset... only numerics
+        numeric = _numeric_cols(X[cols_tmp].dtypes)  # subset the subset... only numerics
 
-        # also apply only to the non-object columns
-        if X_prime.apply(lambda x: (~np.isfinite(x)).sum()).sum() > 0:
+        # one vectorized pass over the numeric block rather than one per column
+        if numeric and not np.isfinite(X[numeric].values).all():
             raise ValueError('Expected all entries to be finite')
 
     return X, cols
 
 
+def _numeric_cols(dtypes):
+    # the dtype test used by get_numeric, without any frame validation/copies
+    return dtypes[dtypes.apply(lambda x: str(x).startswith(("float", "int")))].index.tolist()
+
+
 def df_memory_estimate(X, unit='MB', index=False):
     """We estimate the memory footprint of an H2OFrame
     to determine whether it's capable of being held in memory 
@@ -701,7 +716,7 @@ def get_numeric(X):
         The list of indices which are numeric.
     """
     validate_is_pd(X, cols=None, assert_all_finite=False)  # don't want to assert finite or maybe endless recursion
-    return X.dtypes[X.dtypes.apply(lambda x: str(x).startswith(("float", "int")))].index.tolist()
+    return _numeric_cols(X.dtypes)
 
 
 def human_bytes(b, unit='MB'):